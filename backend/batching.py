@@ -0,0 +1,172 @@
+"""Micro-batching of concurrent single-text translations.
+
+Requests for the same (provider, source, target) that arrive within a short
+window are sent upstream as one batched call; every caller gets its own
+result (or the batch's error). Batch sizes and the queueing delay each
+caller paid are kept for ``/batching/stats``.
+"""
+import asyncio
+import time
+from collections import deque
+
+from .stats import percentile
+
+# Upper bounds of the batch size and queue delay (seconds) histogram buckets
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, float("inf"))
+DELAY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, float("inf"))
+
+
+def _histogram(values, buckets):
+    # Cumulative counts, Prometheus-style
+    return {("+Inf" if bound == float("inf") else str(bound)): sum(1 for v in values if v <= bound) for bound in buckets}
+
+
+class BatchMetrics:
+    def __init__(self, window_size=5000):
+        self.batches = 0
+        self.items = 0
+        # Rolling windows for the distributions; the counters above are lifetime totals
+        self.sizes = deque(maxlen=window_size)
+        self.delays = deque(maxlen=window_size)
+
+    def record(self, size, delays):
+        self.batches += 1
+        self.items += size
+        self.sizes.append(size)
+        self.delays.extend(delays)
+
+    def snapshot(self):
+        sizes = list(self.sizes)
+        delays = list(self.delays)
+
+        def delay_ms(pct):
+            return round(percentile(delays, pct) * 1000, 3) if delays else None
+
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else None,
+            "batch_size_histogram": _histogram(sizes, SIZE_BUCKETS),
+            "queue_delay_p50_ms": delay_ms(50),
+            "queue_delay_p95_ms": delay_ms(95),
+            "queue_delay_p99_ms": delay_ms(99),
+            "queue_delay_histogram": _histogram(delays, DELAY_BUCKETS),
+        }
+
+
+class MicroBatcher:
+    """Coalesce concurrent single-text calls into one ``run(texts)`` call.
+
+    The first text waits at most ``window`` seconds for company; a batch is
+    dispatched early once it holds ``max_batch`` texts.
+    """
+
+    def __init__(self, run, max_batch=32, window=0.005, metrics=None, clock=time.perf_counter):
+        self.run = run
+        self.max_batch = max(1, max_batch)
+        self.window = window
+        self.metrics = metrics
+        self.clock = clock
+        self._pending = []  # (text, future, enqueued_at)
+        self._timer = None
+        # Batches in flight; the loop only keeps weak references to tasks
+        self._tasks = set()
+
+    async def submit(self, text):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, self.clock()))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch, self._pending = self._pending[:self.max_batch], self._pending[self.max_batch:]
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        """Cancel the batches not yet sent and those in flight; their callers get CancelledError."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        for _, future, _ in pending:
+            future.cancel()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, batch):
+        # Callers that gave up (e.g. lost a race) are dropped before the upstream call
+        batch = [entry for entry in batch if not entry[1].done()]
+        if not batch:
+            return
+        if self.metrics is not None:
+            now = self.clock()
+            self.metrics.record(len(batch), [now - enqueued_at for _, _, enqueued_at in batch])
+        try:
+            results = await self.run([text for text, _, _ in batch])
+        except asyncio.CancelledError:
+            for _, future, _ in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future, _), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+class BatchScheduler:
+    """One ``MicroBatcher`` per (provider, source, target), all calling ``run(provider, texts, source, target)``."""
+
+    def __init__(self, run, window=0.005, max_batch=16):
+        self.run = run
+        self.window = window
+        self.max_batch = max_batch
+        self._batchers = {}
+        self._metrics = {}  # provider name -> BatchMetrics
+
+    @property
+    def enabled(self):
+        return self.window > 0 and self.max_batch > 1
+
+    def applies(self, provider):
+        # Providers that coalesce requests themselves (e.g. the local model) are left alone
+        return self.enabled and provider.supports_batch and not provider.coalesces
+
+    async def submit(self, provider, text, source, target):
+        key = (provider.name, source, target)
+        batcher = self._batchers.get(key)
+        if batcher is None:
+            metrics = self._metrics.get(provider.name)
+            if metrics is None:
+                metrics = self._metrics[provider.name] = BatchMetrics()
+            run = lambda texts: self.run(provider, texts, source, target)
+            batcher = self._batchers[key] = MicroBatcher(run, self.max_batch, self.window, metrics)
+        return await batcher.submit(text)
+
+    async def close(self):
+        batchers, self._batchers = list(self._batchers.values()), {}
+        for batcher in batchers:
+            await batcher.close()
+
+    def snapshot(self):
+        return {
+            "enabled": self.enabled,
+            "window_ms": round(self.window * 1000, 3),
+            "max_batch": self.max_batch,
+            "providers": {name: metrics.snapshot() for name, metrics in self._metrics.items()},
+        }
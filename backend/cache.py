@@ -0,0 +1,202 @@
+"""Translation result cache shared by the FastAPI backend and the Streamlit app.
+
+Only the standard library is used here so the frontend can import it without
+pulling in the backend's dependencies.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# Per-entry bookkeeping overhead counted against the byte budget
+ENTRY_OVERHEAD = 96
+
+
+def normalize_text(text):
+    # Unicode-normalize and trim so trivially different submissions share an entry
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def make_key(text, source_lang, target_lang):
+    raw = "\x1f".join([source_lang.strip().lower(), target_lang.strip().lower(), normalize_text(text)])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class MemoryTier:
+    """In-process LRU with per-entry TTL and a total size cap in bytes."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=24 * 3600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                self.bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        size = len(key) + len(value.encode("utf-8")) + ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[2]
+            self._entries[key] = (value, expires_at, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteTier:
+    """On-disk tier that survives restarts; expired rows are purged lazily."""
+
+    name = "disk"
+    PURGE_EVERY = 500
+
+    def __init__(self, path, ttl=7 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time():
+            return None
+        return row[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, value, expires_at),
+            )
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                self._conn.execute("DELETE FROM translations WHERE expires_at < ?", (time.time(),))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM translations")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TranslationCache:
+    """Looks tiers up in order and back-fills the faster ones on a hit.
+
+    Any object with get/set/clear can be passed as a tier.
+    """
+
+    def __init__(self, tiers):
+        self.tiers = list(tiers)
+        self.hits = 0
+        self.misses = 0
+        self.tier_hits = {tier.name: 0 for tier in self.tiers}
+        self._fills = 0
+        self._fill_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        if env.get("TRANSLATION_CACHE_DISABLED", "").lower() in ("1", "true", "yes"):
+            return cls([])
+        ttl = float(env.get("TRANSLATION_CACHE_TTL", 24 * 3600))
+        tiers = [MemoryTier(max_bytes=int(env.get("TRANSLATION_CACHE_MAX_BYTES", 64 * 1024 * 1024)), ttl=ttl)]
+        db_path = env.get("TRANSLATION_CACHE_DB")
+        if db_path:
+            tiers.append(SQLiteTier(db_path, ttl=float(env.get("TRANSLATION_CACHE_DB_TTL", 7 * 24 * 3600))))
+        return cls(tiers)
+
+    def get(self, text, source_lang, target_lang):
+        key = make_key(text, source_lang, target_lang)
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self.tiers[:i]:
+                    faster.set(key, value)
+                with self._lock:
+                    self.hits += 1
+                    self.tier_hits[tier.name] += 1
+                return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, text, source_lang, target_lang, value, elapsed=None):
+        # elapsed is how long the providers took; used to estimate time saved by hits
+        key = make_key(text, source_lang, target_lang)
+        for tier in self.tiers:
+            tier.set(key, value)
+        if elapsed is not None:
+            with self._lock:
+                self._fills += 1
+                self._fill_seconds += elapsed
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            avg_fill = self._fill_seconds / self._fills if self._fills else 0.0
+            stats = {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "tier_hits": dict(self.tier_hits),
+                "avg_miss_latency_ms": round(avg_fill * 1000, 2),
+                "estimated_seconds_saved": round(self.hits * avg_fill, 3),
+            }
+        for tier in self.tiers:
+            stats[f"{tier.name}_entries"] = len(tier)
+            if isinstance(tier, MemoryTier):
+                stats["memory_bytes"] = tier.bytes
+                stats["memory_max_bytes"] = tier.max_bytes
+        return stats
@@ -0,0 +1,95 @@
+"""Dispatch strategies for walking the provider chain.
+
+- sequential: one provider at a time, next only after a failure
+- hedged: also start the next provider when the current one is slower than its p95
+- race: keep ``race_width`` providers in flight; first valid answer wins
+"""
+import asyncio
+import os
+
+from .providers import ProviderError
+
+STRATEGIES = ("sequential", "hedged", "race")
+
+
+class TranslationFailed(Exception):
+    def __init__(self, errors):
+        super().__init__("; ".join(errors) or "Translation failed")
+        self.errors = errors
+
+
+class DispatchConfig:
+    def __init__(self, strategy="sequential", race_width=3, hedge_delay=1.0, hedge_min_delay=0.05, hedge_max_delay=5.0):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown dispatch strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+        self.race_width = max(1, race_width)
+        # hedge_delay is used until a provider has enough latency samples for a p95
+        self.hedge_delay = hedge_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_max_delay = hedge_max_delay
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        return cls(
+            strategy=env.get("TRANSLATE_DISPATCH", "sequential").strip().lower(),
+            race_width=int(env.get("TRANSLATE_RACE_WIDTH", 3)),
+            hedge_delay=float(env.get("TRANSLATE_HEDGE_DELAY", 1.0)),
+            hedge_min_delay=float(env.get("TRANSLATE_HEDGE_MIN_DELAY", 0.05)),
+            hedge_max_delay=float(env.get("TRANSLATE_HEDGE_MAX_DELAY", 5.0)),
+        )
+
+    def hedge_delay_for(self, p95):
+        if p95 is None:
+            return self.hedge_delay
+        return min(max(p95, self.hedge_min_delay), self.hedge_max_delay)
+
+
+async def dispatch(candidates, call, strategy, config, p95_for):
+    """Run ``call(provider)`` over candidates and return (provider, result).
+
+    Raises ``TranslationFailed`` with every provider's error when none succeeds.
+    Calls still in flight once a winner is found are cancelled.
+    """
+    remaining = list(candidates)
+    in_flight = {}  # task -> provider
+    errors = []
+    last_started = None
+
+    def launch():
+        nonlocal last_started
+        if not remaining:
+            return False
+        provider = remaining.pop(0)
+        in_flight[asyncio.ensure_future(call(provider))] = provider
+        last_started = provider
+        return True
+
+    for _ in range(config.race_width if strategy == "race" else 1):
+        if not launch():
+            break
+
+    try:
+        while in_flight:
+            timeout = None
+            if strategy == "hedged" and remaining:
+                timeout = config.hedge_delay_for(p95_for(last_started))
+            done, _ = await asyncio.wait(in_flight, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Hedge: the newest attempt is slower than usual, start the next one alongside it
+                launch()
+                continue
+            for task in done:
+                provider = in_flight.pop(task)
+                try:
+                    return provider, task.result()
+                except ProviderError as e:
+                    errors.append(str(e))
+                    launch()
+        raise TranslationFailed(errors)
+    finally:
+        for task in in_flight:
+            task.cancel()
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
@@ -0,0 +1,565 @@
+"""Format-preserving translation of HTML, Markdown and SRT/WebVTT documents.
+
+A document parser is fed the file a chunk at a time and hands back pieces:
+strings to copy to the output unchanged (markup, code blocks, cue timings)
+and ``Unit``s, the runs of translatable text. Inside a unit, inline tags,
+code spans, URLs and entities are swapped for numbered ``{n}`` placeholders,
+so only the words go upstream and the markup comes back byte for byte.
+``render`` puts the translated units back between the pieces around them.
+
+Parsing is incremental: a parser only holds the block it is in (a paragraph,
+a cue, a code span), never the whole file. Attribute values (``alt``,
+``title``) are not translated. Only the standard library is used.
+"""
+import bisect
+import codecs
+import html
+import re
+from collections import namedtuple
+
+FORMATS = ("html", "markdown", "srt", "vtt")
+MEDIA_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+    "srt": "application/x-subrip; charset=utf-8",
+    "vtt": "text/vtt; charset=utf-8",
+}
+_CONTENT_TYPES = {
+    "text/html": "html",
+    "application/xhtml+xml": "html",
+    "text/markdown": "markdown",
+    "text/x-markdown": "markdown",
+    "application/x-subrip": "srt",
+    "text/srt": "srt",
+    "text/vtt": "vtt",
+}
+
+# text: what is sent upstream, with {n} placeholders; tokens: the markup each placeholder stands
+# for; breaks: line breaks (with the next line's prefix) the translation is spread over again;
+# escape: text is HTML and gets escaped on the way back; raw: the original, kept on failure
+Unit = namedtuple("Unit", "text tokens breaks escape raw")
+
+_PLACEHOLDER = re.compile(r"\{\s*(\d+)\s*\}")
+_URL = r"https?://[^\s<>\"'`]*[^\s<>\"'`.,;:!?)\]]"
+_ENTITY = r"&(?:#\d+|#[xX][0-9a-fA-F]+|[A-Za-z]\w*);"
+
+
+class DocumentError(ValueError):
+    """The upload can't be handled as a document (unknown format, bad encoding)."""
+
+
+def format_for(content_type, name=None):
+    # Document format from an explicit name or the upload's Content-Type
+    if name:
+        if name not in FORMATS:
+            raise DocumentError(f"Unknown format {name!r}; expected one of {', '.join(FORMATS)}")
+        return name
+    media = (content_type or "").split(";")[0].strip().lower()
+    if media not in _CONTENT_TYPES:
+        raise DocumentError(f"Unknown document type {media or '(none)'!r}; pass format= ({', '.join(FORMATS)})")
+    return _CONTENT_TYPES[media]
+
+
+class _Run:
+    """Text and protected markup collected for one unit."""
+
+    def __init__(self, escape=False):
+        self.escape = escape
+        self.parts = []  # (kind, value sent upstream, original)
+
+    def add_text(self, text, raw=None):
+        if text:
+            self.parts.append(("text", text, text if raw is None else raw))
+
+    def add_token(self, raw):
+        if raw:
+            self.parts.append(("token", raw, raw))
+
+    def add_break(self, raw):
+        # A line break inside the unit; it reads as a space upstream
+        self.parts.append(("break", " ", raw))
+
+    def add_masked(self, text, pattern):
+        pos = 0
+        for m in pattern.finditer(text):
+            self.add_text(text[pos:m.start()])
+            self.add_token(m.group())
+            pos = m.end()
+        self.add_text(text[pos:])
+
+    def pieces(self):
+        # Markup and whitespace at either end stay outside the unit; a run without letters is all markup
+        parts, self.parts = self.parts, []
+        start, end = 0, len(parts)
+        while start < end and (parts[start][0] != "text" or not parts[start][1].strip()):
+            start += 1
+        while end > start and (parts[end - 1][0] != "text" or not parts[end - 1][1].strip()):
+            end -= 1
+        body = parts[start:end]
+        if not any(kind == "text" and any(c.isalpha() for c in value) for kind, value, _ in body):
+            return ["".join(raw for _, _, raw in parts)]
+        head = "".join(raw for _, _, raw in parts[:start])
+        tail = "".join(raw for _, _, raw in parts[end:])
+        # Plain whitespace around the words goes with the markup too
+        kind, value, raw = body[0]
+        if value == raw:
+            head += value[:len(value) - len(value.lstrip())]
+            body[0] = (kind, value.lstrip(), value.lstrip())
+        kind, value, raw = body[-1]
+        if value == raw:
+            tail = value[len(value.rstrip()):] + tail
+            body[-1] = (kind, value.rstrip(), value.rstrip())
+        text, tokens, breaks = [], [], []
+        previous = None
+        for kind, value, raw in body:
+            if kind == "token" and previous == "token":
+                tokens[-1] += raw
+            elif kind == "token":
+                text.append("{%d}" % len(tokens))
+                tokens.append(raw)
+            else:
+                text.append(value)
+                if kind == "break":
+                    breaks.append(raw)
+            previous = kind
+        unit = Unit("".join(text), tuple(tokens), tuple(breaks), self.escape, "".join(raw for _, _, raw in body))
+        return [head, unit, tail]
+
+
+def _rewrap(text, breaks):
+    # Spread text over len(breaks) + 1 lines of similar length, cutting at spaces
+    spaces = [m.start() for m in re.finditer(" ", text)]
+    lines = len(breaks) + 1
+    out = []
+    pos = 0
+    for k, brk in enumerate(breaks, 1):
+        goal = len(text) * k / lines
+        first = bisect.bisect_left(spaces, pos)
+        i = max(bisect.bisect_left(spaces, goal), first)
+        options = spaces[max(first, i - 1):i + 1]
+        if not options:
+            break
+        cut = min(options, key=lambda s: abs(s - goal))
+        out.append(text[pos:cut] + brk)
+        pos = cut + 1
+    return "".join(out) + text[pos:]
+
+
+def _restore(text, tokens):
+    used = set()
+
+    def sub(m):
+        i = int(m.group(1))
+        if i >= len(tokens):
+            return m.group()
+        if i in used:
+            return ""
+        used.add(i)
+        return tokens[i]
+
+    text = _PLACEHOLDER.sub(sub, text)
+    # Markup the provider dropped goes at the end rather than being lost
+    return text + "".join(token for i, token in enumerate(tokens) if i not in used)
+
+
+def render_unit(unit, translated):
+    if translated is None:
+        return unit.raw
+    translated = _PLACEHOLDER.sub(lambda m: "{%s}" % m.group(1), translated)
+    if unit.escape:
+        translated = html.escape(translated, quote=False)
+    if unit.breaks:
+        translated = _rewrap(translated, unit.breaks)
+    return _restore(translated, unit.tokens)
+
+
+def render(pieces, translations):
+    """Output text for ``pieces``, taking each unit's translation in turn (None keeps the original)."""
+    translations = iter(translations)
+    return "".join(render_unit(p, next(translations)) if isinstance(p, Unit) else p for p in pieces)
+
+
+def _drain(out):
+    # Pending pieces with adjacent strings merged
+    pieces = []
+    for piece in out:
+        if isinstance(piece, Unit) or not pieces or isinstance(pieces[-1], Unit):
+            pieces.append(piece)
+        else:
+            pieces[-1] += piece
+    out.clear()
+    return [piece for piece in pieces if piece != ""]
+
+
+_HTML_MARKUP = re.compile(
+    r"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<![^>]*>|<\?[^>]*>"
+    r"|<(/?)([A-Za-z][\w:.-]*)((?:\"[^\"]*\"|'[^']*'|[^'\">])*)>",
+    re.S,
+)
+_HTML_PROTECTED = re.compile(rf"{_ENTITY}|{_URL}|\{{\s*\d+\s*\}}")
+_NO_TRANSLATE_ATTR = re.compile(r"""\btranslate\s*=\s*["']?no\b|\bclass\s*=\s*["'][^"']*\bnotranslate\b""", re.I)
+# Phrasing elements: masked inside the sentence instead of ending it
+_INLINE = frozenset(
+    "a abbr b bdi bdo br cite data del dfn em font i img ins label mark q rp rt ruby s small span "
+    "strong sub sup time u wbr".split()
+)
+# Copied with their content, like <pre> blocks and anything marked translate="no"
+_NO_TRANSLATE = frozenset("code kbd samp var svg math".split())
+# Content is not markup at all
+_RAW_TEXT = frozenset("script style textarea".split())
+_VOID = frozenset("area base br col embed hr img input link meta source track wbr".split())
+
+
+class HTMLDocument:
+    """Incremental HTML parser: ``feed`` text as it arrives and ``close`` at the end; both return pieces."""
+
+    def __init__(self):
+        self._pending = []  # text not parsed yet, joined only when a chunk can finish what it waits for
+        self._out = []
+        self._run = _Run(escape=True)
+        self._raw_end = None  # closing tag of the script/style element we're in
+        self._skip = None  # [tag, depth, raw parts, inline] of the no-translate element we're in
+
+    def feed(self, text):
+        self._pending.append(text)
+        if self._raw_end is None and "<" not in text and ">" not in text:
+            # Without either, the chunk can't end the text run or finish the tag being waited on
+            return []
+        self._parse(final=False)
+        return _drain(self._out)
+
+    def close(self):
+        self._parse(final=True)
+        if self._skip is not None:
+            self._emit("".join(self._skip[2]), self._skip[3])
+            self._skip = None
+        self._flush()
+        return _drain(self._out)
+
+    def _parse(self, final):
+        buf, pos = "".join(self._pending), 0
+        while pos < len(buf):
+            if self._raw_end is not None:
+                m = self._raw_end.search(buf, pos)
+                if m is None:
+                    # Keep enough back to find a closing tag split across chunks
+                    keep = len(buf) if final else max(pos, len(buf) - 16)
+                    self._verbatim(buf[pos:keep])
+                    pos = keep
+                    break
+                self._verbatim(buf[pos:m.end()])
+                pos = m.end()
+                self._raw_end = None
+                continue
+            lt = buf.find("<", pos)
+            if lt < 0:
+                if not final:
+                    break
+                lt = len(buf)
+            if lt > pos:
+                self._text(buf[pos:lt])
+                pos = lt
+                continue
+            m = _HTML_MARKUP.match(buf, lt)
+            if m is None:
+                if not final and (lt + 1 == len(buf) or buf[lt + 1].isalpha() or buf[lt + 1] in "/!?"):
+                    break  # wait for the rest of the tag
+                self._text("<")
+                pos = lt + 1
+                continue
+            self._tag(m)
+            pos = m.end()
+        self._pending = [buf[pos:]] if pos < len(buf) else []
+
+    def _text(self, text):
+        if self._skip is not None:
+            self._skip[2].append(text)
+            return
+        pos = 0
+        for m in _HTML_PROTECTED.finditer(text):
+            self._run.add_text(text[pos:m.start()])
+            value = html.unescape(m.group()) if m.group().startswith("&") else ""
+            if value.isalpha():
+                # Accented letters and the like are part of the words
+                self._run.add_text(value, m.group())
+            else:
+                self._run.add_token(m.group())
+            pos = m.end()
+        self._run.add_text(text[pos:])
+
+    def _tag(self, m):
+        raw, name = m.group(), (m.group(2) or "").lower()
+        closing = bool(m.group(1))
+        opens = name and not closing and name not in _VOID and not raw.endswith("/>")
+        if self._skip is not None:
+            skip = self._skip
+            skip[2].append(raw)
+            if name == skip[0]:
+                skip[1] += 1 if opens else -1 if closing else 0
+            if skip[1] == 0:
+                self._skip = None
+                self._emit("".join(skip[2]), skip[3])
+            return
+        if not name:
+            # Comment, doctype, processing instruction
+            self._run.add_token(raw)
+        elif name in _RAW_TEXT and opens:
+            self._verbatim(raw)
+            self._raw_end = re.compile(rf"</{re.escape(name)}\s*>", re.I)
+        elif opens and (name in _NO_TRANSLATE or name == "pre" or _NO_TRANSLATE_ATTR.search(m.group(3))):
+            inline = name in _INLINE or name in _NO_TRANSLATE
+            if not inline:
+                self._flush()
+            self._skip = [name, 1, [raw], inline]
+        elif name in _INLINE:
+            self._run.add_token(raw)
+        else:
+            self._verbatim(raw)
+
+    def _emit(self, raw, inline):
+        if inline:
+            self._run.add_token(raw)
+        else:
+            self._verbatim(raw)
+
+    def _verbatim(self, raw):
+        self._flush()
+        self._out.append(raw)
+
+    def _flush(self):
+        self._out.extend(self._run.pieces())
+
+
+_LINE = re.compile(r"[^\n]*\n")
+
+
+class _LineDocument:
+    """Line-oriented incremental parser; subclasses handle one line at a time."""
+
+    protected = None
+
+    def __init__(self):
+        self._pending = []  # the line being read, in chunks
+        self._out = []
+        self._run = None
+        self._tail = ""  # trailing whitespace and line ending of the run's last line
+
+    def feed(self, text):
+        end = text.rfind("\n") + 1
+        if not end:
+            self._pending.append(text)
+            return []
+        lines = "".join(self._pending) + text[:end]
+        self._pending = [text[end:]] if end < len(text) else []
+        for line in _LINE.findall(lines):
+            self._line(line)
+        return _drain(self._out)
+
+    def close(self):
+        if self._pending:
+            self._line("".join(self._pending))
+            self._pending = []
+        self._flush()
+        return _drain(self._out)
+
+    def _line(self, line):
+        raise NotImplementedError
+
+    def _verbatim(self, raw):
+        self._flush()
+        self._out.append(raw)
+
+    def _start(self, prefix, text):
+        self._flush()
+        self._out.append(prefix)
+        self._run = _Run()
+        self._append(text)
+
+    def _extend(self, prefix, text):
+        self._run.add_break(self._tail + prefix)
+        self._append(text)
+
+    def _append(self, text):
+        body = text.rstrip()
+        self._run.add_masked(body, self.protected)
+        self._tail = text[len(body):]
+
+    def _flush(self):
+        if self._run is not None:
+            self._out.extend(self._run.pieces())
+            self._out.append(self._tail)
+            self._run = None
+            self._tail = ""
+
+
+_FENCE = re.compile(r"[ \t]{0,3}(`{3,}|~{3,})")
+_THEMATIC = re.compile(r"[ \t]{0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*$")
+_SETEXT = re.compile(r"[ \t]{0,3}(?:=+|-+)[ \t]*$")
+_TABLE_RULE = re.compile(r"[ \t]*\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)+\|?[ \t]*$")
+_LINK_DEF = re.compile(r"[ \t]{0,3}\[[^\]]+\]:[ \t]*\S")
+_MD_PREFIX = re.compile(
+    r"(?P<indent>[ \t]*)(?P<quote>(?:>[ \t]?)*)[ \t]*"
+    r"(?:(?P<marker>(?:[-*+]|\d{1,9}[.)])[ \t]+(?:\[[ xX]\][ \t]+)?)|(?P<heading>#{1,6}(?:[ \t]+|$)))?"
+)
+_MD_PROTECTED = re.compile(
+    r"(`+).+?\1"
+    r"|<!--.*?-->|</?[A-Za-z][^<>]*>"
+    r"|!?\[|\]\([^()\s]*(?:\([^()\s]*\)[^()\s]*)*(?:[ \t]+\"[^\"]*\")?\)|\]\[[^\]]*\]|\]"
+    rf"|{_URL}|{_ENTITY}"
+    r"|\\(?:[!-/:-@\[-`{-~]|$)"
+    r"|(?<!\w)(?:\*{1,3}|_{1,3})(?=\S)|(?<=\S)(?:\*{1,3}|_{1,3})(?!\w)"
+    r"|~~|\||\{\s*\d+\s*\}"
+)
+
+
+class MarkdownDocument(_LineDocument):
+    """Paragraphs, headings, list items, quotes and table rows are units; code and front matter are copied."""
+
+    protected = _MD_PROTECTED
+
+    def __init__(self):
+        super().__init__()
+        self._first = True
+        self._front_matter = False
+        self._fence = None
+        self._quote = 0
+        self._list = False
+
+    def _line(self, line):
+        text = line.rstrip("\r\n")
+        first, self._first = self._first, False
+        if self._fence is not None:
+            self._verbatim(line)
+            if text.strip().startswith(self._fence) and not text.strip().strip(self._fence[0]):
+                self._fence = None
+            return
+        if self._front_matter or (first and text.strip() == "---"):
+            self._verbatim(line)
+            self._front_matter = first or text.strip() not in ("---", "...")
+            return
+        fence = _FENCE.match(text)
+        if fence:
+            self._verbatim(line)
+            self._fence = fence.group(1)
+            return
+        if not text.strip():
+            self._verbatim(line)
+            return
+        if _THEMATIC.match(text) or _LINK_DEF.match(text) or (self._run is not None and _SETEXT.match(text)):
+            self._verbatim(line)
+            return
+        m = _MD_PREFIX.match(text)
+        prefix, body = m.group(), text[m.end():] + line[len(text):]
+        if m.group("marker"):
+            self._list = True
+        elif not m.group("indent") and not m.group("quote"):
+            self._list = self._list and self._run is not None
+        if self._run is None and not self._list and not m.group("marker") and len(m.group("indent").expandtabs(4)) >= 4:
+            # Indented code block
+            self._verbatim(line)
+            return
+        quote = m.group("quote").count(">")
+        if _TABLE_RULE.match(text):
+            self._verbatim(line)
+            return
+        table = "|" in body
+        if self._run is None or m.group("marker") or m.group("heading") is not None or table or quote != self._quote:
+            self._start(prefix, body)
+            self._quote = quote
+        else:
+            self._extend(prefix, body)
+        if m.group("heading") is not None or table or text.endswith(("  ", "\\")):
+            self._flush()
+
+
+_SUB_PROTECTED = re.compile(rf"</?[A-Za-z][^<>]*>|<\d[\d:.]*>|\{{\\[^{{}}]*\}}|\\[Nnh]|{_URL}|{_ENTITY}|\{{\s*\d+\s*\}}")
+_DIALOGUE = re.compile(r"[ \t]*[-‐–][ \t]*")
+
+
+class SubtitleDocument(_LineDocument):
+    """SRT or WebVTT: each cue's text is a unit (one per speaker for "- " dialogue lines).
+
+    Cue numbers, identifiers, timings, the WEBVTT header and NOTE/STYLE/REGION
+    blocks are copied; the translation is spread over as many lines as the cue had.
+    """
+
+    protected = _SUB_PROTECTED
+
+    def __init__(self):
+        super().__init__()
+        self._state = "start"  # start of a block, "head" (number/timing), "text" or "copy"
+
+    def _line(self, line):
+        text = line.rstrip("\r\n")
+        if not text.strip():
+            self._verbatim(line)
+            self._state = "start"
+            return
+        if self._state == "start":
+            keyword = text.split(None, 1)[0]
+            self._state = "copy" if keyword in ("WEBVTT", "NOTE", "STYLE", "REGION") else "head"
+        if self._state in ("copy", "head"):
+            self._verbatim(line)
+            if self._state == "head" and "-->" in text:
+                self._state = "text"
+            return
+        body = text + line[len(text):]
+        dash = _DIALOGUE.match(text)
+        if dash and dash.end() < len(text):
+            self._start(dash.group(), body[dash.end():])
+        elif self._run is None:
+            self._start("", body)
+        else:
+            self._extend("", body)
+
+
+_PARSERS = {"html": HTMLDocument, "markdown": MarkdownDocument, "srt": SubtitleDocument, "vtt": SubtitleDocument}
+
+
+def parser_for(fmt):
+    return _PARSERS[fmt]()
+
+
+def read_text(f, chunk_size=65536):
+    """Text chunks of the binary file ``f``, decoded as UTF-8 as they are read (a BOM is dropped)."""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    try:
+        while True:
+            data = f.read(chunk_size)
+            if not data:
+                break
+            yield decoder.decode(data)
+        yield decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise DocumentError("Document is not valid UTF-8")
+
+
+def parse(chunks, fmt):
+    """Pieces of a document given as an iterable of text chunks."""
+    document = parser_for(fmt)
+    for chunk in chunks:
+        yield from document.feed(chunk)
+    yield from document.close()
+
+
+def iter_windows(pieces, size=64):
+    """Group pieces into lists holding at most ``size`` units each."""
+    window, units = [], 0
+    for piece in pieces:
+        window.append(piece)
+        if isinstance(piece, Unit):
+            units += 1
+            if units >= size:
+                yield window
+                window, units = [], 0
+    if window:
+        yield window
+
+
+def units_of(pieces):
+    return [piece.text for piece in pieces if isinstance(piece, Unit)]
+
+
+def plain_text(pieces):
+    # The text runs without their placeholders, for language detection
+    return " ".join(_PLACEHOLDER.sub(" ", text) for text in units_of(pieces))
@@ -0,0 +1,344 @@
+"""Async provider engine: one keep-alive connection pool per provider host."""
+import asyncio
+import contextlib
+import os
+import time
+
+import aiohttp
+
+from .batching import BatchScheduler
+from .dispatch import DispatchConfig, TranslationFailed, dispatch
+from .health import HealthConfig, HealthRegistry
+from .metrics import FALLBACK_DEPTH, PROVIDER_CALLS, PROVIDER_SECONDS, record_stage, stage
+from .providers import ProviderError, build_providers
+from .quota import QuotaConfig, QuotaRegistry
+from .segmenter import Segment, iter_segments, rebuild
+
+# Successful calls needed before a provider's p95 is trusted for hedge delays
+MIN_SAMPLES_FOR_P95 = 20
+
+
+class QuotaExhausted(TranslationFailed):
+    """Every provider for the pair is out of quota budget or throttled; retry after ``retry_after`` seconds."""
+
+    def __init__(self, errors, retry_after):
+        super().__init__(errors)
+        self.retry_after = retry_after
+
+
+def _chars(payload):
+    return len(payload) if isinstance(payload, str) else sum(len(text) for text in payload)
+
+
+class ProviderEngine:
+    def __init__(
+        self,
+        providers,
+        max_connections=50,
+        keepalive_timeout=30.0,
+        dispatch_config=None,
+        health_config=None,
+        quota_config=None,
+        batch_concurrency=8,
+        batch_window=0.005,
+        batch_max=16,
+    ):
+        self.providers = list(providers)
+        # Upstream calls a single batch may have in flight at once
+        self.batch_concurrency = batch_concurrency
+        self.dispatch_config = dispatch_config or DispatchConfig()
+        self.health = HealthRegistry(self.providers, health_config)
+        self.quotas = QuotaRegistry(self.providers, quota_config)
+        # Concurrent single-text calls to batch-capable providers are merged per (provider, pair)
+        self.batcher = BatchScheduler(self._run_batch, batch_window, batch_max)
+        self.max_connections = max_connections
+        self.keepalive_timeout = keepalive_timeout
+        self._clients = {}
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        return cls(
+            build_providers(env),
+            max_connections=int(env.get("PROVIDER_MAX_CONNECTIONS", 50)),
+            keepalive_timeout=float(env.get("PROVIDER_KEEPALIVE_SECONDS", 30)),
+            dispatch_config=DispatchConfig.from_env(env),
+            health_config=HealthConfig.from_env(env),
+            quota_config=QuotaConfig.from_env(env),
+            batch_concurrency=int(env.get("BATCH_CONCURRENCY", 8)),
+            batch_window=float(env.get("TRANSLATE_BATCH_WINDOW_MS", 5)) / 1000,
+            batch_max=int(env.get("TRANSLATE_BATCH_MAX", 16)),
+        )
+
+    async def start(self):
+        for provider in self.providers:
+            if provider.needs_client and provider.host not in self._clients:
+                connector = aiohttp.TCPConnector(
+                    limit=self.max_connections,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=300,
+                )
+                self._clients[provider.host] = aiohttp.ClientSession(connector=connector)
+
+    async def close(self):
+        await self.batcher.close()
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.close()
+        for provider in self.providers:
+            await provider.close()
+
+    def client_for(self, provider):
+        if not provider.needs_client:
+            return None
+        try:
+            return self._clients[provider.host]
+        except KeyError:
+            raise RuntimeError("ProviderEngine.start() must be awaited before translating")
+
+    def candidates(self, source, target, chars=0):
+        # Supported providers, healthiest first, with open circuits and spent quota budgets skipped
+        supported = [p for p in self.providers if p.supports(source, target) and not self.quotas.get(p).wait(chars)]
+        return self.health.rank(supported)
+
+    def quota_wait(self, source, target, chars=0, skip=()):
+        """Seconds until some provider for the pair has budget again, when quotas are what's blocking it.
+
+        None when a provider could take the text now, or when the ones that can't
+        are held back by something else (circuit breaker, language support).
+        """
+        waits = []
+        for provider in self.providers:
+            if provider.name in skip or not provider.supports(source, target):
+                continue
+            wait = self.quotas.get(provider).wait(chars)
+            if not wait:
+                return None
+            waits.append(wait)
+        return min(waits) if waits else None
+
+    def _failure(self, errors, source, target, chars=0, skip=()):
+        # QuotaExhausted when the budgets are why nothing could translate, else TranslationFailed
+        wait = self.quota_wait(source, target, chars, skip)
+        if wait is not None:
+            return QuotaExhausted(errors or ["All providers are out of quota"], wait)
+        return TranslationFailed(errors)
+
+    def p95(self, provider):
+        health = self.health.get(provider)
+        if sum(1 for _, ok, _ in health.samples if ok) < MIN_SAMPLES_FOR_P95:
+            return None
+        return health.latency_percentile(95)
+
+    async def call(self, provider, text, source, target):
+        if self.batcher.applies(provider):
+            return await self.batcher.submit(provider, text, source, target)
+        return await self._guarded(provider, provider.translate, text, source, target)
+
+    async def _run_batch(self, provider, texts, source, target):
+        # A window that collected a single text is sent as a plain request
+        if len(texts) == 1:
+            return [await self._guarded(provider, provider.translate, texts[0], source, target)]
+        return await self.call_batch(provider, texts, source, target)
+
+    async def call_batch(self, provider, texts, source, target):
+        return await self._guarded(provider, provider.translate_batch, texts, source, target)
+
+    async def _guarded(self, provider, method, payload, source, target):
+        # Runs one provider request under its circuit breaker and records the outcome
+        health = self.health.get(provider)
+        if not health.acquire():
+            PROVIDER_CALLS.inc(provider.name, "circuit_open")
+            raise ProviderError(provider.name, "circuit_open", f"{provider.name}: circuit open")
+        quota = self.quotas.get(provider)
+        wait = quota.spend(_chars(payload))
+        if wait:
+            health.release()
+            PROVIDER_CALLS.inc(provider.name, "quota")
+            raise ProviderError(provider.name, "quota", f"{provider.name}: quota budget spent", retry_after=wait)
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            result = await method(self.client_for(provider), payload, source, target)
+        except ProviderError as e:
+            outcome = e.kind
+            if e.throttled:
+                outcome = "throttled"
+                quota.throttle(e.retry_after)
+            if e.is_provider_fault:
+                health.record_failure(time.perf_counter() - start)
+            else:
+                health.release()
+            raise
+        except BaseException as e:
+            # Cancelled (lost a race/hedge) or a bug: no verdict on the provider
+            outcome = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+            health.release()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            PROVIDER_CALLS.inc(provider.name, outcome)
+            PROVIDER_SECONDS.observe(elapsed, provider.name)
+            record_stage("provider", elapsed, f"{provider.name} {outcome}")
+        health.record_success(elapsed)
+        return result
+
+    async def translate(self, text, source, target, strategy=None, skip=()):
+        strategy = strategy or self.dispatch_config.strategy
+        candidates = [p for p in self.candidates(source, target, len(text)) if p.name not in skip]
+        if not candidates:
+            skipped = [p for p in self.providers if p.supports(source, target) and p.name not in skip]
+            errors = [
+                f"{p.name}: quota budget spent" if self.quotas.get(p).wait(len(text)) else f"{p.name}: circuit open"
+                for p in skipped
+            ]
+            raise self._failure(errors, source, target, len(text), skip)
+        attempts = 0
+
+        def call(provider):
+            nonlocal attempts
+            attempts += 1
+            return self.call(provider, text, source, target)
+
+        try:
+            _, translated = await dispatch(candidates, call, strategy, self.dispatch_config, self.p95)
+        except TranslationFailed as e:
+            FALLBACK_DEPTH.observe(attempts, "failed")
+            raise self._failure(e.errors, source, target, len(text), skip)
+        FALLBACK_DEPTH.observe(attempts, "ok")
+        return translated
+
+    async def translate_with_memory(self, memory, text, source, target, strategy=None, max_len=450, semaphore=None):
+        """Translate sentence by sentence, reusing what ``memory`` (a ``TranslationMemory``) knows.
+
+        Only the sentences the memory misses are sent upstream, and their
+        translations are stored for next time. ``semaphore`` bounds the
+        upstream calls, as in ``translate_segments``.
+        """
+        if memory is None or source == "auto":
+            async with semaphore or contextlib.nullcontext():
+                return await self.translate(text, source, target, strategy=strategy)
+        segments = list(iter_segments(text, max_len, pack=False))
+        return await self.translate_segments(segments, source, target, strategy, memory, semaphore)
+
+    async def translate_segments(self, segments, source, target, strategy=None, memory=None, semaphore=None):
+        """Translate an already segmented text and rebuild it; ``memory`` may be None.
+
+        Contiguous misses are sent as one text, with their original spacing, so
+        the provider packs them up to its own ``max_chars``: a text the memory
+        knows nothing of costs as many calls as it would without a memory.
+        ``semaphore`` bounds the upstream calls, so callers translating the
+        same segments into several languages can share one budget.
+        """
+        merged = []
+        runs = {}
+        run = []
+
+        def close_run():
+            if run:
+                text = run[0].text + "".join(seg.leading + seg.text for seg in run[1:])
+                merged.append(Segment(run[0].leading, text))
+                runs.setdefault(text, [seg.text for seg in run])
+                run.clear()
+
+        with stage("memory_lookup"):
+            texts = list(dict.fromkeys(seg.text for seg in segments if seg.text))
+            if memory is not None:
+                # SQLite (and the fuzzy candidate scoring) stays off the event loop
+                found = await asyncio.to_thread(memory.lookup_many, texts, source, target)
+            else:
+                found = dict.fromkeys(texts)
+            for seg in segments:
+                if seg.text and found[seg.text] is None:
+                    run.append(seg)
+                    continue
+                close_run()
+                merged.append(seg)
+            close_run()
+        misses = list(runs)
+        errors = []
+        if len(misses) == 1:
+            async with semaphore or contextlib.nullcontext():
+                found[misses[0]] = await self.translate(misses[0], source, target, strategy=strategy)
+        elif misses:
+            results = await self.translate_batch([(miss, source, target) for miss in misses], strategy, semaphore)
+            for miss, (translated, error) in zip(misses, results):
+                if error:
+                    errors.append(error)
+                else:
+                    found[miss] = translated
+        if memory is not None:
+            pairs = [
+                pair
+                for miss, sentences in runs.items()
+                if found.get(miss) is not None
+                for pair in self._aligned(sentences, found[miss])
+            ]
+            if pairs:
+                await asyncio.to_thread(memory.store_many, pairs, source, target)
+        if errors:
+            raise self._failure(list(dict.fromkeys(errors)), source, target)
+        return rebuild(merged, [found[seg.text] for seg in merged if seg.text])
+
+    @staticmethod
+    def _aligned(sentences, translated):
+        # A run is stored sentence by sentence when its translation splits into as many
+        # sentences; otherwise there is no telling which part belongs to which
+        if len(sentences) > 1:
+            parts = [seg.text for seg in iter_segments(translated, None, pack=False) if seg.text]
+            if len(parts) != len(sentences):
+                return []
+        else:
+            parts = [translated]
+        return list(zip(sentences, parts))
+
+    async def translate_batch(self, items, strategy=None, semaphore=None):
+        """Translate (text, source, target) items; returns (translated, error) pairs in input order.
+
+        Items are grouped by language pair. Batch-capable providers get each
+        group in list-valued requests first; whatever they don't translate
+        falls back to the regular per-item chain. All upstream calls share
+        ``semaphore``, or ``batch_concurrency`` when none is given.
+        """
+        results = [None] * len(items)
+        batch_errors = {}
+        sem = semaphore or asyncio.Semaphore(self.batch_concurrency)
+        groups = {}
+        for i, (_, source, target) in enumerate(items):
+            groups.setdefault((source, target), []).append(i)
+
+        async def run_sub_batch(provider, indices, source, target):
+            try:
+                async with sem:
+                    outs = await self.call_batch(provider, [items[i][0] for i in indices], source, target)
+            except ProviderError as e:
+                for i in indices:
+                    batch_errors[i] = str(e)
+                return indices
+            for i, out in zip(indices, outs):
+                results[i] = (out, None)
+            return []
+
+        async def run_single(i, source, target, tried):
+            async with sem:
+                try:
+                    results[i] = (await self.translate(items[i][0], source, target, strategy, skip=tried), None)
+                except TranslationFailed as e:
+                    errors = ([batch_errors[i]] if i in batch_errors else []) + e.errors
+                    results[i] = (None, "; ".join(errors) or "Translation failed")
+
+        async def run_group(source, target, pending):
+            tried = set()
+            for provider in self.candidates(source, target):
+                if not provider.supports_batch or not pending:
+                    continue
+                tried.add(provider.name)
+                size = provider.max_batch
+                leftovers = await asyncio.gather(
+                    *(run_sub_batch(provider, pending[k:k + size], source, target) for k in range(0, len(pending), size))
+                )
+                pending = [i for chunk in leftovers for i in chunk]
+            await asyncio.gather(*(run_single(i, source, target, tried) for i in pending))
+
+        await asyncio.gather(*(run_group(source, target, indices) for (source, target), indices in groups.items()))
+        return results
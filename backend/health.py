@@ -0,0 +1,197 @@
+"""Per-provider health: rolling latency/error window and a circuit breaker.
+
+Breaker states:
+- closed: requests flow normally
+- open: the provider is skipped until its cooldown expires
+- half_open: one probe request is let through; success closes, failure re-opens
+  with a doubled cooldown
+"""
+import os
+import time
+from collections import deque
+
+from .stats import percentile
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+
+class HealthConfig:
+    def __init__(
+        self,
+        window_size=200,
+        window_seconds=300.0,
+        failure_threshold=5,
+        error_rate_threshold=0.5,
+        min_samples=10,
+        cooldown=30.0,
+        max_cooldown=600.0,
+        ordering="health",
+    ):
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        # "health" ranks providers by expected latency; "static" keeps the configured order
+        self.ordering = ordering
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        return cls(
+            window_size=int(env.get("HEALTH_WINDOW_SIZE", 200)),
+            window_seconds=float(env.get("HEALTH_WINDOW_SECONDS", 300)),
+            failure_threshold=int(env.get("CIRCUIT_FAILURE_THRESHOLD", 5)),
+            error_rate_threshold=float(env.get("CIRCUIT_ERROR_RATE", 0.5)),
+            min_samples=int(env.get("CIRCUIT_MIN_SAMPLES", 10)),
+            cooldown=float(env.get("CIRCUIT_COOLDOWN_SECONDS", 30)),
+            max_cooldown=float(env.get("CIRCUIT_MAX_COOLDOWN_SECONDS", 600)),
+            ordering=env.get("PROVIDER_ORDERING", "health").strip().lower(),
+        )
+
+
+class ProviderHealth:
+    def __init__(self, name, config, clock=time.monotonic):
+        self.name = name
+        self.config = config
+        self.clock = clock
+        self.samples = deque(maxlen=config.window_size)  # (timestamp, ok, latency)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.current_cooldown = config.cooldown
+        self.probe_in_flight = False
+
+    def _window(self):
+        cutoff = self.clock() - self.config.window_seconds
+        while self.samples and self.samples[0][0] < cutoff:
+            self.samples.popleft()
+        return self.samples
+
+    def error_rate(self):
+        window = self._window()
+        if not window:
+            return 0.0
+        return sum(1 for _, ok, _ in window if not ok) / len(window)
+
+    def latency_percentile(self, pct):
+        latencies = [lat for _, ok, lat in self._window() if ok]
+        return percentile(latencies, pct) if latencies else None
+
+    def _cooled_down(self):
+        return self.clock() - self.opened_at >= self.current_cooldown
+
+    def available(self):
+        # Open circuits are skipped until their cooldown expires
+        if self.state == OPEN:
+            return self._cooled_down()
+        if self.state == HALF_OPEN:
+            return not self.probe_in_flight
+        return True
+
+    def acquire(self):
+        # Called right before a request; a cooled-down open circuit admits a single probe
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and self._cooled_down():
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def release(self):
+        # The request was cancelled (e.g. lost a race); it says nothing about health
+        self.probe_in_flight = False
+
+    def record_success(self, latency):
+        self.samples.append((self.clock(), True, latency))
+        self.consecutive_failures = 0
+        if self.state != CLOSED:
+            self.state = CLOSED
+            self.current_cooldown = self.config.cooldown
+            self.opened_at = None
+        self.probe_in_flight = False
+
+    def record_failure(self, latency):
+        self.samples.append((self.clock(), False, latency))
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self.current_cooldown = min(self.current_cooldown * 2, self.config.max_cooldown)
+            self._trip()
+        elif self.state == CLOSED and self._should_trip():
+            self._trip()
+        self.probe_in_flight = False
+
+    def _should_trip(self):
+        if self.consecutive_failures >= self.config.failure_threshold:
+            return True
+        window = self._window()
+        return len(window) >= self.config.min_samples and self.error_rate() >= self.config.error_rate_threshold
+
+    def _trip(self):
+        self.state = OPEN
+        self.opened_at = self.clock()
+
+    def expected_latency(self):
+        # Median latency inflated by the error rate; untried providers rank first so they get
+        # sampled, providers with only failures in the window rank last
+        p50 = self.latency_percentile(50)
+        if p50 is None:
+            return float("inf") if self._window() else 0.0
+        return p50 / max(1.0 - self.error_rate(), 0.05)
+
+    def snapshot(self):
+        window = list(self._window())
+        histogram = {}
+        for bound in LATENCY_BUCKETS:
+            label = "+Inf" if bound == float("inf") else str(bound)
+            histogram[label] = sum(1 for _, _, lat in window if lat <= bound)
+        p50 = self.latency_percentile(50)
+        p95 = self.latency_percentile(95)
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = round(max(0.0, self.current_cooldown - (self.clock() - self.opened_at)), 1)
+        return {
+            "name": self.name,
+            "state": self.state,
+            "samples": len(window),
+            "error_rate": round(self.error_rate(), 4),
+            "consecutive_failures": self.consecutive_failures,
+            "p50_ms": round(p50 * 1000, 2) if p50 is not None else None,
+            "p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "latency_histogram": histogram,
+            "retry_in_seconds": retry_in,
+        }
+
+
+class HealthRegistry:
+    def __init__(self, providers, config=None, clock=time.monotonic):
+        self.config = config or HealthConfig()
+        self.clock = clock
+        self._health = {}
+        for provider in providers:
+            self.get(provider)
+
+    def get(self, provider):
+        health = self._health.get(provider.name)
+        if health is None:
+            health = self._health[provider.name] = ProviderHealth(provider.name, self.config, self.clock)
+        return health
+
+    def rank(self, providers):
+        available = [p for p in providers if self.get(p).available()]
+        if self.config.ordering == "static":
+            return available
+        # sorted() is stable, so ties keep the configured order
+        return sorted(available, key=lambda p: self.get(p).expected_latency())
+
+    def snapshot(self):
+        return [health.snapshot() for health in self._health.values()]
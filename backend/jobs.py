@@ -0,0 +1,613 @@
+"""Bulk translation jobs: a persistent SQLite work queue and the worker processes that drain it.
+
+A job is a plain-text document (split into sentence segments), a JSONL file
+(one text per line) or a CSV file (one text per row). Submitting one stores
+every unit of work in SQLite in a single transaction and returns its id.
+Worker processes claim pending units in small batches under a lease,
+translate them through the regular provider chain and write the results
+back batch by batch. Each batch is a checkpoint: after a crash, units whose
+lease expired are claimed again and everything already written stays done.
+Failed units are retried with backoff before they are given up.
+
+Workers are started by the API process (``JOB_WORKERS``) or on their own,
+possibly on another machine sharing the database file::
+
+    python -m backend.jobs --workers 4
+"""
+import argparse
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import namedtuple
+
+from .segmenter import iter_segments
+
+FORMATS = ("text", "jsonl", "csv")
+MEDIA_TYPES = {"text": "text/plain; charset=utf-8", "jsonl": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+EXTENSIONS = {"text": "txt", "jsonl": "jsonl", "csv": "csv"}
+# Units inserted per executemany() and rows read per page of a download
+INSERT_BATCH = 1000
+PAGE_SIZE = 1000
+
+log = logging.getLogger(__name__)
+
+Unit = namedtuple("Unit", "id job_id text source target attempts")
+
+
+def db_path_from_env(environ=None):
+    env = os.environ if environ is None else environ
+    return env.get("JOBS_DB") or os.path.join(tempfile.gettempdir(), "translator-jobs.sqlite3")
+
+
+class JobError(ValueError):
+    """The submitted file can't be turned into a job (bad encoding, JSON, missing column...)."""
+
+
+def format_for(content_type, name=None):
+    # Job format from an explicit name or the upload's Content-Type
+    if name:
+        if name not in FORMATS:
+            raise JobError(f"Unknown format {name!r}; expected one of {', '.join(FORMATS)}")
+        return name
+    media = (content_type or "").split(";")[0].strip().lower()
+    if media in ("text/csv", "application/csv"):
+        return "csv"
+    if media in ("application/x-ndjson", "application/jsonl", "application/json-lines", "application/x-jsonlines"):
+        return "jsonl"
+    return "text"
+
+
+def _text_units(f, options):
+    # (idx, text, extra): the segment's leading whitespace goes in extra
+    text = f.read()
+    for i, seg in enumerate(iter_segments(text, options.get("segment_chars", 450))):
+        yield i, seg.text, seg.leading
+
+
+def _jsonl_units(f, options):
+    field = options["field"]
+    idx = 0
+    for lineno, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise JobError(f"line {lineno}: invalid JSON")
+        if isinstance(record, str):
+            yield idx, record, None
+        elif isinstance(record, dict) and isinstance(record.get(field), str):
+            yield idx, record[field], line
+        else:
+            raise JobError(f"line {lineno}: expected a string or an object with a {field!r} string")
+        idx += 1
+
+
+def _csv_units(f, options):
+    reader = csv.reader(f)
+    header = next(reader, None)
+    if not header:
+        raise JobError("CSV file is empty")
+    column = options["column"]
+    if column not in header:
+        raise JobError(f"CSV has no {column!r} column (columns: {', '.join(header)})")
+    options["header"] = header
+    col = header.index(column)
+    for i, row in enumerate(reader):
+        yield i, row[col] if col < len(row) else "", json.dumps(row, ensure_ascii=False)
+
+
+_PARSERS = {"text": _text_units, "jsonl": _jsonl_units, "csv": _csv_units}
+
+
+class JobStore:
+    """Jobs and their units in one SQLite file, safe to share between processes."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # A generous busy timeout: workers in other processes write to the same file
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, format TEXT NOT NULL, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+            "status TEXT NOT NULL, total INTEGER NOT NULL, done INTEGER NOT NULL DEFAULT 0, "
+            "failed INTEGER NOT NULL DEFAULT 0, options TEXT NOT NULL, created REAL NOT NULL, finished REAL)"
+        )
+        # state: pending (claimable from available_at), claimed (lease ends at available_at), done, failed
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS units ("
+            "id INTEGER PRIMARY KEY, job_id TEXT NOT NULL, idx INTEGER NOT NULL, text TEXT NOT NULL, "
+            "extra TEXT, state TEXT NOT NULL, available_at REAL NOT NULL, worker TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, translated TEXT, error TEXT)"
+        )
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS units_job ON units (job_id, idx)")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS units_open ON units (available_at) WHERE state IN ('pending', 'claimed')"
+        )
+
+    @classmethod
+    def from_env(cls, environ=None):
+        return cls(db_path_from_env(environ))
+
+    def _transaction(self, mode=""):
+        return _Transaction(self._conn, self._lock, mode)
+
+    def create(self, f, fmt, source_lang, target_lang, options=None):
+        """Store a job read from the binary file ``f``; returns its description."""
+        options = {"field": "text", "column": "text", **(options or {})}
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+        total = done = 0
+        try:
+            with self._transaction("IMMEDIATE") as conn:
+                batch = []
+                for idx, segment, extra in _PARSERS[fmt](text, options):
+                    # Empty segments (trailing whitespace, blank cells) need no translation
+                    state = "pending" if segment.strip() else "done"
+                    done += state == "done"
+                    batch.append((job_id, idx, segment, extra, state, now, segment if state == "done" else None))
+                    if len(batch) >= INSERT_BATCH:
+                        total += self._insert_units(conn, batch)
+                        batch = []
+                total += self._insert_units(conn, batch)
+                if not total:
+                    raise JobError("Nothing to translate")
+                status = "done" if done == total else "queued"
+                conn.execute(
+                    "INSERT INTO jobs (id, format, source_lang, target_lang, status, total, done, options, created, "
+                    "finished) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, fmt, source_lang, target_lang, status, total, done, json.dumps(options), now,
+                     now if status == "done" else None),
+                )
+        except UnicodeDecodeError:
+            raise JobError("File is not valid UTF-8")
+        except csv.Error as e:
+            raise JobError(f"Invalid CSV: {e}")
+        finally:
+            text.detach()
+        return self.get(job_id)
+
+    def _insert_units(self, conn, rows):
+        conn.executemany(
+            "INSERT INTO units (job_id, idx, text, extra, state, available_at, translated) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        return len(rows)
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, format, source_lang, target_lang, status, total, done, failed, created, finished "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        job_id, fmt, source, target, status, total, done, failed, created, finished = row
+        return {
+            "id": job_id,
+            "format": fmt,
+            "source_lang": source,
+            "target_lang": target,
+            "status": status,
+            "total": total,
+            "done": done,
+            "failed": failed,
+            "progress": round((done + failed) / total, 4) if total else 1.0,
+            "created": created,
+            "finished": finished,
+        }
+
+    def delete(self, job_id):
+        with self._transaction("IMMEDIATE") as conn:
+            conn.execute("DELETE FROM units WHERE job_id = ?", (job_id,))
+            return conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount > 0
+
+    def claim(self, worker, limit, lease):
+        """Lease up to ``limit`` claimable units (pending, or claimed with an expired lease) to ``worker``."""
+        now = time.time()
+        with self._transaction("IMMEDIATE") as conn:
+            rows = conn.execute(
+                "UPDATE units SET state = 'claimed', worker = ?, available_at = ?, attempts = attempts + 1 "
+                "WHERE id IN (SELECT id FROM units WHERE state IN ('pending', 'claimed') AND available_at <= ? "
+                "ORDER BY available_at LIMIT ?) RETURNING id, job_id, text, attempts",
+                (worker, now + lease, now, limit),
+            ).fetchall()
+            if not rows:
+                return []
+            job_ids = sorted({job_id for _, job_id, _, _ in rows})
+            marks = ",".join("?" * len(job_ids))
+            pairs = dict(
+                (job_id, (source, target))
+                for job_id, source, target in conn.execute(
+                    f"SELECT id, source_lang, target_lang FROM jobs WHERE id IN ({marks})", job_ids
+                )
+            )
+            conn.execute(f"UPDATE jobs SET status = 'running' WHERE id IN ({marks}) AND status = 'queued'", job_ids)
+        return [Unit(uid, job_id, text, *pairs[job_id], attempts) for uid, job_id, text, attempts in rows if job_id in pairs]
+
+    def complete(self, worker, results, max_attempts=3, retry_delay=5.0):
+        """Checkpoint ``(unit, translated, error)`` results of units leased to ``worker``.
+
+        Failed units go back to the queue with exponential backoff until they
+        have been tried ``max_attempts`` times. Results for units whose lease was
+        lost to another worker are dropped.
+        """
+        now = time.time()
+        counts = {}  # job id -> [done, failed]
+        with self._transaction("IMMEDIATE") as conn:
+            for unit, translated, error in results:
+                if error is None:
+                    state, args = "done", (translated, None, now)
+                elif unit.attempts < max_attempts:
+                    state, args = "pending", (None, error, now + retry_delay * 2 ** (unit.attempts - 1))
+                else:
+                    state, args = "failed", (None, error, now)
+                updated = conn.execute(
+                    "UPDATE units SET state = ?, translated = ?, error = ?, available_at = ?, worker = NULL "
+                    "WHERE id = ? AND state = 'claimed' AND worker = ?",
+                    (state, *args, unit.id, worker),
+                ).rowcount
+                if updated and state != "pending":
+                    counts.setdefault(unit.job_id, [0, 0])[state == "failed"] += 1
+            for job_id, (done, failed) in counts.items():
+                conn.execute(
+                    "UPDATE jobs SET done = done + ?, failed = failed + ?, "
+                    "status = CASE WHEN done + failed + ? + ? >= total THEN 'done' ELSE status END, "
+                    "finished = CASE WHEN done + failed + ? + ? >= total THEN ? ELSE finished END WHERE id = ?",
+                    (done, failed, done, failed, done, failed, now, job_id),
+                )
+
+    def release(self, worker, unit_ids=None, delay=0.0):
+        # Hand a worker's leases (all of them, or just ``unit_ids``) back, claimable after ``delay``,
+        # instead of waiting for them to expire; the attempt they were claimed for isn't counted
+        query = (
+            "UPDATE units SET state = 'pending', worker = NULL, available_at = ?, attempts = attempts - 1 "
+            "WHERE state = 'claimed' AND worker = ?"
+        )
+        args = [time.time() + delay, worker]
+        with self._transaction("IMMEDIATE") as conn:
+            if unit_ids is None:
+                conn.execute(query, args)
+            else:
+                conn.executemany(f"{query} AND id = ?", [(*args, uid) for uid in unit_ids])
+
+    def iter_result(self, job_id):
+        """Yield the job's output in chunks, reading the units page by page."""
+        with self._lock:
+            row = self._conn.execute("SELECT format, options FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return
+        fmt, options = row[0], json.loads(row[1])
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(options["header"] + ["translated_text", "error"])
+            yield buf.getvalue()
+        last = -1
+        while True:
+            with self._lock:
+                page = self._conn.execute(
+                    "SELECT idx, text, extra, translated, error FROM units WHERE job_id = ? AND idx > ? "
+                    "ORDER BY idx LIMIT ?",
+                    (job_id, last, PAGE_SIZE),
+                ).fetchall()
+            if not page:
+                return
+            last = page[-1][0]
+            if fmt == "text":
+                # Failed segments keep their source text so the document stays whole
+                yield "".join(extra + (text if translated is None else translated) for _, text, extra, translated, _ in page)
+            elif fmt == "jsonl":
+                lines = []
+                for _, text, extra, translated, error in page:
+                    record = json.loads(extra) if extra else {"text": text}
+                    record.update({"translated_text": translated} if error is None else {"error": error})
+                    lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+                yield "".join(lines)
+            else:
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                for _, _, extra, translated, error in page:
+                    writer.writerow(json.loads(extra) + [translated or "", error or ""])
+                yield buf.getvalue()
+
+    def has_open_units(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM units WHERE state IN ('pending', 'claimed') LIMIT 1"
+            ).fetchone() is not None
+
+    def stats(self):
+        with self._lock:
+            jobs = dict(self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall())
+            open_units = self._conn.execute(
+                "SELECT COUNT(*) FROM units WHERE state IN ('pending', 'claimed')"
+            ).fetchone()[0]
+        return {"jobs": jobs, "open_units": open_units}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    # Holds the connection lock for the whole transaction; rolls back on error
+    def __init__(self, conn, lock, mode):
+        self.conn = conn
+        self.lock = lock
+        self.mode = mode
+
+    def __enter__(self):
+        self.lock.acquire()
+        try:
+            self.conn.execute(f"BEGIN {self.mode}")
+        except BaseException:
+            self.lock.release()
+            raise
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.lock.release()
+
+
+class JobWorker:
+    """Claims units from a ``JobStore`` and translates them through a ``ProviderEngine``.
+
+    ``concurrency`` claim-translate-checkpoint loops run side by side, so one
+    process keeps several upstream batches in flight.
+    """
+
+    def __init__(
+        self,
+        store,
+        engine,
+        cache=None,
+        batch_size=32,
+        concurrency=4,
+        lease=120.0,
+        poll_interval=0.5,
+        max_attempts=3,
+        retry_delay=5.0,
+        min_confidence=0.5,
+    ):
+        self.store = store
+        self.engine = engine
+        self.cache = cache
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        # "auto" units are resolved by the local detector when it is at least this sure
+        self.min_confidence = min_confidence
+        self.name = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.failed_batches = 0
+
+    @classmethod
+    def from_env(cls, store, environ=None):
+        from .cache import TranslationCache
+        from .engine import ProviderEngine
+
+        env = os.environ if environ is None else environ
+        return cls(
+            store,
+            ProviderEngine.from_env(env),
+            cache=TranslationCache.from_env(env),
+            batch_size=int(env.get("JOB_BATCH_SIZE", 32)),
+            concurrency=int(env.get("JOB_WORKER_CONCURRENCY", 4)),
+            lease=float(env.get("JOB_LEASE_SECONDS", 120)),
+            poll_interval=float(env.get("JOB_POLL_SECONDS", 0.5)),
+            max_attempts=int(env.get("JOB_MAX_ATTEMPTS", 3)),
+            retry_delay=float(env.get("JOB_RETRY_DELAY_SECONDS", 5)),
+            min_confidence=float(env.get("DETECT_MIN_CONFIDENCE", 0.5)),
+        )
+
+    async def run(self, stop):
+        """Work until the ``stop`` event is set, then hand unfinished leases back."""
+        await self.engine.start()
+        try:
+            await asyncio.gather(*(self._loop(stop) for _ in range(self.concurrency)))
+        finally:
+            await asyncio.to_thread(self.store.release, self.name)
+            await self.engine.close()
+
+    async def _loop(self, stop):
+        while not stop.is_set():
+            units = []
+            try:
+                units = await asyncio.to_thread(self.store.claim, self.name, self.batch_size, self.lease)
+                if units:
+                    results = await self.process(units)
+                    await asyncio.to_thread(self.store.complete, self.name, results, self.max_attempts, self.retry_delay)
+                    continue
+            except Exception:
+                # A failed batch ("database is locked", an engine bug...) must not end the loop: its
+                # units go back to the queue and the loop carries on after a pause
+                self.failed_batches += 1
+                log.exception("job worker %s: batch of %d units failed", self.name, len(units))
+                await self._release(units)
+            try:
+                await asyncio.wait_for(stop.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _release(self, units):
+        if not units:
+            return
+        try:
+            await asyncio.to_thread(self.store.release, self.name, [unit.id for unit in units], self.retry_delay)
+        except Exception:
+            # Their leases expire on their own
+            log.exception("job worker %s: could not release %d units", self.name, len(units))
+
+    async def process(self, units):
+        """Translate ``units``; returns ``(unit, translated, error)`` in the same order."""
+        from .langdetect import detect_batch, load_profiles, resolve_source
+
+        pairs = [(unit.source, unit.target) for unit in units]
+        auto = [i for i, (source, _) in enumerate(pairs) if source == "auto"]
+        if auto:
+            # The first load reads the profiles from disk; off the loop so the other batches keep going
+            await asyncio.to_thread(load_profiles)
+        for i, detection in zip(auto, detect_batch([units[i].text for i in auto]) if auto else []):
+            source, target = pairs[i]
+            pairs[i] = (resolve_source(source, target, detection, self.min_confidence), target)
+        found = {}
+        misses = {}  # (text, source, target) -> unit indices
+        for i, (unit, (source, target)) in enumerate(zip(units, pairs)):
+            if source == target:
+                found[i] = (unit.text, None)
+                continue
+            cached = self.cache.get(unit.text, source, target) if self.cache is not None else None
+            if cached is not None:
+                found[i] = (cached, None)
+            else:
+                misses.setdefault((unit.text, source, target), []).append(i)
+        if misses:
+            requests = list(misses)
+            outcomes = await self.engine.translate_batch(requests)
+            for request, (translated, error) in zip(requests, outcomes):
+                if translated and self.cache is not None:
+                    self.cache.set(*request, translated)
+                for i in misses[request]:
+                    found[i] = (translated, None) if translated else (None, error or "Translation failed")
+        return [(unit, *found[i]) for i, unit in enumerate(units)]
+
+
+def run_worker(db_path):
+    """Run one worker in this process; SIGTERM/SIGINT stop it after its current batches."""
+    store = JobStore(db_path)
+    # Quota budgets default to the job database, so workers and the API spend one daily budget
+    worker = JobWorker.from_env(store, {"QUOTA_DB": db_path, **os.environ})
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        await worker.run(stop)
+
+    try:
+        asyncio.run(main())
+    finally:
+        store.close()
+
+
+def start_workers(count, db_path):
+    # Separate interpreters (`python -m backend.jobs --workers 1`), one per worker, started from
+    # the project root so the package is importable whatever the caller's working directory
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command = [sys.executable, "-m", "backend.jobs", "--workers", "1", "--db", db_path]
+    return [subprocess.Popen(command, cwd=root) for _ in range(count)]
+
+
+def stop_workers(processes, timeout=10.0):
+    for process in processes:
+        process.terminate()
+    deadline = time.monotonic() + timeout
+    for process in processes:
+        try:
+            process.wait(max(0.0, deadline - time.monotonic()))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+class WorkerPool:
+    """``count`` worker processes on ``db_path``; ``check`` restarts the ones that have died."""
+
+    def __init__(self, count, db_path):
+        self.count = count
+        self.db_path = db_path
+        self.processes = []
+        self.started = False
+        self.restarts = 0
+        self.last_exit_code = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Idempotent, so the API can call it on every submission
+        with self._lock:
+            if not self.started:
+                self.processes = start_workers(self.count, self.db_path)
+                self.started = True
+
+    def check(self):
+        # Meant to be called periodically, which also spaces out restarts of a worker that keeps crashing
+        for i, process in enumerate(self.processes):
+            code = process.poll()
+            if code is None:
+                continue
+            log.warning("job worker %d exited with code %s; starting a new one", process.pid, code)
+            self.last_exit_code = code
+            self.processes[i] = start_workers(1, self.db_path)[0]
+            self.restarts += 1
+
+    def stop(self, timeout=10.0):
+        stop_workers(self.processes, timeout)
+
+    def stats(self):
+        return {
+            "workers": self.count,
+            "started": self.started,
+            "alive": sum(1 for process in self.processes if process.poll() is None),
+            "restarts": self.restarts,
+            "last_exit_code": self.last_exit_code,
+        }
+
+
+def worker_count(value):
+    # "auto" (one per core) or a number
+    if str(value).strip().lower() == "auto":
+        return os.cpu_count() or 1
+    return max(0, int(value))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run bulk translation job workers")
+    parser.add_argument("--workers", default="auto", help="worker processes, or 'auto' for one per core")
+    parser.add_argument("--db", help="job database (default: JOBS_DB or <system temp>/translator-jobs.sqlite3)")
+    args = parser.parse_args()
+
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    db_path = args.db or db_path_from_env()
+    count = worker_count(args.workers)
+    if count == 1:
+        run_worker(db_path)
+        return
+    pool = WorkerPool(count, db_path)
+    pool.start()
+    print(f"{count} job workers on {db_path}")
+    try:
+        while True:
+            time.sleep(float(os.getenv("JOB_WORKER_CHECK_SECONDS", 5)))
+            pool.check()
+    except KeyboardInterrupt:
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""Seed text for the language detector (backend/langdetect.py).
+
+For languages that share a script, a short sample (the first article of the
+Universal Declaration of Human Rights where available) followed by frequent
+words. The detector derives its n-gram profiles from these once, on first use.
+"""
+
+SEED_TEXT = {
+    # Latin script
+    "en": (
+        "All human beings are born free and equal in dignity and rights. They are endowed with reason and "
+        "conscience and should act towards one another in a spirit of brotherhood. the of and to in is that it "
+        "was for on are with as his they be at one have this from or had by word but what some we can out other "
+        "were all there when up use your how said an each she which do their time if will way about many then "
+        "them write would like so these her long make thing see him two has look more day could go come did "
+        "number sound no most people my over know water than call first who may down side been now find"
+    ),
+    "fr": (
+        "Tous les êtres humains naissent libres et égaux en dignité et en droits. Ils sont doués de raison et de "
+        "conscience et doivent agir les uns envers les autres dans un esprit de fraternité. le de un être et à il "
+        "avoir ne je son que se qui ce dans en du elle au pour pas vous par sur faire plus dire me on mon lui nous "
+        "comme mais pouvoir avec tout y aller voir bien où sans tu ou leur homme si deux moi vouloir te femme venir "
+        "quand grand celui notre devoir là jour prendre même votre rien petit encore aussi quelque dont trouver "
+        "donner temps ça peu falloir sous parler alors sentir savoir c'est je suis qu'il"
+    ),
+    "es": (
+        "Todos los seres humanos nacen libres e iguales en dignidad y derechos y, dotados como están de razón y "
+        "conciencia, deben comportarse fraternalmente los unos con los otros. de la que el en y a los se del las "
+        "un por con no una su para es al lo como más pero sus le ya o este sí porque esta entre cuando muy sin "
+        "sobre también me hasta hay donde quien desde todo nos durante todos uno les ni contra otros ese eso ante "
+        "ellos esto mí antes algunos qué unos yo otro otras otra él tanto esa estos mucho quienes nada muchos cual "
+        "poco ella estar estas algunas algo nosotros señor año niño"
+    ),
+    "de": (
+        "Alle Menschen sind frei und gleich an Würde und Rechten geboren. Sie sind mit Vernunft und Gewissen "
+        "begabt und sollen einander im Geist der Brüderlichkeit begegnen. der die und in den von zu das mit sich "
+        "des auf für ist im dem nicht ein eine als auch es an werden aus er hat dass sie nach wird bei einer um am "
+        "sind noch wie einem über einen so zum war haben nur oder aber vor zur bis mehr durch man sein wurde sei "
+        "ich du wir ihr mich dich schon heute gut danke bitte Straße größer müssen schön können"
+    ),
+    "it": (
+        "Tutti gli esseri umani nascono liberi ed eguali in dignità e diritti. Essi sono dotati di ragione e di "
+        "coscienza e devono agire gli uni verso gli altri in spirito di fratellanza. di che è e la il un a per in "
+        "una mi sono ho non ma lo ha le si con cosa se io come da ti al ci questo qui hai bene tu era gli del mio "
+        "sei più della lei anche molto niente perché tutto quando fatto dei nel alla questa ancora solo stato già "
+        "grazie buongiorno"
+    ),
+    "pt": (
+        "Todos os seres humanos nascem livres e iguais em dignidade e em direitos. Dotados de razão e de "
+        "consciência, devem agir uns para com os outros em espírito de fraternidade. de a o que e do da em um "
+        "para é com não uma os no se na por mais as dos como mas foi ao ele das tem à seu sua ou ser quando muito "
+        "há nos já está eu também só pelo pela até isso ela entre era depois sem mesmo aos ter seus quem nas me "
+        "esse eles estão você tinha foram essa num nem suas meu às minha têm numa pelos elas havia seja qual será "
+        "nós tenho lhe deles então ação informação obrigado"
+    ),
+    "nl": (
+        "Alle mensen worden vrij en gelijk in waardigheid en rechten geboren. Zij zijn begiftigd met verstand en "
+        "geweten, en behoren zich jegens elkander in een geest van broederschap te gedragen. de en van ik te dat "
+        "die in een hij het niet zijn is was op aan met als voor had er maar om hem dan zou of wat mijn men dit zo "
+        "door over ze zich bij ook tot je mij uit der daar haar naar heb hoe heeft hebben deze u want nog zal me "
+        "zij nu geen omdat iets worden toch al waren veel meer doen toen moet ben zonder kan hun dus alles onder "
+        "ja eens hier wie werd altijd wordt kunnen ons zelf tegen niets uw iemand geweest andere bedankt"
+    ),
+    "af": (
+        "Alle menslike wesens word vry, met gelyke waardigheid en regte, gebore. Hulle het rede en gewete en "
+        "behoort in die gees van broederskap teenoor mekaar op te tree. die en van is in dat het nie met op vir "
+        "te wat hy sy ek jy ons hulle was sal kan moet ook maar om as by na uit daar hier nou baie goed dankie "
+        "asseblief waar hoe hoekom wanneer gaan kom wees gesê mense"
+    ),
+    "sv": (
+        "Alla människor är födda fria och lika i värde och rättigheter. De är utrustade med förnuft och samvete "
+        "och bör handla gentemot varandra i en anda av broderskap. och det att i en jag hon som han på den med "
+        "var sig för så till är men ett om hade de av icke mig du henne då sin nu har inte hans honom skulle "
+        "hennes där min man ej vid kunde något från ut när efter upp vi dem vara vad över än dig kan sina här ha "
+        "mot alla under någon eller allt mycket sedan ju denna själv detta åt utan varit hur ingen mitt ni bli "
+        "blev oss din dessa några deras blir mina samma vilken tack"
+    ),
+    "da": (
+        "Alle mennesker er født frie og lige i værdighed og rettigheder. De er udstyret med fornuft og "
+        "samvittighed, og de bør handle mod hverandre i en broderskabets ånd. og i jeg det at en den til er som "
+        "på de med han af for ikke der var mig sig men et har om vi min havde ham hun nu over da fra du ud sin "
+        "dem os op man hans hvor eller hvad skal selv her alle vil blev kunne ind når være dog noget ville jo "
+        "deres efter ned skulle denne end dette mit også under have dig anden hende mine alt meget sit sine vor "
+        "mod disse hvis din nogle hos blive mange ad bliver hendes været thi jer sådan tak"
+    ),
+    "no": (
+        "Alle mennesker er født frie og med samme menneskeverd og menneskerettigheter. De er utstyrt med "
+        "fornuft og samvittighet og bør handle mot hverandre i brorskapets ånd. og i jeg det at en et den til er "
+        "som på de med han av ikke der så var meg seg men har om vi min mitt ha hadde hun nå over da ved fra du "
+        "ut sin dem oss opp man kan hans hvor eller hva skal selv her alle vil bli ble blitt kunne inn når være "
+        "kom noen noe ville dere deres kun ja etter ned skulle denne deg sine sitt mot å meget hvorfor dette "
+        "disse uten hvordan ingen din ditt blir samme hvilken hvilke sånn mellom vår hver hvem hvis både bare "
+        "enn fordi før mange også slik vært takk"
+    ),
+    "fi": (
+        "Kaikki ihmiset syntyvät vapaina ja tasavertaisina arvoltaan ja oikeuksiltaan. Heille on annettu järki ja "
+        "omatunto, ja heidän on toimittava toisiaan kohtaan veljeyden hengessä. olla olen olet on olemme olette "
+        "ovat ole oli olisi ollut minä sinä hän me te he tämä tuo se nämä nuo ne kuka mikä mitä joka jotka että ja "
+        "jos koska kuin mutta niin sekä sillä tai vaan vai vaikka kanssa mukaan noin yli kun nyt itse myös vielä "
+        "hyvin paljon täällä siellä kiitos päivää"
+    ),
+    "et": (
+        "Kõik inimesed sünnivad vabadena ja võrdsetena oma väärikuselt ja õigustelt. Neile on antud mõistus ja "
+        "südametunnistus ja nende suhtumist üksteisesse peab kandma vendluse vaim. ja on ei et see ta kui oli ka "
+        "aga mis ma nii oma siis veel seda kes või nad tema mida ole sest juba üks kas nagu pole kõik mind sa "
+        "pärast ainult väga mulle temaga siin seal kus tänan tere"
+    ),
+    "hu": (
+        "Minden emberi lény szabadon születik és egyenlő méltósága és joga van. Az emberek, ésszel és "
+        "lelkiismerettel bírván, egymással szemben testvéri szellemben kell hogy viseltessenek. a az és hogy nem "
+        "is egy ez meg de csak van még volt már mint ha el kell fel ki sem azt mi lesz minden vagy ezt így nagyon "
+        "vagyok jó most itt hogyan miért akkor talán mert után között őt őket ők vele neki köszönöm"
+    ),
+    "pl": (
+        "Wszyscy ludzie rodzą się wolni i równi pod względem swej godności i swych praw. Są oni obdarzeni rozumem "
+        "i sumieniem i powinni postępować wobec innych w duchu braterstwa. i w nie na się z do to że jest o jak "
+        "ale co tak za od po już tylko jego był czy mnie przez może być są tym też ich jej nas przy dla tego "
+        "jeszcze bardzo wszystko gdzie kiedy tu było będzie jestem mam teraz który która które dlaczego żeby więc "
+        "ktoś każdy dzień dziękuję"
+    ),
+    "cs": (
+        "Všichni lidé rodí se svobodní a sobě rovní co do důstojnosti a práv. Jsou nadáni rozumem a svědomím a "
+        "mají spolu jednat v duchu bratrství. a se na to že je v s z do o jsem ale jak jsme tak by jsou co pro od "
+        "po jeho když jen už mě mi nebo který která které bylo byl byla také ještě jsi tady teď proč protože můžu "
+        "něco všechno všichni řekl člověk děkuji dobře"
+    ),
+    "sk": (
+        "Všetci ľudia sa rodia slobodní a sebe rovní, čo sa týka ich dôstojnosti a práv. Sú obdarení rozumom a "
+        "svedomím a mali by spolu jednať v bratskom duchu. a sa na je to že v s z do o som ale ako sme tak by sú "
+        "čo pre od po jeho keď len už ma mi alebo ktorý ktorá ktoré bolo bol bola tiež ešte si tu teraz prečo "
+        "pretože môžem niečo všetko všetci povedal človek ďakujem dobre ľudí"
+    ),
+    "sl": (
+        "Vsi ljudje se rodijo svobodni in imajo enako dostojanstvo in enake pravice. Obdarjeni so z razumom in "
+        "vestjo in bi morali ravnati drug z drugim kakor bratje. in je se na da v za ne so z pa to ki tudi bi ali "
+        "kot po še od sem kaj smo ga jih sta bil bila bilo lahko samo zelo kje kdaj zakaj hvala dobro vse vsi"
+    ),
+    "hr": (
+        "Sva ljudska bića rađaju se slobodna i jednaka u dostojanstvu i pravima. Ona su obdarena razumom i "
+        "sviješću pa jedna prema drugima trebaju postupati u duhu bratstva. i je u se na da za su od ne s o a to "
+        "kao ili što iz koji koja koje sam smo bi bio bila bilo će ćemo može samo još već kad gdje zašto hvala "
+        "dobro sve svi ali jer čak između"
+    ),
+    "ro": (
+        "Toate ființele umane se nasc libere și egale în demnitate și în drepturi. Ele sunt înzestrate cu "
+        "rațiune și conștiință și trebuie să se comporte unele față de altele în spiritul fraternității. și de la "
+        "în a să cu nu pe din o care că este mai pentru un al ce sunt fost au lui ei sau dar prin după acest "
+        "această când foarte aici acum unde cum mulțumesc bine"
+    ),
+    "ca": (
+        "Tots els éssers humans neixen lliures i iguals en dignitat i en drets. Són dotats de raó i de "
+        "consciència, i han de comportar-se fraternalment els uns amb els altres. de la i que el a en és no un "
+        "per els les amb una es del al com més però seu ho aquest aquesta també molt quan tot fins si ja hi va "
+        "són ens mai res perquè on així seva aquí ara després tenir fer dir gràcies"
+    ),
+    "la": (
+        "Omnes homines dignitate et iure liberi et pares nascuntur, rationis et conscientiae participes sunt, "
+        "quibus inter se concordiae studio est agendum. et in est non ad cum quod ut qui sed quae si esse sunt "
+        "hoc enim nec ab per ex atque etiam autem neque eius quam tamen ita sic nos vos ille illa illud igitur "
+        "ergo quoque sine propter populus senatus rex bellum"
+    ),
+    "tr": (
+        "Bütün insanlar hür, haysiyet ve haklar bakımından eşit doğarlar. Akıl ve vicdana sahiptirler ve "
+        "birbirlerine karşı kardeşlik zihniyeti ile hareket etmelidirler. bir ve bu da de için ne ile çok daha "
+        "ben sen o biz siz onlar gibi ama var yok olarak kadar sonra şey değil mi mı mu mü her ki en zaman şimdi "
+        "burada nasıl neden teşekkür ederim evet hayır iyi güzel"
+    ),
+    "vi": (
+        "Tất cả mọi người sinh ra đều được tự do và bình đẳng về nhân phẩm và quyền lợi. Mọi con người đều được "
+        "tạo hóa ban cho lý trí và lương tâm và cần phải đối xử với nhau trong tình bằng hữu. và của là có không "
+        "người những một các được cho trong này đã với để khi đến ra làm như từ về nhưng thì cũng sẽ rất nhiều "
+        "năm tôi bạn chúng ta cảm ơn xin chào"
+    ),
+    "id": (
+        "Semua orang dilahirkan merdeka dan mempunyai martabat dan hak-hak yang sama. Mereka dikaruniai akal dan "
+        "hati nurani dan hendaknya bergaul satu sama lain dalam semangat persaudaraan. yang dan di itu dengan "
+        "untuk tidak ini dari dalam akan pada juga saya ke karena tersebut bisa ada mereka lebih kata tahun sudah "
+        "atau saat oleh menjadi orang telah adalah kami seperti hanya masih namun bahwa kita banyak sangat apa "
+        "hari harus baru kalau terima kasih"
+    ),
+    "ms": (
+        "Semua manusia dilahirkan bebas dan samarata dari segi kemuliaan dan hak-hak. Mereka mempunyai pemikiran "
+        "dan perasaan hati dan hendaklah bertindak di antara satu sama lain dengan semangat persaudaraan. yang "
+        "dan di itu dengan untuk tidak ini dari dalam akan pada juga saya ke kerana tersebut boleh ada mereka "
+        "lebih kata tahun sudah atau semasa oleh menjadi orang telah ialah kami seperti hanya masih namun bahawa "
+        "kita banyak sangat apa hari mesti baharu kalau sahaja daripada beliau terima kasih"
+    ),
+    "tl": (
+        "Ang lahat ng tao ay isinilang na malaya at pantay-pantay sa karangalan at mga karapatan. Sila ay "
+        "pinagkalooban ng katwiran at budhi at dapat magpalagayan ang isa't isa sa diwa ng pagkakapatiran. ang "
+        "ng sa na at mga ay hindi ko siya ako ka mo niya kung para pa lang naman ito iyan iyon kami tayo sila "
+        "nila namin natin dito doon may wala po opo salamat maganda bakit paano kailan"
+    ),
+    "sw": (
+        "Watu wote wamezaliwa huru, hadhi na haki zao ni sawa. Wote wamejaliwa akili na dhamiri, hivyo yapasa "
+        "watendeane kindugu. na ya wa kwa ni za katika la kuwa hii yake huo hiyo pia sana lakini au kama wao "
+        "yeye mimi wewe sisi nyinyi hapa pale sasa leo kesho jana asante habari nzuri ndiyo hapana kwamba baada "
+        "kabla"
+    ),
+    "ha": (
+        "Dukkan 'yan-adam an haife su ne 'yantattu, kuma kowannensu na da mutunci da hakkoki daidai da na kowa. "
+        "Suna da hankali da tunani, saboda haka duk abin da za su aikata wa juna, ya kamata su yi shi a cikin "
+        "'yan'uwanci. da a na ya ba ta su wannan wanda kuma don amma cikin akwai shi ita mu ku ni za yi ne ce "
+        "sun domin lokacin sannu nagode yaya ina"
+    ),
+    "ig": (
+        "Amụrụ mmadụ niile n'onwe ha, nweekwa ugwu na ikike nha anya. E nyere ha uche na mmụọ ime ihe ziri ezi, "
+        "ya mere ha kwesịrị ịkpaso ibe ha agwa dịka ụmụnne. na ya ka nke ọ ha m anyị unu ndị a bụ ga dị ihe ma "
+        "n'ime maka mgbe ebe gịnị ole daalụ nnọọ kedu"
+    ),
+    "yo": (
+        "Gbogbo ènìyàn ni a bí ní òmìnira; iyì àti ẹ̀tọ́ kọ̀ọ̀kan sì dọ́gba. Wọ́n ní ẹ̀bùn ti làákàyè àti ti "
+        "ẹ̀rí-ọkàn, ó sì yẹ kí wọn ó máa hùwà sí ara wọn gẹ́gẹ́ bí ọmọ ìyá. ní ti àti ó wọ́n mo ẹ a sí fún pé kí "
+        "ń jẹ́ gbogbo yìí náà ṣùgbọ́n tàbí lọ wá ṣe ọjọ́ ṣé o dáadáa"
+    ),
+    "zu": (
+        "Bonke abantu bazalwa bekhululekile belingana ngesithunzi nangamalungelo. Bahlanganiswe wumcabango "
+        "nangunembeza futhi kufanele baphathane ngomoya wobunye. futhi kodwa ukuthi lokhu lapho uma ngoba "
+        "kakhulu ngiyabonga yebo cha sawubona unjani kuhle abantu umuntu izinto ngesikhathi ukuba noma kanye"
+    ),
+    "xh": (
+        "Bonke abantu bazalwa bekhululekile kwaye belingana ngesidima nangokwamalungelo. Bonke abantu "
+        "banesiphiwo sesazela nesizathu sokwenza isenzo ngomoya wobuzalwana. kwaye kodwa ukuba le apho xa ngoba "
+        "kakhulu enkosi ewe hayi molo unjani kakuhle abantu umntu izinto ngexesha okanye kunye ndiyabulela"
+    ),
+    "lt": (
+        "Visi žmonės gimsta laisvi ir lygūs savo orumu ir teisėmis. Jiems suteiktas protas ir sąžinė ir jie turi "
+        "elgtis vienas kito atžvilgiu kaip broliai. ir yra kad su į iš ne bet tai kaip jis ji jie mes jūs aš tu "
+        "buvo bus gali labai čia ten kur kodėl ačiū gerai taip dar tik apie"
+    ),
+    "lv": (
+        "Visi cilvēki piedzimst brīvi un vienlīdzīgi savā pašcieņā un tiesībās. Viņi ir apveltīti ar saprātu un "
+        "sirdsapziņu, un viņiem jāizturas citam pret citu brālības garā. un ir ka ar uz no par bet tas kā viņš "
+        "viņa viņi mēs jūs es tu bija būs var ļoti šeit tur kur kāpēc paldies labi jā vēl tikai"
+    ),
+    # Cyrillic script
+    "ru": (
+        "Все люди рождаются свободными и равными в своем достоинстве и правах. Они наделены разумом и совестью "
+        "и должны поступать в отношении друг друга в духе братства. и в не на я что он с как это а то все она "
+        "так его но да ты к у же вы за бы по только ее мне было вот от меня еще нет о из ему теперь когда даже "
+        "ну вдруг ли если уже или ни быть был него до вас опять уж вам ведь там потом себя ничего ей может они "
+        "тут где есть надо ней для мы тебя их чем была сам чтоб без будто чего раз тоже себе под будет тогда кто "
+        "этот того потому этого какой совсем здесь этом один почти мой тем чтобы сейчас были куда зачем всех "
+        "никогда можно спасибо хорошо"
+    ),
+    "uk": (
+        "Всі люди народжуються вільними і рівними у своїй гідності та правах. Вони наділені розумом і совістю і "
+        "повинні діяти у відношенні один до одного в дусі братерства. і в не на що я він з як це а то все вона "
+        "так його але ти до у ви за би по тільки її мені було ось від мене ще ні о із йому тепер коли навіть "
+        "якщо вже або бути був нього вас знову там потім себе нічого їй може вони тут де є треба для ми тебе їх "
+        "чим була сам без чого раз теж собі під буде тоді хто цей того тому цього який зовсім цьому один майже "
+        "мій тим щоб неї зараз були куди навіщо всіх ніколи можна дякую добре також"
+    ),
+    "bg": (
+        "Всички хора се раждат свободни и равни по достойнство и права. Те са надарени с разум и съвест и "
+        "следва да се отнасят помежду си в дух на братство. и на в не да се е от за с по че са като това то той "
+        "тя те ние вие аз ти но или който която които беше бяха ще може много тук там къде кога защо благодаря "
+        "добре също още само всички всичко един една едно"
+    ),
+    "sr": (
+        "Сва људска бића рађају се слободна и једнака у достојанству и правима. Она су обдарена разумом и "
+        "свешћу и треба једни према другима да поступају у духу братства. и је у се на да за су од не с о а то "
+        "као или што из који која које сам смо би био била било ће ћемо може само још већ кад где зашто хвала "
+        "добро све сви али јер чак између љубав њега"
+    ),
+    # Arabic script
+    "ar": (
+        "يولد جميع الناس أحرارًا متساوين في الكرامة والحقوق. وقد وهبوا عقلاً وضميرًا وعليهم أن يعامل بعضهم "
+        "بعضًا بروح الإخاء. في من على أن إلى هذا التي الذي عن مع كان لا ما هو هي كل بعد قبل بين أو ثم إذا لم "
+        "لن قد هذه ذلك نحن أنت هم كيف لماذا شكرا جدا"
+    ),
+    "fa": (
+        "تمام افراد بشر آزاد به دنیا می‌آیند و از لحاظ حیثیت و حقوق با هم برابرند. همه دارای عقل و وجدان "
+        "هستند و باید نسبت به یکدیگر با روح برادری رفتار کنند. و در به از که این را با است برای آن یک خود تا "
+        "کرد بر هم نیز گفت می شود وی شد دارد ما اما یا شده باید هر آنها بود او دیگر دو مورد کند وجود بین پیش "
+        "پس نظر اگر همه یکی حال من نیست باشد چه بی می‌کند خیلی ممنون"
+    ),
+    "ur": (
+        "تمام انسان آزاد اور حقوق و عزت کے اعتبار سے برابر پیدا ہوئے ہیں۔ انہیں ضمیر اور عقل ودیعت ہوئی ہے۔ اس "
+        "لیے انہیں ایک دوسرے کے ساتھ بھائی چارے کا سلوک کرنا چاہیے۔ کے میں کی ہے اور سے کو پر یہ نے ہیں کہ "
+        "ایک کا بھی تو وہ تھا ہو کر گیا تھے جو اس ان کیا لیے نہیں ہوں گے تھی رہا ساتھ بہت کوئی اپنے ہم آپ "
+        "شکریہ ٹھیک بڑا چھوٹا"
+    ),
+    "sd": (
+        "سڀ انسان آزاد ۽ حقن ۽ عزت ۾ برابر پيدا ٿيا آهن. انهن کي ضمير ۽ عقل ڏنل آهي، تنهنڪري انهن کي هڪ "
+        "ٻئي سان ڀائپي وارو سلوڪ ڪرڻ گهرجي. جو ۾ جي آهي ۽ کي تي سان هن اهو ڪري ٿو ٿي هو پر ته به نه ڪيو ويو "
+        "هئي هئا اسان توهان منهنجو ڇو ڪٿي ڪڏهن مهرباني ٺيڪ ڏينهن ٻار"
+    ),
+    # Devanagari script
+    "hi": (
+        "सभी मनुष्यों को गौरव और अधिकारों के मामले में जन्मजात स्वतन्त्रता और समानता प्राप्त है। उन्हें बुद्धि और "
+        "अन्तरात्मा की देन प्राप्त है और परस्पर उन्हें भाईचारे के भाव से बर्ताव करना चाहिए। के है में की और को "
+        "से एक यह कि पर भी नहीं हैं था लिए ने तो इस कर गया हो रहा थे कुछ जो किया वह जा होता अपने साथ बहुत "
+        "आप हम मैं क्या क्यों कहाँ धन्यवाद अच्छा"
+    ),
+    "mr": (
+        "सर्व मानवी व्यक्ति जन्मतःच स्वतंत्र आहेत व त्यांना समान प्रतिष्ठा व समान अधिकार आहेत. त्यांना "
+        "विचारशक्ती व सदसद्विवेकबुद्धी लाभलेली आहे व त्यांनी एकमेकांशी बंधुत्वाच्या भावनेने आचरण करावे. आहे व "
+        "आणि या ते की हे तो ती त्या मी तुम्ही आम्ही आहेत होते होता होती काय का कसे कुठे नाही म्हणून पण आता "
+        "येथे खूप धन्यवाद चांगले केले करण्यासाठी त्यांच्या"
+    ),
+    "ne": (
+        "सबै व्यक्ति जन्मजात स्वतन्त्र हुन् ती सबैको समान अधिकार र महत्व छ। निजहरूमा विचार शक्ति र सद्धिचार "
+        "भएकोले निजहरूले आपसमा भातृत्वको भावनाबाट व्यवहार गर्नु पर्छ। र छ को मा ले हो यो त्यो म तिमी हामी "
+        "उनी थियो छन् गर्न भएको पनि तर अब यहाँ धेरै धन्यवाद राम्रो किन कहाँ कसरी हुन्छ गरेको"
+    ),
+}
@@ -0,0 +1,345 @@
+"""In-process language identification, so "auto" can be resolved before translating.
+
+Text is first attributed to a Unicode script. Scripts written by a single
+language (Greek, Tamil, Hangul, kana...) decide on their own; Latin, Cyrillic,
+Arabic and Devanagari text is scored by a character n-gram naive Bayes model.
+Its profiles (the most frequent n-grams per language) are precomputed into
+``langprofiles.json`` and loaded once, on first use. Only the standard library
+is used so the Streamlit app can share it.
+
+The table is rebuilt from the seed text in ``langdata.py`` plus any gettext
+catalogs available locally::
+
+    python -m backend.langdetect --locale-dir /usr/share/locale
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import struct
+import threading
+import unicodedata
+from bisect import bisect_right
+from collections import Counter, namedtuple
+from functools import lru_cache
+from itertools import repeat
+
+from .langdata import SEED_TEXT
+
+Detection = namedtuple("Detection", "language confidence")
+UNKNOWN = Detection(None, 0.0)
+
+PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "langprofiles.json")
+# Only the start of long texts is looked at
+MAX_CHARS = 512
+NGRAM_ORDERS = (1, 2, 3)
+# Assumed frequency of an n-gram that is not in a language's profile
+UNSEEN_FREQUENCY = 1e-5
+# Packed weights: log-odds in 1/256 steps, 32 bits per language (room for ~2**20 n-grams)
+WEIGHT_SCALE = 256
+LANE_BITS = 32
+# Naive Bayes treats overlapping n-grams as independent, which makes raw posteriors
+# overconfident; scores are scaled to this many effective observations first
+EFFECTIVE_SAMPLES = 12
+# Short text is where the n-gram model goes wrong most: scores over fewer letters than this
+# count for proportionally less
+DECISIVE_LETTERS = 50
+# Languages the n-gram model mixes up with each other; when the runner-up is a close relative,
+# the confidence is the margin between the two rather than the winner's posterior
+RELATED_LANGUAGES = (
+    ("es", "pt", "gl", "ca", "it"),
+    ("ru", "uk", "be", "bg", "sr", "mk"),
+    ("cs", "sk"),
+    ("hr", "bs", "sl"),
+    ("id", "ms"),
+    ("da", "no", "sv"),
+    ("nl", "af"),
+    ("xh", "zu"),
+    ("hi", "mr", "ne"),
+)
+_RELATIVES = {code: frozenset(group) - {code} for group in RELATED_LANGUAGES for code in group}
+
+# (first code point, last code point, script), sorted by first code point
+_SCRIPT_RANGES = [
+    (0x0041, 0x024F, "latin"),
+    (0x0370, 0x03FF, "greek"),
+    (0x0400, 0x052F, "cyrillic"),
+    (0x0530, 0x058F, "armenian"),
+    (0x0590, 0x05FF, "hebrew"),
+    (0x0600, 0x06FF, "arabic"),
+    (0x0750, 0x077F, "arabic"),
+    (0x0900, 0x097F, "devanagari"),
+    (0x0980, 0x09FF, "bengali"),
+    (0x0A00, 0x0A7F, "gurmukhi"),
+    (0x0A80, 0x0AFF, "gujarati"),
+    (0x0B00, 0x0B7F, "oriya"),
+    (0x0B80, 0x0BFF, "tamil"),
+    (0x0C00, 0x0C7F, "telugu"),
+    (0x0C80, 0x0CFF, "kannada"),
+    (0x0D00, 0x0D7F, "malayalam"),
+    (0x0D80, 0x0DFF, "sinhala"),
+    (0x0E00, 0x0E7F, "thai"),
+    (0x0E80, 0x0EFF, "lao"),
+    (0x1000, 0x109F, "myanmar"),
+    (0x10A0, 0x10FF, "georgian"),
+    (0x1100, 0x11FF, "hangul"),
+    (0x1780, 0x17FF, "khmer"),
+    (0x1E00, 0x1EFF, "latin"),
+    (0x1F00, 0x1FFF, "greek"),
+    (0x3040, 0x30FF, "kana"),
+    (0x3130, 0x318F, "hangul"),
+    (0x31F0, 0x31FF, "kana"),
+    (0x3400, 0x4DBF, "han"),
+    (0x4E00, 0x9FFF, "han"),
+    (0xAC00, 0xD7AF, "hangul"),
+    (0xF900, 0xFAFF, "han"),
+    (0xFB50, 0xFDFF, "arabic"),
+    (0xFE70, 0xFEFF, "arabic"),
+    (0xFF66, 0xFF9F, "kana"),
+]
+_RANGE_STARTS = [start for start, _, _ in _SCRIPT_RANGES]
+
+# Scripts that identify the language by themselves
+SCRIPT_LANGUAGES = {
+    "greek": "el",
+    "armenian": "hy",
+    "hebrew": "he",
+    "gurmukhi": "pa",
+    "gujarati": "gu",
+    "oriya": "or",
+    "tamil": "ta",
+    "telugu": "te",
+    "kannada": "kn",
+    "malayalam": "ml",
+    "sinhala": "si",
+    "thai": "th",
+    "lao": "lo",
+    "myanmar": "my",
+    "georgian": "ka",
+    "hangul": "ko",
+    "khmer": "km",
+    "kana": "ja",
+    "han": "zh",
+}
+# Assamese is written in the Bengali script but has its own ra and wa
+_ASSAMESE_LETTERS = frozenset("ৰৱ")
+
+
+@lru_cache(maxsize=4096)
+def script_of(ch):
+    cp = ord(ch)
+    i = bisect_right(_RANGE_STARTS, cp) - 1
+    if i >= 0 and cp <= _SCRIPT_RANGES[i][1]:
+        return _SCRIPT_RANGES[i][2]
+    return None
+
+
+def _scan(text, limit=MAX_CHARS):
+    # Lower-cased words (letters plus combining marks) and a letter count per script
+    words = []
+    scripts = Counter()
+    current = []
+    for ch in text[:limit] if limit else text:
+        if ch.isalpha():
+            current.append(ch)
+            script = script_of(ch)
+            if script:
+                scripts[script] += 1
+        elif current and unicodedata.category(ch)[0] == "M":
+            current.append(ch)
+        elif current:
+            words.append("".join(current).lower())
+            current = []
+    if current:
+        words.append("".join(current).lower())
+    return words, scripts
+
+
+def _ngrams(words):
+    # Character n-grams of the words joined by single spaces and padded on both ends;
+    # longer n-grams may span a word boundary
+    text = f" {' '.join(words)} "
+    grams = []
+    for n in NGRAM_ORDERS:
+        if n == 1:
+            grams.extend("".join(words))
+        else:
+            grams.extend([text[i:i + n] for i in range(len(text) - n + 1)])
+    return grams
+
+
+class _Profiles:
+    """Naive Bayes tables per script: n-gram -> packed log-odds vs. unseen for the script's languages.
+
+    Each language's weight is quantized into its own fixed-width lane of one Python
+    int, so scoring a text is a single ``sum`` over its n-grams' ints.
+    """
+
+    def __init__(self, data):
+        self.languages = {}  # script -> language codes
+        self.tables = {}  # script -> n-gram -> packed weights
+        order_index = {n: i for i, n in enumerate(data["orders"])}
+        for code, profile in data["languages"].items():
+            languages = self.languages.setdefault(profile["script"], [])
+            table = self.tables.setdefault(profile["script"], {})
+            shift = LANE_BITS * len(languages)
+            totals = profile["totals"]
+            for gram, count in profile["grams"].items():
+                # Relative frequency within the n-gram's order, against the same floor for
+                # every language, so corpus size doesn't favour any of them
+                frequency = count / totals[order_index[len(gram)]]
+                weight = round(max(0.0, math.log(frequency / UNSEEN_FREQUENCY)) * WEIGHT_SCALE)
+                table[gram] = table.get(gram, 0) + (weight << shift)
+            languages.append(code)
+
+    def score(self, words, script):
+        table = self.tables.get(script)
+        if table is None:
+            return UNKNOWN
+        grams = _ngrams(words)
+        packed = sum(map(table.get, grams, repeat(0)))
+        if not packed:
+            return UNKNOWN
+        languages = self.languages[script]
+        scores = struct.unpack(f"<{len(languages)}I", packed.to_bytes(4 * len(languages), "little"))
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        best = ranked[0]
+        scale = min(1.0, EFFECTIVE_SAMPLES / len(grams)) / WEIGHT_SCALE
+        total = sum(math.exp((s - scores[best]) * scale) for s in scores)
+        confidence = 1.0 / total
+        if len(ranked) > 1 and languages[ranked[1]] in _RELATIVES.get(languages[best], ()):
+            confidence -= math.exp((scores[ranked[1]] - scores[best]) * scale) / total
+        return Detection(languages[best], confidence)
+
+
+_profiles = None
+_profiles_lock = threading.Lock()
+
+
+def load_profiles():
+    global _profiles
+    if _profiles is None:
+        with _profiles_lock:
+            if _profiles is None:
+                if os.path.exists(PROFILE_PATH):
+                    with open(PROFILE_PATH, encoding="utf-8") as f:
+                        data = json.load(f)
+                else:
+                    data = build_profiles(SEED_TEXT)
+                _profiles = _Profiles(data)
+    return _profiles
+
+
+def detect(text):
+    """Return ``Detection(language, confidence)``; ``language`` is None when nothing is recognised."""
+    words, scripts = _scan(text)
+    if not scripts:
+        return UNKNOWN
+    letters = sum(scripts.values())
+    script, count = scripts.most_common(1)[0]
+    if script == "han" and scripts["kana"]:
+        # Japanese mixes kanji with kana; Chinese has no kana
+        return Detection("ja", (count + scripts["kana"]) / letters)
+    if script == "bengali":
+        assamese = any(ch in _ASSAMESE_LETTERS for ch in text[:MAX_CHARS])
+        return Detection("as" if assamese else "bn", count / letters)
+    language = SCRIPT_LANGUAGES.get(script)
+    if language is not None:
+        return Detection(language, count / letters)
+    detection = load_profiles().score(words, script)
+    return Detection(detection.language, detection.confidence * count / letters * min(1.0, count / DECISIVE_LETTERS))
+
+
+def resolve_source(source, target, detection, min_confidence):
+    """The language to translate from: the detected one for an "auto" source when the detector is
+    at least ``min_confidence`` sure, else ``source`` as given.
+
+    Text detected as already being in ``target`` stays "auto" rather than being returned as is; a
+    misdetected short text would otherwise come back untranslated.
+    """
+    if source != "auto" or not detection.language or detection.confidence < min_confidence:
+        return source
+    return "auto" if detection.language == target else detection.language
+
+
+def detect_batch(texts):
+    """Detect many texts at once; repeated texts are only scored once."""
+    seen = {}
+    return [seen[text] if text in seen else seen.setdefault(text, detect(text)) for text in texts]
+
+
+def build_profiles(texts, top=300):
+    """Count n-grams per language and keep the ``top`` most frequent of each order."""
+    languages = {}
+    for code, text in texts.items():
+        words, scripts = _scan(text, limit=None)
+        counts = Counter()
+        for i in range(0, len(words), 1000):
+            counts.update(_ngrams(words[i:i + 1000]))
+        grams = {}
+        totals = []
+        for n in NGRAM_ORDERS:
+            order = Counter({g: c for g, c in counts.items() if len(g) == n})
+            totals.append(sum(order.values()))
+            grams.update(order.most_common(top))
+        languages[code] = {"script": scripts.most_common(1)[0][0], "totals": totals, "grams": grams}
+    return {"orders": list(NGRAM_ORDERS), "languages": languages}
+
+
+# gettext catalog directories for codes that differ from ours. English comes from the
+# untranslated message ids, which are English in practically every catalog.
+_LOCALE_DIRS = {"en": ("fr",), "no": ("nb", "no"), "tl": ("fil", "tl")}
+# printf/brace placeholders, command-line options, markup and URLs in UI messages
+_CATALOG_NOISE = re.compile(r"%[-#0-9.*lhz]*[a-zA-Z]|\{[^}]*\}|--?[a-zA-Z][\w-]*|<[^>]*>|\w+://\S+")
+
+
+def catalog_text(locale_dir, code, max_chars):
+    # Translated messages from the gettext catalogs of one language (country/language name lists skipped)
+    import gettext
+
+    use_ids = code == "en"
+    parts, size = [], 0
+    for name in _LOCALE_DIRS.get(code, (code,)):
+        for path in sorted(glob.glob(os.path.join(locale_dir, name, "LC_MESSAGES", "*.mo"))):
+            if os.path.basename(path).startswith("iso_"):
+                continue
+            try:
+                with open(path, "rb") as f:
+                    catalog = gettext.GNUTranslations(f)._catalog
+            except (OSError, ValueError):
+                continue
+            for msgid, message in catalog.items():
+                if not msgid or not isinstance(message, str):
+                    continue
+                if use_ids:
+                    message = msgid[0] if isinstance(msgid, tuple) else msgid
+                parts.append(_CATALOG_NOISE.sub(" ", message))
+                size += len(message)
+                if size >= max_chars:
+                    return "\n".join(parts)
+    return "\n".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the language detector's n-gram profiles")
+    parser.add_argument("--locale-dir", action="append", default=[], help="gettext locale directory to learn from")
+    parser.add_argument("--max-chars", type=int, default=400000, help="catalog text per language")
+    parser.add_argument("--top", type=int, default=300, help="n-grams kept per language and order")
+    parser.add_argument("--seed-weight", type=int, default=3, help="times the seed text is counted")
+    parser.add_argument("--out", default=PROFILE_PATH)
+    args = parser.parse_args()
+
+    texts = {}
+    for code, seed in SEED_TEXT.items():
+        extra = [catalog_text(d, code, args.max_chars) for d in args.locale_dir]
+        texts[code] = "\n".join([seed] * args.seed_weight + extra)
+    data = build_profiles(texts, args.top)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+    print(f"wrote {len(data['languages'])} profiles to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
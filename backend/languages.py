@@ -0,0 +1,157 @@
+"""Supported languages and the code each provider uses for them.
+
+The registry is built once at import and never changed afterwards: one
+``Language`` per ISO code with its display name and its Hugging Face
+(M2M100), LibreTranslate, MyMemory and gTTS codes (None where the service
+has no such language). The ``/languages`` body is serialized here too, so
+serving it is a write of ready-made bytes. Only the standard library is used
+so the Streamlit app can share it.
+"""
+import hashlib
+import json
+from collections import namedtuple
+from types import MappingProxyType
+
+Language = namedtuple("Language", "code name hf libre mymemory tts listed")
+
+_NAMES = {
+    "af": "Afrikaans",
+    "ar": "Arabic",
+    "as": "Assamese",
+    "bg": "Bulgarian",
+    "bn": "Bengali",
+    "ca": "Catalan",
+    "cs": "Czech",
+    "da": "Danish",
+    "de": "German",
+    "el": "Greek",
+    "en": "English",
+    "es": "Spanish",
+    "et": "Estonian",
+    "fa": "Persian",
+    "fi": "Finnish",
+    "fil": "Filipino",
+    "fr": "French",
+    "gu": "Gujarati",
+    "ha": "Hausa",
+    "he": "Hebrew",
+    "hi": "Hindi",
+    "hr": "Croatian",
+    "hu": "Hungarian",
+    "hy": "Armenian",
+    "id": "Indonesian",
+    "ig": "Igbo",
+    "it": "Italian",
+    "ja": "Japanese",
+    "ka": "Georgian",
+    "km": "Khmer",
+    "kn": "Kannada",
+    "ko": "Korean",
+    "la": "Latin",
+    "lo": "Lao",
+    "lt": "Lithuanian",
+    "lv": "Latvian",
+    "ml": "Malayalam",
+    "mr": "Marathi",
+    "ms": "Malay",
+    "my": "Burmese",
+    "nb": "Norwegian Bokmål",
+    "ne": "Nepali",
+    "nl": "Dutch",
+    "no": "Norwegian",
+    "or": "Odia",
+    "pa": "Punjabi",
+    "pl": "Polish",
+    "pt": "Portuguese",
+    "ro": "Romanian",
+    "ru": "Russian",
+    "sd": "Sindhi",
+    "si": "Sinhala",
+    "sk": "Slovak",
+    "sl": "Slovenian",
+    "sr": "Serbian",
+    "sv": "Swedish",
+    "sw": "Swahili",
+    "ta": "Tamil",
+    "te": "Telugu",
+    "th": "Thai",
+    "tl": "Filipino",
+    "tr": "Turkish",
+    "uk": "Ukrainian",
+    "ur": "Urdu",
+    "vi": "Vietnamese",
+    "yo": "Yoruba",
+    "zh": "Chinese",
+    "zu": "Zulu",
+    "xh": "Xhosa",
+}
+
+# Accepted (and named in detection results) but not offered in the language pickers;
+# "fil" is the same language as "tl"
+UNLISTED = frozenset(("fil", "ka", "la"))
+
+# Languages of the M2M100 models (the default Hugging Face model and local CTranslate2 conversions)
+M2M100_LANGUAGES = frozenset(
+    "af am ar ast az ba be bg bn br bs ca ceb cs cy da de el en es et fa ff fi fr fy ga gd gl gu "
+    "ha he hi hr ht hu hy id ig ilo is it ja jv ka kk km kn ko lb lg ln lo lt lv mg mk ml mn mr "
+    "ms my ne nl no ns oc or pa pl ps pt ro ru sd si sk sl so sq sr ss su sv sw ta th tl tn tr "
+    "uk ur uz vi wo xh yi yo zh zu".split()
+)
+
+# MyMemory expects locale-style codes (e.g., en-GB, fr-FR)
+_MYMEMORY = {
+    "en": "en-GB", "ta": "ta-IN", "hi": "hi-IN", "te": "te-IN", "ml": "ml-IN", "kn": "kn-IN",
+    "mr": "mr-IN", "bn": "bn-IN", "gu": "gu-IN", "pa": "pa-IN", "ur": "ur-PK", "ar": "ar-SA",
+    "fr": "fr-FR", "es": "es-ES", "de": "de-DE", "it": "it-IT", "pt": "pt-PT", "ru": "ru-RU",
+    "zh": "zh-CN", "ja": "ja-JP", "ko": "ko-KR", "th": "th-TH", "vi": "vi-VN", "id": "id-ID",
+    "tr": "tr-TR", "fa": "fa-IR", "he": "he-IL", "el": "el-GR", "nl": "nl-NL", "pl": "pl-PL",
+    "sv": "sv-SE", "fi": "fi-FI", "no": "nb-NO", "da": "da-DK", "cs": "cs-CZ", "hu": "hu-HU",
+    "ro": "ro-RO", "sk": "sk-SK", "uk": "uk-UA", "bg": "bg-BG", "hr": "hr-HR", "sr": "sr-Latn-RS",
+    "sl": "sl-SI", "et": "et-EE", "lv": "lv-LV", "lt": "lt-LT", "ms": "ms-MY", "tl": "fil-PH",
+    "sw": "sw-KE", "af": "af-ZA", "si": "si-LK", "ne": "ne-NP", "my": "my-MM", "hy": "hy-AM",
+    "ca": "ca-ES", "km": "km-KH", "lo": "lo-LA", "as": "as-IN", "or": "or-IN", "sd": "sd-PK",
+    "yo": "yo-NG", "ha": "ha-NE", "ig": "ig-NG", "xh": "xh-ZA", "zu": "zu-ZA",
+}
+# Our codes where a service uses a different one
+_HF_ALIASES = {"nb": "no", "fil": "tl"}
+_LIBRE_ALIASES = {"no": "nb", "fil": "tl"}
+_TTS_ALIASES = {"zh": "zh-CN", "he": "iw", "fil": "tl", "nb": "no", "jv": "jw"}
+
+
+def _build():
+    languages = {}
+    for code in sorted(_NAMES):
+        hf = _HF_ALIASES.get(code, code)
+        languages[code] = Language(
+            code=code,
+            name=_NAMES[code],
+            hf=hf if hf in M2M100_LANGUAGES else None,
+            libre=_LIBRE_ALIASES.get(code, code),
+            mymemory=_MYMEMORY.get(code),
+            tts=_TTS_ALIASES.get(code, code),
+            listed=code not in UNLISTED,
+        )
+    return MappingProxyType(languages)
+
+
+LANGUAGES = _build()
+LISTED_LANGUAGES = tuple(lang for lang in LANGUAGES.values() if lang.listed)
+
+# (name, code) pairs for language pickers, sorted by name
+LANGUAGE_CHOICES = tuple(sorted((lang.name, lang.code) for lang in LISTED_LANGUAGES))
+
+LANGUAGE_NAMES = MappingProxyType({lang.code: lang.name for lang in LANGUAGES.values()})
+# code -> provider code, only for languages the provider has
+HF_CODES = MappingProxyType({lang.code: lang.hf for lang in LANGUAGES.values() if lang.hf})
+LIBRE_CODES = MappingProxyType({lang.code: lang.libre for lang in LANGUAGES.values() if lang.libre})
+MYMEMORY_CODES = MappingProxyType({lang.code: lang.mymemory for lang in LANGUAGES.values() if lang.mymemory})
+# gTTS voices are only known at runtime (see ``backend.tts``); this is the code to ask for
+TTS_CODES = MappingProxyType({**_TTS_ALIASES, **{lang.code: lang.tts for lang in LANGUAGES.values()}})
+
+# GET /languages, serialized once
+LANGUAGES_JSON = json.dumps(
+    {"languages": [{"code": lang.code, "name": lang.name} for lang in LISTED_LANGUAGES]},
+    ensure_ascii=False,
+    separators=(",", ":"),
+).encode("utf-8")
+LANGUAGES_ETAG = '"' + hashlib.sha256(LANGUAGES_JSON).hexdigest()[:32] + '"'
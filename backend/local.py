@@ -0,0 +1,199 @@
+"""Offline CPU translation with CTranslate2 models (no network).
+
+Models are converted once ahead of time, for example::
+
+    ct2-transformers-converter --model facebook/m2m100_418M --quantization int8 \
+        --output_dir models/m2m100_418M --copy_files sentencepiece.bpe.model
+
+and configured per language pair, with ``*`` as the multilingual fallback::
+
+    LOCAL_MODELS=en-fr=models/opus-mt-en-fr,*=models/m2m100_418M
+
+A directory holding ``sentencepiece.bpe.model`` is treated as M2M100 (language
+tokens, any pair in ``M2M100_LANGUAGES``); one holding ``source.spm`` and
+``target.spm`` is a single-pair Marian/Opus-MT model. ``ctranslate2`` and
+``sentencepiece`` are optional and only imported when a model is first used.
+
+Models are loaded lazily, not memory-mapped: CTranslate2 reads the weights
+into memory when the translator is built and has no option to map them, so
+the footprint is kept down by the int8 quantization and by every pair that
+shares a model directory sharing one loaded copy.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .batching import MicroBatcher
+from .languages import M2M100_LANGUAGES
+from .providers import Provider, ProviderError
+
+
+def parse_model_map(value):
+    # "en-fr=path,*=path" -> {("en", "fr"): path, "*": path}
+    models = {}
+    for entry in (value or "").split(","):
+        key, _, path = entry.partition("=")
+        key, path = key.strip(), path.strip()
+        if not key or not path:
+            continue
+        if key == "*":
+            models["*"] = path
+        else:
+            source, _, target = key.partition("-")
+            models[(source.strip(), target.strip())] = path
+    return models
+
+
+class LocalModel:
+    """One CTranslate2 model directory; loaded on first use, then kept in memory."""
+
+    def __init__(self, path, compute_type="int8", threads=0, beam_size=2, max_decoding_length=512):
+        self.path = path
+        self.compute_type = compute_type
+        self.threads = threads
+        self.beam_size = beam_size
+        self.max_decoding_length = max_decoding_length
+        self.multilingual = os.path.exists(os.path.join(path, "sentencepiece.bpe.model"))
+        self._translator = None
+        self._source_sp = None
+        self._target_sp = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        with self._lock:
+            if self._translator is not None:
+                return
+            import ctranslate2
+            import sentencepiece
+
+            def processor(name):
+                return sentencepiece.SentencePieceProcessor(model_file=os.path.join(self.path, name))
+
+            if self.multilingual:
+                self._source_sp = self._target_sp = processor("sentencepiece.bpe.model")
+            else:
+                self._source_sp = processor("source.spm")
+                self._target_sp = processor("target.spm")
+            self._translator = ctranslate2.Translator(
+                self.path, device="cpu", compute_type=self.compute_type, intra_threads=self.threads
+            )
+
+    def translate(self, texts, source, target):
+        # Blocking: one forward pass over the whole batch
+        self.load()
+        tokens = [self._source_sp.encode(text, out_type=str) + ["</s>"] for text in texts]
+        target_prefix = None
+        if self.multilingual:
+            tokens = [[f"__{source}__"] + toks for toks in tokens]
+            target_prefix = [[f"__{target}__"]] * len(texts)
+        results = self._translator.translate_batch(
+            tokens,
+            target_prefix=target_prefix,
+            beam_size=self.beam_size,
+            max_decoding_length=self.max_decoding_length,
+            max_batch_size=len(texts),
+        )
+        skip = 1 if self.multilingual else 0
+        return [self._target_sp.decode(result.hypotheses[0][skip:]) for result in results]
+
+
+class LocalProvider(Provider):
+    name = "Local"
+    url = "local://cpu"
+    timeout = 60.0
+    supports_batch = True
+    needs_client = False
+    coalesces = True
+
+    def __init__(
+        self,
+        models,
+        max_batch=32,
+        batch_window=0.005,
+        max_chars=400,
+        compute_type="int8",
+        threads=0,
+        beam_size=2,
+    ):
+        self.models = models  # {(source, target): path, "*": multilingual path}
+        self.max_batch = max_batch
+        self.batch_window = batch_window
+        self.max_chars = max_chars
+        self.compute_type = compute_type
+        self.threads = threads
+        self.beam_size = beam_size
+        self._loaded = {}  # path -> LocalModel
+        self._batchers = {}  # (source, target) -> MicroBatcher
+        self._executor = None
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        models = parse_model_map(env.get("LOCAL_MODELS"))
+        if not models:
+            return None
+        return cls(
+            models,
+            max_batch=int(env.get("LOCAL_MAX_BATCH", 32)),
+            batch_window=float(env.get("LOCAL_BATCH_WINDOW_MS", 5)) / 1000,
+            max_chars=int(env.get("LOCAL_MAX_CHARS", 400)),
+            compute_type=env.get("LOCAL_COMPUTE_TYPE", "int8"),
+            threads=int(env.get("LOCAL_THREADS", 0)),
+            beam_size=int(env.get("LOCAL_BEAM_SIZE", 2)),
+        )
+
+    def model_path(self, source, target):
+        path = self.models.get((source, target))
+        if path is None and source in M2M100_LANGUAGES and target in M2M100_LANGUAGES:
+            path = self.models.get("*")
+        return path
+
+    def supports(self, source, target):
+        return source != "auto" and self.model_path(source, target) is not None
+
+    def _model(self, source, target):
+        path = self.model_path(source, target)
+        model = self._loaded.get(path)
+        if model is None:
+            model = self._loaded[path] = LocalModel(path, self.compute_type, self.threads, self.beam_size)
+        return model
+
+    async def _run_model(self, texts, source, target):
+        model = self._model(source, target)
+        if self._executor is None:
+            # One forward pass at a time; CTranslate2 parallelises inside it with intra_threads
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="local-translate")
+        loop = asyncio.get_running_loop()
+        try:
+            translated = await loop.run_in_executor(self._executor, model.translate, texts, source, target)
+        except ImportError as e:
+            raise ProviderError(self.name, "unreachable", f"Local: model runtime not installed ({e})")
+        except Exception as e:
+            raise ProviderError(self.name, "unreachable", f"Local: {model.path}: {str(e) or type(e).__name__}")
+        if len(translated) != len(texts) or not all(translated):
+            raise ProviderError(self.name, "empty", "Local: model returned an empty translation")
+        return translated
+
+    def _batcher(self, source, target):
+        batcher = self._batchers.get((source, target))
+        if batcher is None:
+            run = lambda texts: self._run_model(texts, source, target)
+            batcher = self._batchers[(source, target)] = MicroBatcher(run, self.max_batch, self.batch_window)
+        return batcher
+
+    async def translate_segment(self, client, text, source, target):
+        return await self._batcher(source, target).submit(text)
+
+    async def translate_segments(self, client, pieces, source, target):
+        # All segments go through the pair's batcher, sharing forward passes with concurrent requests
+        batcher = self._batcher(source, target)
+        return list(await asyncio.gather(*(batcher.submit(piece) for piece in pieces)))
+
+    async def close(self):
+        batchers, self._batchers = list(self._batchers.values()), {}
+        for batcher in batchers:
+            await batcher.close()
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
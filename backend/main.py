@@ -1,18 +1,154 @@
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
-import requests
+from typing import List, Literal, Optional, Union
+import asyncio
+import hashlib
+import itertools
+import json
+import math
 import os
+import tempfile
+import time
 from dotenv import load_dotenv
-from deep_translator import MyMemoryTranslator
+
+from .cache import TranslationCache, make_key
+from . import documents, uploads, wire
+from .documents import DocumentError
+from .engine import ProviderEngine, QuotaExhausted, TranslationFailed
+from .jobs import EXTENSIONS, MEDIA_TYPES, JobError, JobStore, WorkerPool, format_for, worker_count
+from . import langdetect
+from .langdetect import detect, detect_batch, load_profiles
+from .languages import LANGUAGE_NAMES, LANGUAGES_ETAG, LANGUAGES_JSON
+from .memory import TranslationMemory
+from .metrics import REGISTRY, MetricsMiddleware, current_trace, stage
+from .ratelimit import ClientRateLimiter, RateLimitMiddleware
+from .segmenter import Segment, iter_segments
+from .singleflight import SingleFlight
+from .tts import TextToSpeech, TTSUnavailable, audio_key
+from .uploads import UploadError, UploadResponse, UploadTranslation
+from .wire import Compressor, WireMiddleware
 
 load_dotenv()
 
-HF_API_KEY = os.getenv("HUGGINGFACE_API_KEY")
-HF_MODEL = os.getenv("HUGGINGFACE_MODEL", "facebook/m2m100_418M")
-HF_API_URL = f"https://api-inference.huggingface.co/models/{HF_MODEL}"
+# Provider chain and per-host connection pools (see backend/providers.py for env settings)
+engine = ProviderEngine.from_env()
+
+@asynccontextmanager
+async def lifespan(app):
+    await engine.start()
+    # Bulk job workers run in their own processes, each with its own provider engine; any that
+    # die are started again. Each one imports the whole backend, so they are only started here
+    # when work is left over from a previous run, and otherwise by the first POST /jobs.
+    if JOB_WORKERS and await asyncio.to_thread(jobs.has_open_units):
+        await asyncio.to_thread(job_workers.start)
+    watcher = asyncio.ensure_future(_watch_workers())
+    # The language profiles and gTTS's language table (which imports gTTS) are loaded in the
+    # background so the server answers right away; a request that needs one first waits for it (or
+    # gets the error, if loading failed). Handlers on the event loop await it through _warmed_up()
+    # rather than block the loop on the loaders' locks.
+    global warmup
+    warmup = asyncio.gather(
+        asyncio.to_thread(load_profiles), asyncio.to_thread(tts.languages), return_exceptions=True
+    )
+    try:
+        yield
+    finally:
+        watcher.cancel()
+        await warmup
+        await engine.close()
+        await asyncio.to_thread(job_workers.stop)
+
+warmup = None
+
+async def _warmed_up():
+    if warmup is not None and not warmup.done():
+        await asyncio.shield(warmup)
+
+async def _watch_workers():
+    while True:
+        await asyncio.sleep(JOB_WORKER_CHECK_SECONDS)
+        await asyncio.to_thread(job_workers.check)
+
+class WireResponse(JSONResponse):
+    # JSON through the fastest encoder available, or MessagePack for clients that ask for it
+    # (see backend/wire.py); the default for every route returning data
+    def __init__(self, content, status_code=200, headers=None, media_type=None, background=None):
+        if len(wire.MEDIA_TYPES) > 1:
+            headers = {**(headers or {}), "Vary": "Accept"}
+        super().__init__(content, status_code, headers, media_type or wire.response_media_type(), background)
+
+    def render(self, content):
+        return wire.encode(content, self.media_type)
+
+app = FastAPI(lifespan=lifespan, default_response_class=WireResponse)
+
+# Largest number of items accepted by /translate/batch
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 1000))
+
+# /translate/stream segment size and how many segments of one stream are in flight at once
+STREAM_SEGMENT_CHARS = int(os.getenv("STREAM_SEGMENT_CHARS", 450))
+STREAM_CONCURRENCY = int(os.getenv("STREAM_CONCURRENCY", 4))
+
+# Most target languages accepted by /translate/multi, and the upstream calls all of its targets
+# may have in flight together
+MULTI_MAX_TARGETS = int(os.getenv("MULTI_MAX_TARGETS", 100))
+MULTI_CONCURRENCY = int(os.getenv("MULTI_CONCURRENCY", 16))
+
+# Result cache in front of the provider chain (see backend/cache.py for env settings)
+cache = TranslationCache.from_env()
 
-app = FastAPI()
+# Concurrent cache misses for the same (normalized text, source, target) share one upstream call
+flights = SingleFlight()
+
+# Sentence-level translation memory (see backend/memory.py); None when disabled
+memory = TranslationMemory.from_env()
+# Sentences longer than this are split before the memory lookup
+MEMORY_SEGMENT_CHARS = int(os.getenv("TRANSLATION_MEMORY_SEGMENT_CHARS", 450))
+
+# Bulk translation jobs in a persistent SQLite queue (see backend/jobs.py for worker settings).
+# JOB_WORKERS is a number of worker processes or "auto" for one per core; 0 leaves the
+# queue to workers started with `python -m backend.jobs`
+jobs = JobStore.from_env()
+JOB_WORKERS = worker_count(os.getenv("JOB_WORKERS", 1))
+job_workers = WorkerPool(JOB_WORKERS, jobs.path)
+# How often dead workers are looked for and replaced
+JOB_WORKER_CHECK_SECONDS = float(os.getenv("JOB_WORKER_CHECK_SECONDS", 5))
+# Largest upload accepted by POST /jobs
+JOBS_MAX_BYTES = int(float(os.getenv("JOBS_MAX_MB", 100)) * 1024 * 1024)
+
+# Largest upload accepted by /translate/document, and how many of its text runs go upstream
+# per engine batch (the document is parsed and sent back one such window at a time)
+DOCUMENT_MAX_BYTES = int(float(os.getenv("DOCUMENT_MAX_MB", 20)) * 1024 * 1024)
+DOCUMENT_WINDOW = int(os.getenv("DOCUMENT_WINDOW", 64))
+
+# /translate/upload reads its body only while fewer than UPLOAD_WINDOW segments are in flight;
+# output the client hasn't read yet moves from memory to a temporary file past UPLOAD_SPOOL_MB
+UPLOAD_WINDOW = int(os.getenv("UPLOAD_WINDOW", 64))
+UPLOAD_SPOOL_BYTES = int(float(os.getenv("UPLOAD_SPOOL_MB", 1)) * 1024 * 1024)
+
+# Speech synthesis with a disk cache (see backend/tts.py for env settings)
+tts = TextToSpeech.from_env()
+
+# "auto" sources are detected locally and only resolved when the detector is at least this sure;
+# otherwise they go to the providers as "auto"
+DETECT_MIN_CONFIDENCE = float(os.getenv("DETECT_MIN_CONFIDENCE", 0.5))
+# Largest number of texts accepted by /detect
+DETECT_MAX_ITEMS = int(os.getenv("DETECT_MAX_ITEMS", 1000))
+
+# Token bucket per API key or client IP on the translation endpoints; over the limit gets 429
+# with Retry-After (see backend/ratelimit.py for env settings). Added first so the CORS
+# middleware still wraps its 429s.
+rate_limiter = ClientRateLimiter.from_env()
+app.add_middleware(RateLimitMiddleware, limiter=rate_limiter)
+
+# Complete responses of at least COMPRESSION_MIN_BYTES are sent with brotli or gzip, whichever
+# the client prefers; streamed ones go out as they are (see backend/wire.py for env settings)
+compressor = Compressor.from_env()
+app.add_middleware(WireMiddleware, compressor=compressor)
 
 # Allow Streamlit (localhost:8501) to call this API from the browser
 app.add_middleware(
@@ -21,286 +157,640 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lets browser clients read the debug stage timings
+    expose_headers=["Server-Timing"],
 )
+# Request counts, latency and body sizes per endpoint for /metrics; stage timings are
+# returned as a Server-Timing header when the request sends X-Debug-Timings: 1
+app.add_middleware(MetricsMiddleware)
 
 class TranslateRequest(BaseModel):
     text: str
     source_lang: str
     target_lang: str
+    # Provider dispatch strategy; defaults to TRANSLATE_DISPATCH (sequential)
+    dispatch: Optional[Literal["sequential", "hedged", "race"]] = None
+
+class BatchItem(BaseModel):
+    text: str
+    # Default to the batch-level language pair when omitted
+    source_lang: Optional[str] = None
+    target_lang: Optional[str] = None
 
-# Public list of supported language codes and names
-LANGUAGE_NAMES = {
-    "af": "Afrikaans",
-    "ar": "Arabic",
-    "as": "Assamese",
-    "bg": "Bulgarian",
-    "bn": "Bengali",
-    "ca": "Catalan",
-    "cs": "Czech",
-    "da": "Danish",
-    "de": "German",
-    "el": "Greek",
-    "en": "English",
-    "es": "Spanish",
-    "et": "Estonian",
-    "fa": "Persian",
-    "fi": "Finnish",
-    "fil": "Filipino",
-    "fr": "French",
-    "gu": "Gujarati",
-    "ha": "Hausa",
-    "he": "Hebrew",
-    "hi": "Hindi",
-    "hr": "Croatian",
-    "hu": "Hungarian",
-    "hy": "Armenian",
-    "id": "Indonesian",
-    "ig": "Igbo",
-    "it": "Italian",
-    "ja": "Japanese",
-    "ka": "Georgian",
-    "km": "Khmer",
-    "kn": "Kannada",
-    "ko": "Korean",
-    "la": "Latin",
-    "lo": "Lao",
-    "lt": "Lithuanian",
-    "lv": "Latvian",
-    "ml": "Malayalam",
-    "mr": "Marathi",
-    "ms": "Malay",
-    "my": "Burmese",
-    "nb": "Norwegian Bokmål",
-    "ne": "Nepali",
-    "nl": "Dutch",
-    "no": "Norwegian",
-    "or": "Odia",
-    "pa": "Punjabi",
-    "pl": "Polish",
-    "pt": "Portuguese",
-    "ro": "Romanian",
-    "ru": "Russian",
-    "sd": "Sindhi",
-    "si": "Sinhala",
-    "sk": "Slovak",
-    "sl": "Slovenian",
-    "sr": "Serbian",
-    "sv": "Swedish",
-    "sw": "Swahili",
-    "ta": "Tamil",
-    "te": "Telugu",
-    "th": "Thai",
-    "tl": "Filipino",
-    "tr": "Turkish",
-    "uk": "Ukrainian",
-    "ur": "Urdu",
-    "vi": "Vietnamese",
-    "yo": "Yoruba",
-    "zh": "Chinese",
-    "zu": "Zulu",
-    "xh": "Xhosa",
-}
+class BatchTranslateRequest(BaseModel):
+    # Plain strings use the batch-level pair; objects may carry their own
+    items: List[Union[str, BatchItem]]
+    source_lang: Optional[str] = None
+    target_lang: Optional[str] = None
+    dispatch: Optional[Literal["sequential", "hedged", "race"]] = None
+
+class MultiTranslateRequest(BaseModel):
+    text: str
+    source_lang: str
+    # One result per distinct target
+    target_langs: List[str]
+    dispatch: Optional[Literal["sequential", "hedged", "race"]] = None
+
+class TTSRequest(BaseModel):
+    text: str
+    lang: str
+
+class DetectRequest(BaseModel):
+    # One text, or many in a single call
+    text: Optional[str] = None
+    texts: Optional[List[str]] = None
+
+def resolve_source(source_lang, target_lang, detection):
+    # Only a source_lang the client gave equal to target_lang skips translation: a detected one
+    # never does (see langdetect.resolve_source)
+    return langdetect.resolve_source(source_lang, target_lang, detection, DETECT_MIN_CONFIDENCE)
+
+def _detection_result(detection):
+    return {
+        "language": detection.language,
+        "name": LANGUAGE_NAMES.get(detection.language) if detection.language else None,
+        "confidence": round(detection.confidence, 4),
+    }
+
+@app.post("/detect")
+def detect_language(data: DetectRequest):
+    if data.texts is not None:
+        if len(data.texts) > DETECT_MAX_ITEMS:
+            raise HTTPException(status_code=413, detail=f"Too many texts: {len(data.texts)} (max {DETECT_MAX_ITEMS})")
+        return {"results": [_detection_result(d) for d in detect_batch(data.texts)]}
+    if data.text is None:
+        raise HTTPException(status_code=422, detail="text or texts is required")
+    return _detection_result(detect(data.text))
 
 @app.post("/translate")
-def translate_text(data: TranslateRequest):
-    errors = []
+async def translate_text(data: TranslateRequest):
+    source_lang = data.source_lang
+    response = {}
+    if source_lang == "auto":
+        await _warmed_up()
+        with stage("detect"):
+            source_lang = resolve_source(source_lang, data.target_lang, detect(data.text))
+        response["detected_source_lang"] = None if source_lang == "auto" else source_lang
+    if data.source_lang == data.target_lang:
+        # The client says the text is already in the target language
+        return {"translated_text": data.text, **response}
+    try:
+        translated = await _translate_cached(data.text, source_lang, data.target_lang, data.dispatch)
+    except QuotaExhausted as e:
+        # Every provider is out of budget: tell the client when to come back instead of failing slowly
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except TranslationFailed as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    # Serialized here rather than by FastAPI so the stage shows up in the timings
+    with stage("serialize"):
+        return WireResponse({"translated_text": translated, **response})
 
-    # Try Hugging Face Inference API first if API key is set and source is not auto
-    if HF_API_KEY and data.source_lang != "auto":
-        try:
-            headers = {
-                "Authorization": f"Bearer {HF_API_KEY}",
-                "Content-Type": "application/json",
-            }
-            payload_hf = {
-                "inputs": data.text,
-                "parameters": {"src_lang": data.source_lang, "tgt_lang": data.target_lang},
-            }
-            r = requests.post(HF_API_URL, headers=headers, json=payload_hf, timeout=15)
-            if not r.ok:
-                errors.append(f"HF {HF_MODEL}: {r.status_code} {r.text}")
-            else:
+async def _translate_cached(text, source_lang, target_lang, strategy=None, segments=None, semaphore=None):
+    # segments: the text already split (unpacked at MEMORY_SEGMENT_CHARS, or whole without a memory)
+    # when translating it into several languages; semaphore: their shared upstream budget
+    with stage("cache"):
+        cached = cache.get(text, source_lang, target_lang)
+    if cached is not None:
+        return cached
+
+    async def fill():
+        start = time.perf_counter()
+        if segments is not None and source_lang != "auto":
+            translated = await engine.translate_segments(segments, source_lang, target_lang, strategy, memory, semaphore)
+        else:
+            translated = await engine.translate_with_memory(
+                memory, text, source_lang, target_lang, strategy=strategy, max_len=MEMORY_SEGMENT_CHARS,
+                semaphore=semaphore,
+            )
+        cache.set(text, source_lang, target_lang, translated, elapsed=time.perf_counter() - start)
+        return translated
+
+    with stage("translate"):
+        return await flights.do(make_key(text, source_lang, target_lang), fill)
+
+async def _stream_segments(data: TranslateRequest):
+    # Yields one event per segment as soon as it is translated (completion order, with its index),
+    # then a final summary event. Clients rebuild the text from leading + translated_text by index.
+    with stage("segment"):
+        segments = list(iter_segments(data.text, STREAM_SEGMENT_CHARS))
+    source_lang = data.source_lang
+    if source_lang == "auto":
+        await _warmed_up()
+        with stage("detect"):
+            source_lang = resolve_source(source_lang, data.target_lang, detect(data.text))
+    queue = asyncio.Queue()
+    sem = asyncio.Semaphore(STREAM_CONCURRENCY)
+
+    async def run(index, segment):
+        event = {"index": index, "leading": segment.leading, "translated_text": ""}
+        if segment.text and data.source_lang == data.target_lang:
+            event["translated_text"] = segment.text
+        elif segment.text:
+            async with sem:
                 try:
-                    out = r.json()
-                except ValueError:
-                    errors.append("HF: invalid JSON response")
-                else:
-                    translated = None
-                    if isinstance(out, list) and out:
-                        translated = out[0].get("translation_text") or out[0].get("generated_text")
-                    elif isinstance(out, dict):
-                        translated = out.get("translation_text") or out.get("generated_text")
-                    if translated:
-                        return {"translated_text": translated}
-                    else:
-                        errors.append("HF: no translation_text in response")
-        except requests.RequestException as e:
-            errors.append(f"HF unreachable: {e}")
-
-    endpoints = [
-        "https://libretranslate.de/translate",
-        "https://libretranslate.com/translate",
-        "https://translate.argosopentech.com/translate",
-    ]
-
-    payload = {
-        "q": data.text,
-        "source": data.source_lang,
-        "target": data.target_lang,
-        "format": "text",
-    }
+                    event["translated_text"] = await _translate_cached(
+                        segment.text, source_lang, data.target_lang, data.dispatch
+                    )
+                except TranslationFailed as e:
+                    del event["translated_text"]
+                    event["error"] = str(e)
+        await queue.put(event)
+
+    tasks = [asyncio.ensure_future(run(i, seg)) for i, seg in enumerate(segments)]
+    errors = 0
+    try:
+        for _ in range(len(tasks)):
+            event = await queue.get()
+            errors += "error" in event
+            yield event
+        done = {"done": True, "segments": len(segments), "errors": errors}
+        if data.source_lang == "auto":
+            done["detected_source_lang"] = None if source_lang == "auto" else source_lang
+        trace = current_trace()
+        if trace is not None:
+            # Headers went out before any segment was translated, so timings ride on the last event
+            done["timings"] = trace.as_list()
+        yield done
+    finally:
+        # Client went away or we finished: make sure nothing keeps running
+        for task in tasks:
+            task.cancel()
+
+def _ndjson(events):
+    async def body():
+        async for event in events:
+            with stage("serialize"):
+                line = json.dumps(event, ensure_ascii=False) + "\n"
+            yield line
+    return body()
+
+def _sse(events, name="segment", id_field="index"):
+    async def body():
+        async for event in events:
+            event_name = "done" if event.get("done") else name
+            event_id = f"id: {event[id_field]}\n" if id_field in event else ""
+            with stage("serialize"):
+                frame = f"{event_id}event: {event_name}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            yield frame
+    return body()
+
+@app.post("/translate/stream")
+async def translate_stream(data: TranslateRequest, request: Request):
+    # Server-Sent Events when asked for text/event-stream, NDJSON otherwise
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if "text/event-stream" in request.headers.get("accept", ""):
+        return StreamingResponse(_sse(_stream_segments(data)), media_type="text/event-stream", headers=headers)
+    return StreamingResponse(_ndjson(_stream_segments(data)), media_type="application/x-ndjson", headers=headers)
+
+async def _fan_out(data: MultiTranslateRequest):
+    # One event per target language as soon as it is translated, then a summary event. The text is
+    # detected and segmented once; every target's upstream calls share MULTI_CONCURRENCY.
+    # Sentences are only split apart for the memory to look up; without one the text goes
+    # upstream whole and each provider packs it up to its own max_chars.
+    targets = list(dict.fromkeys(data.target_langs))
+    source_lang = data.source_lang
+    detection = None
+    if source_lang == "auto":
+        await _warmed_up()
+        with stage("detect"):
+            detection = detect(data.text)
+            source_lang = resolve_source(source_lang, None, detection)
+    with stage("segment"):
+        if memory is not None:
+            segments = list(iter_segments(data.text, MEMORY_SEGMENT_CHARS, pack=False))
+        else:
+            segments = [Segment("", data.text)]
+    sem = asyncio.Semaphore(MULTI_CONCURRENCY)
 
-    for url in endpoints:
+    async def run(target):
+        event = {"target_lang": target}
+        if data.source_lang == target:
+            event["translated_text"] = data.text
+            return event
+        source = resolve_source(data.source_lang, target, detection) if detection is not None else source_lang
         try:
-            response = requests.post(
-                url,
-                json=payload,
-                headers={"Content-Type": "application/json"},
-                timeout=10,
+            event["translated_text"] = await _translate_cached(
+                data.text, source, target, data.dispatch, segments, sem
             )
-        except requests.RequestException as e:
-            errors.append(f"{url}: unreachable ({e})")
-            continue
+        except TranslationFailed as e:
+            event["error"] = str(e)
+        return event
 
-        if not response.ok:
-            errors.append(f"{url}: {response.status_code} {response.text}")
-            continue
+    tasks = [asyncio.ensure_future(run(target)) for target in targets]
+    errors = 0
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            event = await next_done
+            errors += "error" in event
+            yield event
+        done = {"done": True, "targets": len(targets), "errors": errors}
+        if data.source_lang == "auto":
+            done["detected_source_lang"] = None if source_lang == "auto" else source_lang
+        trace = current_trace()
+        if trace is not None:
+            done["timings"] = trace.as_list()
+        yield done
+    finally:
+        for task in tasks:
+            task.cancel()
 
-        try:
-            result = response.json()
-        except ValueError:
-            errors.append(f"{url}: invalid JSON body")
-            continue
+def _check_targets(data: MultiTranslateRequest):
+    if not data.target_langs:
+        raise HTTPException(status_code=422, detail="target_langs is empty")
+    if len(data.target_langs) > MULTI_MAX_TARGETS:
+        raise HTTPException(
+            status_code=413, detail=f"Too many target languages: {len(data.target_langs)} (max {MULTI_MAX_TARGETS})"
+        )
 
-        translated = result.get("translatedText")
-        if translated:
-            return {"translated_text": translated}
+@app.post("/translate/multi")
+async def translate_multi(data: MultiTranslateRequest):
+    _check_targets(data)
+    translations, errors = {}, {}
+    done = {}
+    async for event in _fan_out(data):
+        if event.get("done"):
+            done = event
+        elif "error" in event:
+            errors[event["target_lang"]] = event["error"]
         else:
-            errors.append(f"{url}: no translatedText in response")
-
-    # Fallback: use MyMemory free translator
-    # MyMemory expects locale-style codes (e.g., en-GB, fr-FR)
-    mymemory_codes = {
-        "en": "en-GB",
-        "ta": "ta-IN",
-        "hi": "hi-IN",
-        "te": "te-IN",
-        "ml": "ml-IN",
-        "kn": "kn-IN",
-        "mr": "mr-IN",
-        "bn": "bn-IN",
-        "gu": "gu-IN",
-        "pa": "pa-IN",
-        "ur": "ur-PK",
-        "ar": "ar-SA",
-        "fr": "fr-FR",
-        "es": "es-ES",
-        "de": "de-DE",
-        "it": "it-IT",
-        "pt": "pt-PT",
-        "ru": "ru-RU",
-        "zh": "zh-CN",
-        "ja": "ja-JP",
-        "ko": "ko-KR",
-        "th": "th-TH",
-        "vi": "vi-VN",
-        "id": "id-ID",
-        "tr": "tr-TR",
-        "fa": "fa-IR",
-        "he": "he-IL",
-        "el": "el-GR",
-        "nl": "nl-NL",
-        "pl": "pl-PL",
-        "sv": "sv-SE",
-        "fi": "fi-FI",
-        "no": "nb-NO",
-        "da": "da-DK",
-        "cs": "cs-CZ",
-        "hu": "hu-HU",
-        "ro": "ro-RO",
-        "sk": "sk-SK",
-        "uk": "uk-UA",
-        "bg": "bg-BG",
-        "hr": "hr-HR",
-        "sr": "sr-Latn-RS",
-        "sl": "sl-SI",
-        "et": "et-EE",
-        "lv": "lv-LV",
-        "lt": "lt-LT",
-        "ms": "ms-MY",
-        "tl": "fil-PH",
-        "sw": "sw-KE",
-        "af": "af-ZA",
-        "si": "si-LK",
-        "ne": "ne-NP",
-        "my": "my-MM",
-        "hy": "hy-AM",
-        "ca": "ca-ES",
-        "km": "km-KH",
-        "lo": "lo-LA",
-        "as": "as-IN",
-        "or": "or-IN",
-        "sd": "sd-PK",
-        "yo": "yo-NG",
-        "ha": "ha-NE",
-        "ig": "ig-NG",
-        "xh": "xh-ZA",
-        "zu": "zu-ZA",
-    }
+            translations[event["target_lang"]] = event["translated_text"]
+    if errors and not translations:
+        raise HTTPException(status_code=502, detail={"errors": errors})
+    response = {"translations": translations, "errors": errors}
+    if "detected_source_lang" in done:
+        response["detected_source_lang"] = done["detected_source_lang"]
+    with stage("serialize"):
+        return WireResponse(response)
+
+@app.post("/translate/multi/stream")
+async def translate_multi_stream(data: MultiTranslateRequest, request: Request):
+    # Same framing as /translate/stream: SSE when asked for text/event-stream, NDJSON otherwise
+    _check_targets(data)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    if "text/event-stream" in request.headers.get("accept", ""):
+        events = _sse(_fan_out(data), name="translation", id_field="target_lang")
+        return StreamingResponse(events, media_type="text/event-stream", headers=headers)
+    return StreamingResponse(_ndjson(_fan_out(data)), media_type="application/x-ndjson", headers=headers)
+
+@app.post("/translate/batch")
+async def translate_batch(data: BatchTranslateRequest):
+    if len(data.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large: {len(data.items)} items (max {BATCH_MAX_ITEMS})")
+
+    results = [None] * len(data.items)
+    requests = []
+    for item in data.items:
+        if isinstance(item, str):
+            requests.append((item, data.source_lang, data.target_lang))
+        else:
+            requests.append((item.text, item.source_lang or data.source_lang, item.target_lang or data.target_lang))
+    # Resolve every "auto" item up front, in one detector pass
+    auto = [i for i, (_, source, _) in enumerate(requests) if source == "auto"]
+    if auto:
+        await _warmed_up()
+    with stage("detect"):
+        detections = detect_batch([requests[i][0] for i in auto]) if auto else []
+    for i, detection in zip(auto, detections):
+        text, source, target = requests[i]
+        requests[i] = (text, resolve_source(source, target, detection), target)
+
+    unique = {}  # cache key -> ((text, source, target), [item indices])
+    for i, (text, source, target) in enumerate(requests):
+        if not source or not target:
+            results[i] = {"index": i, "error": "source_lang and target_lang are required"}
+            continue
+        if source == target:
+            results[i] = {"index": i, "translated_text": text}
+            continue
+        key = make_key(text, source, target)
+        unique.setdefault(key, ((text, source, target), []))[1].append(i)
 
-    mm_source = mymemory_codes.get(data.source_lang)
-    mm_target = mymemory_codes.get(data.target_lang)
-
-    def _split_text_chunks(text: str, max_len: int = 450):
-        # Word-safe chunking, prefer sentence boundaries
-        parts = []
-        current = []
-        length = 0
-        # First split by whitespace, keep punctuation
-        for word in text.split():
-            wlen = len(word) + (1 if length > 0 else 0)
-            if length + wlen > max_len:
-                parts.append(" ".join(current))
-                current = [word]
-                length = len(word)
+    misses = []
+    cache_hits = 0
+    with stage("cache"):
+        for key, (request, indices) in unique.items():
+            cached = cache.get(*request)
+            if cached is None:
+                misses.append((request, indices))
+                continue
+            cache_hits += 1
+            for i in indices:
+                results[i] = {"index": i, "translated_text": cached}
+
+    if misses:
+        start = time.perf_counter()
+        with stage("translate"):
+            outcomes = await engine.translate_batch([request for request, _ in misses], strategy=data.dispatch)
+        elapsed = (time.perf_counter() - start) / len(misses)
+        for (request, indices), (translated, error) in zip(misses, outcomes):
+            if translated:
+                cache.set(*request, translated, elapsed=elapsed)
+            for i in indices:
+                results[i] = {"index": i, "translated_text": translated} if translated else {"index": i, "error": error}
+
+    for i in auto:
+        source = requests[i][1]
+        results[i]["detected_source_lang"] = None if source == "auto" else source
+
+    return {"results": results, "unique": len(unique), "cache_hits": cache_hits}
+
+@app.post("/tts")
+async def text_to_speech(data: TTSRequest, request: Request):
+    if not data.text.strip():
+        raise HTTPException(status_code=422, detail="text is empty")
+    if len(data.text) > tts.max_chars:
+        raise HTTPException(status_code=413, detail=f"Text too long: {len(data.text)} chars (max {tts.max_chars})")
+    await _warmed_up()
+    try:
+        tts.check(data.lang)
+    except TTSUnavailable as e:
+        raise HTTPException(status_code=422 if tts.languages() else 503, detail=str(e))
+    # The audio for a (text, lang) never changes, so it can be cached by clients too
+    etag = f'"{audio_key(data.text, data.lang)}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    path = tts.cached(data.text, data.lang)
+    if path is not None:
+        return FileResponse(path, media_type="audio/mpeg", headers=headers)
+    # Synthesize the first part before answering, so failures still get a proper status
+    chunks = tts.iter_synthesized(data.text, data.lang)
+    try:
+        first = await run_in_threadpool(next, chunks, b"")
+    except TTSUnavailable as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return StreamingResponse(itertools.chain([first], chunks), media_type="audio/mpeg", headers=headers)
+
+async def _spool_body(request, spool, max_bytes):
+    # Copies the raw request body to a file, rewound for reading; 413 past max_bytes
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File too large (max {max_bytes} bytes)")
+        spool.write(chunk)
+    spool.seek(0)
+
+async def _translate_many(texts, source_lang, target_lang, strategy=None):
+    # One translation per text (None where it failed): each distinct text is looked up in the
+    # cache once and the misses go upstream in a single engine batch
+    if source_lang == target_lang:
+        return list(texts)
+    found = {}
+    misses = []
+    with stage("cache"):
+        for text in dict.fromkeys(texts):
+            cached = cache.get(text, source_lang, target_lang)
+            if cached is None:
+                misses.append(text)
             else:
-                if length > 0:
-                    current.append(word)
-                    length += len(word) + 1
-                else:
-                    current = [word]
-                    length = len(word)
-        if current:
-            parts.append(" ".join(current))
-        return parts
-
-    # Skip MyMemory if codes unsupported or source is auto
-    if mm_target and mm_source and data.source_lang != "auto":
+                found[text] = cached
+    # Misses already on their way upstream for another request are waited for, not sent again
+    joined = [text for text in misses if flights.in_flight(make_key(text, source_lang, target_lang))]
+    misses = [text for text in misses if text not in joined]
+
+    async def join(text):
+        key = make_key(text, source_lang, target_lang)
+        if not flights.in_flight(key):
+            # Finished before we got here: it is cached if it worked
+            found[text] = cache.get(text, source_lang, target_lang)
+            return
+        try:
+            found[text] = await flights.do(key, None)
+        except TranslationFailed:
+            pass
+
+    async def send():
+        start = time.perf_counter()
+        outcomes = await engine.translate_batch([(text, source_lang, target_lang) for text in misses], strategy)
+        elapsed = (time.perf_counter() - start) / len(misses)
+        for text, (translated, _) in zip(misses, outcomes):
+            if translated:
+                cache.set(text, source_lang, target_lang, translated, elapsed=elapsed)
+                found[text] = translated
+
+    if misses or joined:
+        with stage("translate"):
+            await asyncio.gather(*(join(text) for text in joined), *([send()] if misses else []))
+    return [found.get(text) for text in texts]
+
+@app.post("/translate/document")
+async def translate_document(
+    request: Request,
+    source_lang: str,
+    target_lang: str,
+    format: Optional[str] = None,
+    dispatch: Optional[Literal["sequential", "hedged", "race"]] = None,
+):
+    # The document is the raw request body. Only its text runs are translated, with inline markup,
+    # code and URLs held back as placeholders; everything else is copied as is.
+    try:
+        fmt = documents.format_for(request.headers.get("content-type"), format)
+    except DocumentError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    spool = tempfile.TemporaryFile()
+    try:
+        await _spool_body(request, spool, DOCUMENT_MAX_BYTES)
+        windows = documents.iter_windows(documents.parse(documents.read_text(spool), fmt), DOCUMENT_WINDOW)
+        # The first window is translated before answering, so a failure still gets a proper status
         try:
-            translator = MyMemoryTranslator(source=mm_source, target=mm_target)
-            chunks = _split_text_chunks(data.text, max_len=450)
-            translated_chunks = []
-            for ch in chunks:
-                tr = translator.translate(ch)
-                if not tr:
-                    errors.append("MyMemory returned empty for a chunk")
-                    continue
-                translated_chunks.append(tr)
-            if translated_chunks:
-                return {"translated_text": " ".join(translated_chunks)}
-        except Exception as e:
-            errors.append(f"MyMemory fallback failed: {e}")
-
-    raise HTTPException(status_code=502, detail="; ".join(errors) or "Translation failed")
+            with stage("segment"):
+                first = await asyncio.to_thread(next, windows, [])
+        except DocumentError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        texts = documents.units_of(first)
+        headers = {}
+        if source_lang == "auto":
+            await _warmed_up()
+            with stage("detect"):
+                source_lang = resolve_source(source_lang, target_lang, detect(documents.plain_text(first)))
+            # Like detected_source_lang on /translate: only a language detection settled on
+            if source_lang != "auto":
+                headers["X-Detected-Source-Lang"] = source_lang
+        translations = await _translate_many(texts, source_lang, target_lang, dispatch)
+        if texts and not any(translations):
+            wait = engine.quota_wait(source_lang, target_lang)
+            if wait is not None:
+                raise HTTPException(
+                    status_code=429, detail="All providers are out of quota", headers={"Retry-After": str(math.ceil(wait))}
+                )
+            raise HTTPException(status_code=502, detail="Translation failed")
+    except BaseException:
+        spool.close()
+        raise
+
+    async def body():
+        # Text runs that still fail later on are left in the source language
+        try:
+            yield documents.render(first, translations)
+            while True:
+                window = await asyncio.to_thread(next, windows, None)
+                if window is None:
+                    break
+                texts = documents.units_of(window)
+                yield documents.render(window, await _translate_many(texts, source_lang, target_lang, dispatch))
+        finally:
+            spool.close()
+
+    return StreamingResponse(body(), media_type=documents.MEDIA_TYPES[fmt], headers=headers)
+
+@app.post("/translate/upload")
+async def translate_upload(
+    request: Request,
+    source_lang: str,
+    target_lang: str,
+    format: Optional[str] = None,
+    field: str = "text",
+    dispatch: Optional[Literal["sequential", "hedged", "race"]] = None,
+):
+    # Plain text or JSONL, translated while it is uploaded: the response streams back in input
+    # order as segments complete, without the body ever being held whole (see backend/uploads.py)
+    try:
+        fmt = uploads.format_for(request.headers.get("content-type"), format)
+    except UploadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    async def translate(text):
+        if source_lang == target_lang:
+            return text
+        source = source_lang
+        if source == "auto":
+            # Every segment (or JSONL line) is detected on its own: an upload may mix languages,
+            # and one short segment is too little to decide for the rest
+            await _warmed_up()
+            with stage("detect"):
+                source = resolve_source(source, target_lang, detect(text))
+        return await _translate_cached(text, source, target_lang, dispatch)
+
+    upload = UploadTranslation(
+        request.stream(), fmt, translate, TranslationFailed, window=UPLOAD_WINDOW,
+        segment_chars=STREAM_SEGMENT_CHARS, field=field, spool_bytes=UPLOAD_SPOOL_BYTES,
+    )
+    # The first segment is translated before answering, so a failure still gets a proper status
+    try:
+        await upload.started()
+    except UploadError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except QuotaExhausted as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(math.ceil(e.retry_after))})
+    except TranslationFailed as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return UploadResponse(upload.body(), media_type=uploads.MEDIA_TYPES[fmt])
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    request: Request,
+    source_lang: str,
+    target_lang: str,
+    format: Optional[str] = None,
+    field: str = "text",
+    column: str = "text",
+):
+    # The file is the raw request body; it is spooled to disk before being split into units
+    try:
+        fmt = format_for(request.headers.get("content-type"), format)
+    except JobError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    with tempfile.TemporaryFile() as spool:
+        await _spool_body(request, spool, JOBS_MAX_BYTES)
+        try:
+            job = await asyncio.to_thread(
+                jobs.create, spool, fmt, source_lang, target_lang, {"field": field, "column": column}
+            )
+        except JobError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+    if JOB_WORKERS:
+        await asyncio.to_thread(job_workers.start)
+    return WireResponse(job, status_code=202, headers={"Location": f"/jobs/{job['id']}"})
+
+@app.get("/jobs/stats")
+def job_stats():
+    return {**job_workers.stats(), **jobs.stats()}
+
+@app.get("/jobs/{job_id}")
+def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return job
+
+@app.get("/jobs/{job_id}/result")
+def job_result(job_id: str):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    if job["status"] != "done":
+        raise HTTPException(status_code=409, detail=f"Job is {job['status']} ({job['progress']:.0%})")
+    fmt = job["format"]
+    headers = {"Content-Disposition": f'attachment; filename="{job_id}.{EXTENSIONS[fmt]}"'}
+    # Read page by page from the store while it is sent
+    return StreamingResponse(jobs.iter_result(job_id), media_type=MEDIA_TYPES[fmt], headers=headers)
+
+@app.delete("/jobs/{job_id}", status_code=204)
+def delete_job(job_id: str):
+    if not jobs.delete(job_id):
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return Response(status_code=204)
 
 @app.get("/")
 def root():
     return {"status": "ok"}
 
+@app.get("/providers/health")
+def providers_health():
+    return {"ordering": engine.health.config.ordering, "providers": engine.health.snapshot()}
+
+@app.get("/providers/quota")
+def providers_quota():
+    return {"providers": engine.quotas.snapshot()}
+
+@app.get("/ratelimit/stats")
+def ratelimit_stats():
+    return rate_limiter.stats()
+
+@app.get("/batching/stats")
+def batching_stats():
+    return engine.batcher.snapshot()
+
+@app.get("/cache/stats")
+def cache_stats():
+    return {**cache.stats(), "single_flight": flights.stats()}
+
+@app.get("/tts/stats")
+def tts_stats():
+    return {"voices": len(tts.languages()), **tts.cache.stats()}
+
+@app.get("/metrics")
+def metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/memory/stats")
+def memory_stats():
+    if memory is None:
+        return {"enabled": False}
+    return {"enabled": True, **memory.stats()}
+
+@app.get("/compression/stats")
+def compression_stats():
+    return compressor.stats()
+
+def _representation(body):
+    return body, '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+# GET /languages in every body format the server speaks, each with its own ETag
+LANGUAGES_BODIES = {wire.JSON: (LANGUAGES_JSON, LANGUAGES_ETAG)}
+if wire.MSGPACK in wire.MEDIA_TYPES:
+    LANGUAGES_BODIES[wire.MSGPACK] = _representation(wire.encode(wire.loads(LANGUAGES_JSON), wire.MSGPACK))
+
 @app.get("/languages")
-def list_languages():
-    # Return sorted language list as [{code, name}]
-    items = [{"code": code, "name": LANGUAGE_NAMES.get(code, code)} for code in sorted(set([
-        "af","ar","as","bg","bn","ca","cs","da","de","el","en","es","et","fa","fi","fr","gu","ha","he","hi","hr","hu","hy","id","ig","it","ja","km","kn","ko","lo","lt","lv","ml","mr","ms","my","nb","ne","nl","no","or","pa","pl","pt","ro","ru","sd","si","sk","sl","sr","sv","sw","ta","te","th","tl","tr","uk","ur","vi","yo","zh","zu","xh"
-    ]) )]
-    return {"languages": items}
+async def list_languages(request: Request):
+    # The list never changes while the process runs; its body and ETag are built at import
+    media_type = wire.response_media_type()
+    body, etag = LANGUAGES_BODIES[media_type]
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400"}
+    if len(LANGUAGES_BODIES) > 1:
+        headers["Vary"] = "Accept"
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type=media_type, headers=headers)
@@ -0,0 +1,244 @@
+"""Translation memory: reuse of previously translated sentences.
+
+Entries are (source sentence -> target sentence) per language pair, stored in
+SQLite. Lookups try an exact match on the normalized sentence first, then a
+fuzzy match: a MinHash signature of character trigrams is split into LSH
+bands, sentences sharing a band become candidates, and the closest candidate
+is reused when its trigram Jaccard similarity reaches the threshold. Numbers
+are part of the band keys, so a near match always carries the same figures,
+but nothing catches a negation or an antonym ("available"/"unavailable"), so
+fuzzy reuse is off unless a threshold is set. The store is bounded: past
+``max_entries`` the least recently used sentences are dropped, as are those
+unused for ``max_idle`` seconds when that is set. Only the standard library is used.
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+from .cache import make_key, normalize_text
+
+NUM_PERM = 16
+BANDS = 4
+ROWS = NUM_PERM // BANDS
+# Most candidates verified per fuzzy lookup, those sharing the most bands first
+MAX_CANDIDATES = 32
+# Stores between two evictions, so the cap can be overshot by this much
+PRUNE_EVERY = 256
+# A hit refreshes its entry's last use at most this often, sparing a write per lookup
+TOUCH_SECONDS = 60
+# XOR with a fixed random mask permutes 32-bit hashes cheaply; the masks are derived
+# deterministically so signatures stay comparable across restarts
+_MASKS = [int.from_bytes(hashlib.blake2b(f"minhash{i}".encode(), digest_size=4).digest(), "big") for i in range(NUM_PERM)]
+_SPACES = re.compile(r"\s+")
+_NUMBER = re.compile(r"\d+(?:[.,:]\d+)*")
+
+
+def shingles(text, n=3):
+    text = _SPACES.sub(" ", normalize_text(text).lower())
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def minhash(grams):
+    hashes = [zlib.crc32(g.encode("utf-8")) for g in grams]
+    return [min(h ^ mask for h in hashes) for mask in _MASKS]
+
+
+def band_keys(signature, source_lang, target_lang, numbers=()):
+    # The sentence's numbers are part of every band, so only sentences with identical
+    # figures can become candidates
+    keys = []
+    prefix = f"{source_lang}|{target_lang}|{' '.join(numbers)}"
+    for band in range(BANDS):
+        rows = signature[band * ROWS:(band + 1) * ROWS]
+        raw = f"{prefix}|{band}|{','.join(map(str, rows))}".encode()
+        keys.append(int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "big") >> 1)
+    return keys
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class TranslationMemory:
+    """Sentence-level translation memory with exact and fuzzy (MinHash/LSH) lookup."""
+
+    def __init__(self, path=":memory:", fuzzy_threshold=0.0, max_entries=100_000, max_idle=0):
+        self.path = path
+        # 0 or >= 1 turns fuzzy matching off
+        self.fuzzy_threshold = fuzzy_threshold
+        # 0 turns either limit off
+        self.max_entries = max_entries
+        self.max_idle = max_idle
+        self.evicted = 0
+        self._since_prune = 0
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "key TEXT PRIMARY KEY, source_lang TEXT NOT NULL, target_lang TEXT NOT NULL, "
+            "source TEXT NOT NULL, target TEXT NOT NULL, updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands (band INTEGER NOT NULL, key TEXT NOT NULL, PRIMARY KEY (band, key))"
+        )
+        # Eviction walks segments oldest first and drops an entry's bands by key
+        self._conn.execute("CREATE INDEX IF NOT EXISTS segments_updated ON segments (updated)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (key)")
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        if env.get("TRANSLATION_MEMORY_DISABLED", "").lower() in ("1", "true", "yes"):
+            return None
+        return cls(
+            env.get("TRANSLATION_MEMORY_DB", ":memory:"),
+            fuzzy_threshold=float(env.get("TRANSLATION_MEMORY_FUZZY_THRESHOLD", 0)),
+            max_entries=int(env.get("TRANSLATION_MEMORY_MAX_ENTRIES", 100_000)),
+            max_idle=float(env.get("TRANSLATION_MEMORY_MAX_IDLE_SECONDS", 0)),
+        )
+
+    @property
+    def fuzzy(self):
+        return 0 < self.fuzzy_threshold < 1
+
+    def lookup(self, text, source_lang, target_lang):
+        key = make_key(text, source_lang, target_lang)
+        with self._lock:
+            row = self._conn.execute("SELECT target, updated FROM segments WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                now = time.time()
+                if now - row[1] >= TOUCH_SECONDS:
+                    self._conn.execute("UPDATE segments SET updated = ? WHERE key = ?", (now, key))
+                self.exact_hits += 1
+                return row[0]
+        match = self._fuzzy_lookup(text, source_lang, target_lang) if self.fuzzy else None
+        with self._lock:
+            if match is None:
+                self.misses += 1
+            else:
+                self.fuzzy_hits += 1
+        return match
+
+    def lookup_many(self, texts, source_lang, target_lang):
+        # {text: translation or None}; blocking, so async callers run it in a thread
+        return {text: self.lookup(text, source_lang, target_lang) for text in texts}
+
+    def _fuzzy_lookup(self, text, source_lang, target_lang):
+        grams = shingles(text)
+        numbers = _NUMBER.findall(text)
+        bands = band_keys(minhash(grams), source_lang, target_lang, numbers)
+        marks = ",".join("?" * len(bands))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT s.source, s.target FROM segments s JOIN "
+                f"(SELECT key, COUNT(*) AS shared FROM bands WHERE band IN ({marks}) "
+                f"GROUP BY key ORDER BY shared DESC LIMIT {MAX_CANDIDATES}) c ON c.key = s.key",
+                bands,
+            ).fetchall()
+        best, best_score = None, self.fuzzy_threshold
+        for source, target in rows:
+            # Band keys can collide; a near match with different numbers would carry the wrong figures over
+            if _NUMBER.findall(source) != numbers:
+                continue
+            score = jaccard(grams, shingles(source))
+            if score >= best_score:
+                best, best_score = target, score
+        return best
+
+    def store(self, text, source_lang, target_lang, translated):
+        self.store_many([(text, translated)], source_lang, target_lang)
+
+    def store_many(self, pairs, source_lang, target_lang):
+        # (text, translation) pairs in one transaction; blocking, so async callers run it in a thread
+        rows, band_rows = [], []
+        now = time.time()
+        for text, translated in pairs:
+            key = make_key(text, source_lang, target_lang)
+            rows.append((key, source_lang, target_lang, normalize_text(text), translated, now))
+            if self.fuzzy:
+                bands = band_keys(minhash(shingles(text)), source_lang, target_lang, _NUMBER.findall(text))
+                band_rows.extend((b, key) for b in bands)
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO segments (key, source_lang, target_lang, source, target, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.executemany("INSERT OR IGNORE INTO bands (band, key) VALUES (?, ?)", band_rows)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self.stores += len(rows)
+            self._since_prune += len(rows)
+            if self._since_prune >= PRUNE_EVERY:
+                self._since_prune = 0
+                self._prune()
+
+    def _prune(self):
+        # Called with the lock held: drops idle entries, then the least recently used past the cap
+        cutoff = time.time() - self.max_idle if self.max_idle > 0 else 0
+        keys = [r[0] for r in self._conn.execute("SELECT key FROM segments WHERE updated < ?", (cutoff,))]
+        if self.max_entries > 0:
+            excess = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0] - len(keys) - self.max_entries
+            if excess > 0:
+                keys += [r[0] for r in self._conn.execute(
+                    "SELECT key FROM segments WHERE updated >= ? ORDER BY updated LIMIT ?", (cutoff, excess)
+                )]
+        if not keys:
+            return
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany("DELETE FROM segments WHERE key = ?", [(k,) for k in keys])
+            self._conn.executemany("DELETE FROM bands WHERE key = ?", [(k,) for k in keys])
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.evicted += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM segments")
+            self._conn.execute("DELETE FROM bands")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.exact_hits + self.fuzzy_hits + self.misses
+            hits = self.exact_hits + self.fuzzy_hits
+            stats = {
+                "exact_hits": self.exact_hits,
+                "fuzzy_hits": self.fuzzy_hits,
+                "misses": self.misses,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evicted": self.evicted,
+                "max_entries": self.max_entries or None,
+                "max_idle_seconds": self.max_idle or None,
+                "fuzzy_threshold": self.fuzzy_threshold if self.fuzzy else None,
+            }
+        stats["entries"] = len(self)
+        return stats
@@ -0,0 +1,276 @@
+"""Prometheus-style metrics and per-request stage timings.
+
+Counters and histograms live in a process-wide registry and are rendered in
+the Prometheus text format by ``GET /metrics``. Pipeline code times its
+stages with ``stage(name)``, which feeds ``translate_stage_seconds`` and,
+when the request asked for it with the debug header, the request's ``Trace``;
+``MetricsMiddleware`` returns that trace as a ``Server-Timing`` header. Only
+the standard library is used.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Upper bounds (seconds, bytes, providers tried) of the histogram buckets
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+DEPTH_BUCKETS = (1, 2, 3, 4, 5, 6, 8)
+
+# Requests carrying this header (any value but "0") get their stage timings back
+DEBUG_HEADER = "x-debug-timings"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, labels)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [per-bucket counts (+Inf last), sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return series[2] if series else 0
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((labels, (list(s[0]), s[1], s[2])) for labels, s in self._series.items())
+        for labels, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _format_number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, labels)} {_format_number(float(total))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, labels)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help, labels=()):
+        metric = Counter(name, help, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter("http_requests_total", "HTTP requests by endpoint and status", ("endpoint", "status"))
+HTTP_SECONDS = REGISTRY.histogram("http_request_duration_seconds", "Time to the last response byte", ("endpoint",))
+HTTP_REQUEST_BYTES = REGISTRY.histogram(
+    "http_request_size_bytes", "Request body size", ("endpoint",), buckets=SIZE_BUCKETS
+)
+HTTP_RESPONSE_BYTES = REGISTRY.histogram(
+    "http_response_size_bytes", "Response body size", ("endpoint",), buckets=SIZE_BUCKETS
+)
+STAGE_SECONDS = REGISTRY.histogram("translate_stage_seconds", "Time spent per pipeline stage", ("stage",))
+PROVIDER_SECONDS = REGISTRY.histogram(
+    "provider_call_duration_seconds", "Provider call latency (all segments of one call)", ("provider",)
+)
+PROVIDER_CALLS = REGISTRY.counter(
+    "provider_calls_total",
+    "Provider call outcomes: ok, http, bad_json, empty, unreachable, circuit_open, quota, throttled, cancelled, error",
+    ("provider", "outcome"),
+)
+UPSTREAM_SECONDS = REGISTRY.histogram(
+    "provider_http_request_duration_seconds", "Latency of each upstream HTTP request (one per segment/chunk)", ("provider",)
+)
+FALLBACK_DEPTH = REGISTRY.histogram(
+    "translate_fallback_depth",
+    "Providers tried per translation (1: the first one answered)",
+    ("outcome",),
+    buckets=DEPTH_BUCKETS,
+)
+
+SINGLE_FLIGHT = REGISTRY.counter(
+    "translate_single_flight_total",
+    "Cache misses that went upstream (leader) or joined an identical call in flight (follower)",
+    ("role",),
+)
+
+
+class Trace:
+    """Stage timings collected for one request."""
+
+    def __init__(self):
+        self.stages = []  # (name, seconds, detail)
+
+    def add(self, name, seconds, detail=None):
+        self.stages.append((name, seconds, detail))
+
+    def as_list(self):
+        return [
+            {"stage": name, "ms": round(seconds * 1000, 3), **({"detail": detail} if detail else {})}
+            for name, seconds, detail in self.stages
+        ]
+
+    def server_timing(self):
+        # https://www.w3.org/TR/server-timing/; repeated stages get a numeric suffix
+        seen = {}
+        entries = []
+        for name, seconds, detail in self.stages:
+            seen[name] = seen.get(name, 0) + 1
+            metric = name if seen[name] == 1 else f"{name}-{seen[name]}"
+            entry = f"{metric};dur={seconds * 1000:.2f}"
+            if detail:
+                entry += f';desc="{_escape(detail)}"'
+            entries.append(entry)
+        return ", ".join(entries)
+
+
+_trace = ContextVar("trace", default=None)
+
+
+def current_trace():
+    return _trace.get()
+
+
+def record_stage(name, seconds, detail=None):
+    STAGE_SECONDS.observe(seconds, name)
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, seconds, detail)
+
+
+@contextmanager
+def stage(name, detail=None):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start, detail)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: per-endpoint request counts, latency and body sizes, plus debug stage timings.
+
+    Requests are labelled with the route template they matched (``/jobs/{job_id}``), and
+    unknown paths are counted as endpoint "other", so neither ids nor scanners can blow up
+    label cardinality.
+    """
+
+    def __init__(self, app, debug_header=DEBUG_HEADER):
+        self.app = app
+        self.debug_header = debug_header.lower().encode()
+        self._templates = None
+
+    def _endpoint(self, scope):
+        route = scope.get("route")
+        if route is not None and getattr(route, "path", None):
+            return route.path
+        # Answered before routing (e.g. rate limited), or routed under a copied scope
+        if self._templates is None:
+            routes = getattr(scope.get("app"), "routes", ())
+            self._templates = [(r.path_regex, r.path) for r in routes if getattr(r, "path_regex", None)]
+        path = scope.get("path", "")
+        return next((template for regex, template in self._templates if regex.match(path)), "other")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        debug = any(k == self.debug_header and v not in (b"", b"0") for k, v in scope.get("headers", ()))
+        trace = Trace() if debug else None
+        token = _trace.set(trace)
+        start = time.perf_counter()
+        request_bytes = response_bytes = 0
+        status = 500
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def timed_send(message):
+            nonlocal response_bytes, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if trace is not None and trace.stages:
+                    headers = list(message.get("headers", ()))
+                    headers.append((b"server-timing", trace.server_timing().encode()))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, timed_send)
+        finally:
+            _trace.reset(token)
+            # After the call: the router has put the matched route in the scope by then
+            endpoint = self._endpoint(scope)
+            HTTP_REQUESTS.inc(endpoint, str(status))
+            HTTP_SECONDS.observe(time.perf_counter() - start, endpoint)
+            HTTP_REQUEST_BYTES.observe(request_bytes, endpoint)
+            HTTP_RESPONSE_BYTES.observe(response_bytes, endpoint)
@@ -0,0 +1,343 @@
+"""Translation providers and their HTTP calls.
+
+Each provider turns (text, source, target) into a translation using an
+``aiohttp.ClientSession`` owned by the engine, or raises ``ProviderError``.
+"""
+import asyncio
+import os
+import re
+import time
+from email.utils import parsedate_to_datetime
+from json import loads as json_loads
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .languages import HF_CODES, LIBRE_CODES, MYMEMORY_CODES
+from .metrics import UPSTREAM_SECONDS
+from .ratelimit import TokenBucket
+from .segmenter import iter_segments, rebuild
+
+DEFAULT_HF_MODEL = "facebook/m2m100_418M"
+DEFAULT_LIBRETRANSLATE_URLS = [
+    "https://libretranslate.de/translate",
+    "https://libretranslate.com/translate",
+    "https://translate.argosopentech.com/translate",
+]
+DEFAULT_MYMEMORY_URL = "https://api.mymemory.translated.net/get"
+
+
+class ProviderError(Exception):
+    # kind is one of: unreachable, http, bad_json, empty, circuit_open, quota
+    def __init__(self, provider, kind, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.provider = provider
+        self.kind = kind
+        self.status = status
+        # Seconds the provider asked us to wait (Retry-After), when it said
+        self.retry_after = retry_after
+
+    @property
+    def is_provider_fault(self):
+        # Outages and 5xx count against provider health; 4xx, throttling and empty results don't
+        # (429s pause the provider through its quota budget instead)
+        if self.kind in ("unreachable", "bad_json"):
+            return True
+        return self.kind == "http" and (self.status is None or self.status >= 500)
+
+    @property
+    def throttled(self):
+        return self.kind == "http" and self.status == 429
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# "... NEXT AVAILABLE IN  19 HOURS 47 MINUTES 33 SECONDS ..." in MyMemory's quota message
+_MYMEMORY_NEXT = re.compile(r"NEXT AVAILABLE IN\s+(\d+) HOURS? (\d+) MINUTES? (\d+) SECONDS?", re.IGNORECASE)
+
+
+def _retry_after(value):
+    # Retry-After header: delay in seconds or an HTTP date
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Provider:
+    name = "provider"
+    url = ""
+    timeout = 10.0
+    # Providers that accept many texts per request set supports_batch and max_batch
+    supports_batch = False
+    max_batch = 1
+    # Longest segment sent in one request (None: whole text), and whether a segment may span
+    # line breaks (only for providers that keep newlines intact)
+    max_chars = None
+    break_on_newline = True
+    # Segments of one text translated in parallel, the host-wide request rate they share
+    # (None: unlimited) and how often a failed segment is retried on its own
+    chunk_concurrency = 4
+    rate_limiter = None
+    chunk_retries = 0
+    # In-process providers don't get an HTTP connection pool
+    needs_client = True
+    # Set by providers that already merge concurrent requests, so the engine doesn't batch them again
+    coalesces = False
+
+    @property
+    def host(self):
+        # Connection pools are shared per scheme+host
+        parts = urlsplit(self.url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def supports(self, source, target):
+        return True
+
+    async def close(self):
+        pass
+
+    async def translate(self, client, text, source, target):
+        # Segment to this provider's max length, translate the pieces and rebuild the layout
+        segments = list(iter_segments(text, self.max_chars, self.break_on_newline))
+        pieces = [seg.text for seg in segments if seg.text]
+        if not pieces:
+            return text
+        return rebuild(segments, await self.translate_segments(client, pieces, source, target))
+
+    async def translate_batch(self, client, texts, source, target):
+        # Segment every text, translate all segments together, then rebuild each text.
+        # Only used by the engine for providers with supports_batch.
+        documents = [list(iter_segments(text, self.max_chars, self.break_on_newline)) for text in texts]
+        pieces = [seg.text for segments in documents for seg in segments if seg.text]
+        translated = iter(await self.translate_segments(client, pieces, source, target) if pieces else [])
+        results = []
+        for segments in documents:
+            count = sum(1 for seg in segments if seg.text)
+            results.append(rebuild(segments, [next(translated) for _ in range(count)]))
+        return results
+
+    async def translate_segment(self, client, text, source, target):
+        raise NotImplementedError
+
+    async def translate_segments(self, client, pieces, source, target):
+        if len(pieces) == 1:
+            return [await self._translate_segment_with_retry(client, pieces[0], source, target)]
+        sem = asyncio.Semaphore(self.chunk_concurrency)
+
+        async def run(piece):
+            async with sem:
+                return await self._translate_segment_with_retry(client, piece, source, target)
+
+        tasks = [asyncio.ensure_future(run(piece)) for piece in pieces]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # One segment failed for good (or we were cancelled): stop the others
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def _translate_segment_with_retry(self, client, piece, source, target):
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire()
+            try:
+                return await self.translate_segment(client, piece, source, target)
+            except ProviderError as e:
+                retryable = e.is_provider_fault or e.kind == "empty"
+                if not retryable or attempt >= self.chunk_retries:
+                    raise
+            await asyncio.sleep(0.25 * 2 ** attempt)
+            attempt += 1
+
+    async def _request_json(self, client, method, params=None, json=None, headers=None):
+        start = time.perf_counter()
+        try:
+            async with client.request(
+                method,
+                self.url,
+                params=params,
+                json=json,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            ) as r:
+                body = await r.text()
+                status = r.status
+                retry_after = _retry_after(r.headers.get("Retry-After"))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise ProviderError(self.name, "unreachable", f"{self.name}: unreachable ({str(e) or type(e).__name__})")
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, self.name)
+        if status >= 400:
+            raise ProviderError(self.name, "http", f"{self.name}: {status} {body}", status=status, retry_after=retry_after)
+        try:
+            return json_loads(body)
+        except ValueError:
+            raise ProviderError(self.name, "bad_json", f"{self.name}: invalid JSON body")
+
+
+def _hf_text(item):
+    if isinstance(item, list) and item:
+        item = item[0]
+    if isinstance(item, dict):
+        return item.get("translation_text") or item.get("generated_text")
+    return None
+
+
+class HuggingFaceProvider(Provider):
+    timeout = 15.0
+    supports_batch = True
+
+    def __init__(self, api_key, model=DEFAULT_HF_MODEL, url=None, max_batch=16, max_chars=1000):
+        self.api_key = api_key
+        self.model = model
+        self.url = url or f"https://api-inference.huggingface.co/models/{model}"
+        self.name = f"HF {model}"
+        self.max_batch = max_batch
+        self.max_chars = max_chars
+
+    def supports(self, source, target):
+        return bool(self.api_key) and source != "auto"
+
+    async def _infer(self, client, inputs, source, target):
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        params = {"src_lang": HF_CODES.get(source, source), "tgt_lang": HF_CODES.get(target, target)}
+        payload = {"inputs": inputs, "parameters": params}
+        return await self._request_json(client, "POST", json=payload, headers=headers)
+
+    async def translate_segment(self, client, text, source, target):
+        out = await self._infer(client, text, source, target)
+        translated = _hf_text(out)
+        if not translated:
+            raise ProviderError(self.name, "empty", "HF: no translation_text in response")
+        return translated
+
+    async def translate_segments(self, client, pieces, source, target):
+        if len(pieces) == 1:
+            return [await self.translate_segment(client, pieces[0], source, target)]
+        # List-valued inputs translate up to max_batch segments in one forward pass
+        groups = [pieces[k:k + self.max_batch] for k in range(0, len(pieces), self.max_batch)]
+        outs = await asyncio.gather(*(self._infer_list(client, group, source, target) for group in groups))
+        return [translated for group in outs for translated in group]
+
+    async def _infer_list(self, client, texts, source, target):
+        out = await self._infer(client, list(texts), source, target)
+        if not isinstance(out, list) or len(out) != len(texts):
+            raise ProviderError(self.name, "bad_json", f"HF: expected {len(texts)} translations in batch response")
+        translated = [_hf_text(item) for item in out]
+        if not all(translated):
+            raise ProviderError(self.name, "empty", "HF: no translation_text for some batch items")
+        return translated
+
+
+class LibreTranslateProvider(Provider):
+    # LibreTranslate keeps line breaks, so segments may span them
+    break_on_newline = False
+
+    def __init__(self, url, max_chars=2000):
+        self.url = url
+        self.name = url
+        self.max_chars = max_chars
+
+    async def translate_segment(self, client, text, source, target):
+        payload = {
+            "q": text,
+            "source": LIBRE_CODES.get(source, source),
+            "target": LIBRE_CODES.get(target, target),
+            "format": "text",
+        }
+        result = await self._request_json(client, "POST", json=payload)
+        translated = result.get("translatedText") if isinstance(result, dict) else None
+        if not translated:
+            raise ProviderError(self.name, "empty", f"{self.url}: no translatedText in response")
+        return translated
+
+
+class MyMemoryProvider(Provider):
+    name = "MyMemory"
+    max_chars = 450
+
+    def __init__(self, url=DEFAULT_MYMEMORY_URL, chunk_concurrency=4, rate_limit=10.0, rate_burst=None, chunk_retries=2):
+        self.url = url
+        # Chunks of one text translated in parallel, and the host-wide request rate they share
+        self.chunk_concurrency = max(1, chunk_concurrency)
+        self.rate_limiter = TokenBucket(rate_limit, rate_burst)
+        self.chunk_retries = chunk_retries
+
+    def supports(self, source, target):
+        # Skip MyMemory if codes unsupported or source is auto
+        return source != "auto" and source in MYMEMORY_CODES and target in MYMEMORY_CODES
+
+    async def translate_segment(self, client, text, source, target):
+        langpair = f"{MYMEMORY_CODES[source]}|{MYMEMORY_CODES[target]}"
+        body = await self._request_json(client, "GET", params={"q": text, "langpair": langpair})
+        # MyMemory reports quota and validation errors in the body with HTTP 200
+        status = body.get("responseStatus", 200) if isinstance(body, dict) else 200
+        if str(status) != "200":
+            details = str(body.get("responseDetails", ""))
+            wait = _MYMEMORY_NEXT.search(details)
+            raise ProviderError(
+                self.name,
+                "http",
+                f"MyMemory: {status} {details}",
+                status=_int_or_none(status),
+                retry_after=int(wait[1]) * 3600 + int(wait[2]) * 60 + int(wait[3]) if wait else None,
+            )
+        translated = (body.get("responseData") or {}).get("translatedText") if isinstance(body, dict) else None
+        if not translated:
+            raise ProviderError(self.name, "empty", "MyMemory returned empty for a chunk")
+        return translated
+
+
+def build_providers(environ=None):
+    # Default chain: HF → LibreTranslate mirrors → MyMemory. URLs can be overridden (e.g. to point at stubs).
+    # With LOCAL_MODELS set, the offline CPU provider is added last (or first with LOCAL_PROVIDER_POSITION=first).
+    from .local import LocalProvider
+
+    env = os.environ if environ is None else environ
+    providers = []
+    api_key = env.get("HUGGINGFACE_API_KEY")
+    if api_key:
+        model = env.get("HUGGINGFACE_MODEL", DEFAULT_HF_MODEL)
+        providers.append(
+            HuggingFaceProvider(
+                api_key,
+                model,
+                url=env.get("HUGGINGFACE_API_URL"),
+                max_batch=int(env.get("HUGGINGFACE_BATCH_SIZE", 16)),
+                max_chars=int(env.get("HUGGINGFACE_MAX_CHARS", 1000)),
+            )
+        )
+    libre_urls = env.get("LIBRETRANSLATE_URLS")
+    urls = [u.strip() for u in libre_urls.split(",") if u.strip()] if libre_urls else DEFAULT_LIBRETRANSLATE_URLS
+    libre_max_chars = int(env.get("LIBRETRANSLATE_MAX_CHARS", 2000))
+    providers.extend(LibreTranslateProvider(url, max_chars=libre_max_chars) for url in urls)
+    providers.append(
+        MyMemoryProvider(
+            env.get("MYMEMORY_API_URL", DEFAULT_MYMEMORY_URL),
+            chunk_concurrency=int(env.get("MYMEMORY_CHUNK_CONCURRENCY", 4)),
+            rate_limit=float(env.get("MYMEMORY_RATE_LIMIT", 10)),
+            chunk_retries=int(env.get("MYMEMORY_CHUNK_RETRIES", 2)),
+        )
+    )
+    local = LocalProvider.from_env(env)
+    if local is not None:
+        if env.get("LOCAL_PROVIDER_POSITION", "last").strip().lower() == "first":
+            providers.insert(0, local)
+        else:
+            providers.append(local)
+    return providers
@@ -0,0 +1,267 @@
+"""Per-provider upstream quota budgets.
+
+Public MyMemory and LibreTranslate endpoints allow a fixed number of
+characters per day. A provider with a configured daily quota earns that
+allowance evenly over the day, banking at most ``burst_fraction`` of it, so
+a burst of traffic moves on to the next provider long before the quota runs
+out instead of using up the whole day at once. A hard count of characters
+sent resets at UTC midnight.
+
+Providers that answer 429 (or MyMemory's "all available free translations
+used" message) are paused for their Retry-After, with or without a
+configured quota, rather than being called again until their circuit
+breaker opens.
+
+Budget state lives in SQLite (``QUOTA_DB``, by default the jobs database),
+so the API process and every job worker draw on one shared budget and a
+restart doesn't hand out a fresh day's quota.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+from .ratelimit import TokenBucket
+
+DAY_SECONDS = 86400
+# How stale another process's spending may look to wait(); spend() always reads the shared state
+SYNC_SECONDS = 1.0
+
+
+def parse_quotas(value):
+    # "MyMemory=50000,https://libretranslate.de/translate=20000" -> {name: chars per day};
+    # split on the last "=" since Libre mirrors are named by URL
+    quotas = {}
+    for entry in (value or "").split(","):
+        name, _, chars = entry.strip().rpartition("=")
+        if name and chars.strip():
+            quotas[name.strip()] = int(float(chars))
+    return quotas
+
+
+class QuotaConfig:
+    def __init__(
+        self, daily_chars=None, burst_fraction=0.05, throttle_seconds=60.0, max_throttle_seconds=DAY_SECONDS, path=None
+    ):
+        # provider name -> characters per day; providers not listed are unmetered
+        self.daily_chars = dict(daily_chars or {})
+        # Share of the daily quota that may be spent at once (0.05: about 72 minutes' worth)
+        self.burst_fraction = burst_fraction
+        # Pause after a 429 without Retry-After, and the longest pause honoured
+        self.throttle_seconds = throttle_seconds
+        self.max_throttle_seconds = max_throttle_seconds
+        # SQLite file holding the shared budget state; None keeps it in this process only
+        self.path = path
+
+    @classmethod
+    def from_env(cls, environ=None):
+        from .jobs import db_path_from_env
+
+        env = os.environ if environ is None else environ
+        return cls(
+            daily_chars=parse_quotas(env.get("PROVIDER_DAILY_QUOTAS")),
+            burst_fraction=float(env.get("QUOTA_BURST_FRACTION", 0.05)),
+            throttle_seconds=float(env.get("QUOTA_THROTTLE_SECONDS", 60)),
+            max_throttle_seconds=float(env.get("QUOTA_MAX_THROTTLE_SECONDS", DAY_SECONDS)),
+            path=env.get("QUOTA_DB") or db_path_from_env(env),
+        )
+
+
+class QuotaStore:
+    """Budget state per provider name in a SQLite file that several processes may share."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS quota_budgets (name TEXT PRIMARY KEY, day INTEGER, used INTEGER NOT NULL, "
+            "tokens REAL, updated REAL, paused_until REAL NOT NULL)"
+        )
+
+    def load(self, name):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT day, used, tokens, updated, paused_until FROM quota_budgets WHERE name = ?", (name,)
+            ).fetchone()
+
+    def update(self, name, change):
+        # change(row or None) -> new row, read and written in one transaction so processes don't race
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT day, used, tokens, updated, paused_until FROM quota_budgets WHERE name = ?", (name,)
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO quota_budgets (name, day, used, tokens, updated, paused_until) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (name, *change(row)),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class QuotaBudget:
+    def __init__(self, name, daily_chars, config, clock=time.time, store=None):
+        self.name = name
+        self.daily_chars = daily_chars
+        self.config = config
+        self.clock = clock
+        self.pace = None
+        if daily_chars:
+            burst = max(1.0, daily_chars * config.burst_fraction)
+            self.pace = TokenBucket(daily_chars / DAY_SECONDS, burst, clock=clock)
+        self.day = None
+        self.used = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.refused = 0
+        self._lock = threading.Lock()
+        self.store = store
+        self._synced = None
+        self._sync()
+
+    def _sync(self, force=True):
+        # Take the shared state over from the store
+        if self.store is None:
+            return
+        now = self.clock()
+        if force or self._synced is None or now - self._synced >= SYNC_SECONDS:
+            self._apply(self.store.load(self.name))
+            self._synced = now
+
+    def _apply(self, row):
+        if row is None:
+            return
+        day, used, tokens, updated, paused_until = row
+        with self._lock:
+            self.paused_until = paused_until
+            if self.pace is not None:
+                self.day, self.used = day, used
+                if tokens is not None:
+                    self.pace.tokens = min(tokens, self.pace.capacity)
+                    self.pace.updated = updated
+
+    def _row(self):
+        with self._lock:
+            tokens, updated = (self.pace.tokens, self.pace.updated) if self.pace is not None else (None, None)
+            return self.day, self.used, tokens, updated, self.paused_until
+
+    def _shared(self, step):
+        # Run ``step`` against the shared state and write the result back; locally without a store
+        if self.store is None:
+            return step()
+        result = []
+
+        def change(row):
+            self._apply(row)
+            result.append(step())
+            return self._row()
+
+        self.store.update(self.name, change)
+        self._synced = self.clock()
+        return result[0]
+
+    def _roll_day(self, now):
+        day = int(now // DAY_SECONDS)
+        if day != self.day:
+            self.day = day
+            self.used = 0
+
+    def _cost(self, chars):
+        # A text larger than the burst is let through once the full burst is banked
+        return min(chars, self.pace.capacity) if self.pace is not None else chars
+
+    def wait(self, chars=0):
+        """Seconds until ``chars`` may be sent (0.0: now)."""
+        self._sync(force=False)
+        return self._wait(chars)
+
+    def _wait(self, chars):
+        now = self.clock()
+        with self._lock:
+            self._roll_day(now)
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self.pace is None:
+                return 0.0
+            if self.used + chars > self.daily_chars and self.used:
+                return (self.day + 1) * DAY_SECONDS - now
+            return self.pace.peek(self._cost(chars))
+
+    def spend(self, chars):
+        """Take ``chars`` from the budget; returns the seconds to wait instead when it can't."""
+        if self.pace is None:
+            # Unmetered: only a pause is shared, and reading it is enough
+            self._sync(force=False)
+            return self._spend(chars)
+        return self._shared(lambda: self._spend(chars))
+
+    def _spend(self, chars):
+        wait = self._wait(chars)
+        if wait:
+            self.refused += 1
+            return wait
+        if self.pace is not None:
+            allowed, wait = self.pace.try_acquire(self._cost(chars))
+            if not allowed:
+                self.refused += 1
+                return wait
+        with self._lock:
+            self.used += chars
+        return 0.0
+
+    def throttle(self, retry_after=None):
+        # The provider said 429: leave it alone for a while (every process sharing the store)
+        seconds = self.config.throttle_seconds if retry_after is None else retry_after
+        seconds = min(max(seconds, 0.0), self.config.max_throttle_seconds)
+
+        def pause():
+            with self._lock:
+                self.paused_until = max(self.paused_until, self.clock() + seconds)
+                self.throttled += 1
+
+        self._shared(pause)
+
+    def snapshot(self):
+        wait = self.wait()
+        return {
+            "name": self.name,
+            "daily_chars": self.daily_chars,
+            "used_today": self.used,
+            "available_now": round(self.pace.level(), 1) if self.pace is not None else None,
+            "retry_in": round(wait, 1) if wait else 0.0,
+            "throttled": self.throttled,
+            "refused": self.refused,
+        }
+
+
+class QuotaRegistry:
+    def __init__(self, providers, config=None, clock=time.time):
+        self.config = config or QuotaConfig()
+        self.clock = clock
+        self.store = QuotaStore(self.config.path) if self.config.path else None
+        self._budgets = {}
+        for provider in providers:
+            self.get(provider)
+
+    def get(self, provider):
+        budget = self._budgets.get(provider.name)
+        if budget is None:
+            budget = self._budgets[provider.name] = QuotaBudget(
+                provider.name, self.config.daily_chars.get(provider.name), self.config, self.clock, self.store
+            )
+        return budget
+
+    def snapshot(self):
+        return [budget.snapshot() for budget in self._budgets.values()]
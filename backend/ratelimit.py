@@ -0,0 +1,257 @@
+"""Token-bucket rate limiting usable from asyncio code and from threads.
+
+``TokenBucket`` paces outgoing calls; ``ClientRateLimiter`` and
+``RateLimitMiddleware`` give every API client (known API key, else IP
+address) its own bucket and answer 429 with Retry-After once it is empty.
+Only the standard library is used so the Streamlit app can share it.
+"""
+import asyncio
+import json
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    """``rate`` tokens per second, holding at most ``burst``; rate <= 0 means unlimited."""
+
+    def __init__(self, rate, burst=None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.clock = clock
+        self.tokens = self.capacity
+        self.updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, tokens=1):
+        # Take tokens now (going into debt if needed) and return how long the caller must wait
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            self.tokens -= tokens
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def peek(self, tokens=1):
+        # Seconds until ``tokens`` are available, without taking them
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            self._refill()
+            return 0.0 if self.tokens >= tokens else (tokens - self.tokens) / self.rate
+
+    def level(self):
+        with self._lock:
+            self._refill()
+            return self.tokens
+
+    def try_acquire(self, tokens=1):
+        # Non-blocking: returns (allowed, seconds until enough tokens are available)
+        if self.rate <= 0:
+            return True, 0.0
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True, 0.0
+            return False, (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens=1):
+        delay = self.reserve(tokens)
+        if delay:
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, tokens=1):
+        delay = self.reserve(tokens)
+        if delay:
+            time.sleep(delay)
+
+
+# Endpoints that reach the providers (or the speech synthesizer)
+LIMITED_PATHS = (
+    "/translate",
+    "/translate/batch",
+    "/translate/stream",
+    "/translate/document",
+    "/translate/upload",
+    "/translate/multi",
+    "/translate/multi/stream",
+    "/tts",
+    "/jobs",
+)
+
+
+def parse_api_keys(value):
+    # "key1,key2=50" -> {key: requests/sec or None for the default rate}
+    keys = {}
+    for entry in (value or "").split(","):
+        key, _, rate = entry.strip().partition("=")
+        if key:
+            keys[key] = float(rate) if rate.strip() else None
+    return keys
+
+
+class ClientRateLimiter:
+    """A token bucket per client: its API key when it sent a known one, else its IP address.
+
+    Requests cost one token plus one per ``bytes_per_token`` of body, so a big
+    batch is charged more than a single sentence; a streamed body without
+    Content-Length is charged by ``RateLimitMiddleware`` as it is read. Unknown keys are ignored
+    (inventing keys doesn't buy fresh buckets). The least recently seen
+    clients are forgotten past ``max_clients``.
+    """
+
+    def __init__(
+        self,
+        rate=10.0,
+        burst=30.0,
+        api_keys=None,
+        max_clients=10000,
+        bytes_per_token=4096,
+        trust_forwarded=False,
+        paths=LIMITED_PATHS,
+        clock=time.monotonic,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.api_keys = dict(api_keys or {})
+        self.max_clients = max_clients
+        self.bytes_per_token = bytes_per_token
+        # Take the client address from X-Forwarded-For (only behind a proxy that sets it)
+        self.trust_forwarded = trust_forwarded
+        self.paths = frozenset(paths)
+        self.clock = clock
+        self.limited = 0
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        rate = float(env.get("RATE_LIMIT_PER_SECOND", 10))
+        paths = env.get("RATE_LIMIT_PATHS")
+        return cls(
+            rate=rate,
+            burst=float(env.get("RATE_LIMIT_BURST", rate * 3)),
+            api_keys=parse_api_keys(env.get("RATE_LIMIT_API_KEYS")),
+            max_clients=int(env.get("RATE_LIMIT_MAX_CLIENTS", 10000)),
+            bytes_per_token=int(env.get("RATE_LIMIT_BYTES_PER_TOKEN", 4096)),
+            trust_forwarded=env.get("RATE_LIMIT_TRUST_FORWARDED", "0").strip().lower() in ("1", "true", "yes"),
+            paths=[p.strip() for p in paths.split(",") if p.strip()] if paths is not None else LIMITED_PATHS,
+        )
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def client(self, headers, address):
+        # (bucket key, rate) for a request's headers (lower-cased bytes) and ASGI client address
+        api_key = headers.get(b"x-api-key", b"").decode("latin-1").strip()
+        if api_key in self.api_keys:
+            rate = self.api_keys[api_key]
+            return f"key:{api_key}", self.rate if rate is None else rate
+        if self.trust_forwarded and b"x-forwarded-for" in headers:
+            return "ip:" + headers[b"x-forwarded-for"].decode("latin-1").split(",")[0].strip(), self.rate
+        return f"ip:{address[0] if address else 'unknown'}", self.rate
+
+    def cost(self, headers):
+        try:
+            size = int(headers.get(b"content-length", b"0"))
+        except ValueError:
+            size = 0
+        return 1 + size // self.bytes_per_token
+
+    def _bucket(self, key, rate):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, self.burst * rate / self.rate, clock=self.clock)
+                while len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+            return bucket
+
+    def check(self, key, rate, tokens=1):
+        """Take ``tokens`` from the client's bucket: (allowed, seconds to wait when not)."""
+        bucket = self._bucket(key, rate)
+        # A request bigger than the whole burst goes through once the bucket is full
+        allowed, wait = bucket.try_acquire(min(tokens, bucket.capacity))
+        if not allowed:
+            self.limited += 1
+        return allowed, wait
+
+    def charge(self, key, rate, tokens):
+        """Take ``tokens`` for body already being read, going into debt: seconds to pause the reader."""
+        return self._bucket(key, rate).reserve(tokens)
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "rate": self.rate,
+            "burst": self.burst,
+            "clients": len(self._buckets),
+            "limited": self.limited,
+        }
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 (with Retry-After) to clients over their request rate."""
+
+    def __init__(self, app, limiter):
+        self.app = app
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        limiter = self.limiter
+        if scope["type"] != "http" or not limiter.enabled or scope.get("path") not in limiter.paths:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers", ()))
+        key, rate = limiter.client(headers, scope.get("client"))
+        allowed, wait = limiter.check(key, rate, limiter.cost(headers))
+        if allowed:
+            if b"content-length" not in headers:
+                receive = self._metered(receive, key, rate)
+            await self.app(scope, receive, send)
+            return
+        retry_after = max(1, math.ceil(wait))
+        body = json.dumps({"detail": f"Rate limit exceeded; retry in {retry_after}s"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    def _metered(self, receive, key, rate):
+        # A chunked body's size is only known as it arrives: each full ``bytes_per_token`` read is
+        # charged then, and reading pauses while the client is over its rate
+        limiter = self.limiter
+        unpaid = 0
+
+        async def metered_receive():
+            nonlocal unpaid
+            message = await receive()
+            if message["type"] == "http.request":
+                tokens, unpaid = divmod(unpaid + len(message.get("body", b"")), limiter.bytes_per_token)
+                if tokens:
+                    delay = limiter.charge(key, rate, tokens)
+                    if delay:
+                        await asyncio.sleep(delay)
+            return message
+
+        return metered_receive
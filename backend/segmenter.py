@@ -0,0 +1,114 @@
+"""Sentence-aware text segmentation shared by the backend and the Streamlit app.
+
+``iter_segments`` walks the text once and yields ``Segment(leading, text)``
+pairs. ``leading`` is the exact whitespace that preceded the segment in the
+input, so joining ``leading + translation`` for every segment rebuilds the
+original layout (paragraphs, line breaks, indentation). Only the standard
+library is used.
+"""
+import re
+from collections import namedtuple
+
+Segment = namedtuple("Segment", "leading text")
+
+# Latin-style terminators only end a sentence when followed by whitespace (so "3.14" or
+# "example.com" stay whole); CJK, danda (Devanagari, Bengali, Tamil Grantha...), Arabic and
+# Urdu full stops end it immediately.
+_CLOSERS = "\"'”’»)\\]」』》】"
+_LATIN = ".!?…"
+# A terminator run is matched once, greedily, and what follows it is checked in code: a
+# lookahead inside the pattern would be retried for every shorter run ("." * 20000 + "x"
+# took seconds). A sentence never crosses a line break and does not swallow the spaces
+# before one.
+_END = re.compile(rf"[{_LATIN}]+[{_CLOSERS}]*|[。！？｡।॥؟۔]+[{_CLOSERS}]*")
+_SPACE = re.compile(r"\s*")
+_WORD = re.compile(r"\S+")
+
+
+def iter_sentences(text):
+    """Yield (start, end, leading_start) offsets of each sentence in ``text``."""
+    pos = 0
+    n = len(text)
+    line_end = -1
+    while pos < n:
+        start = _SPACE.match(text, pos).end()
+        if start == n:
+            return
+        if start > line_end:
+            line_end = text.find("\n", start)
+            if line_end < 0:
+                line_end = n
+        end = None
+        for m in _END.finditer(text, start + 1, line_end):
+            if m.group()[0] not in _LATIN or m.end() == n or text[m.end()].isspace():
+                end = m.end()
+                break
+        if end is None:
+            # The rest of the line, without its trailing spaces
+            end = start + len(text[start:line_end].rstrip())
+        yield start, end, pos
+        pos = end
+
+
+def _split_long(text, start, end, max_len):
+    # Word-safe (start, end) pieces of an over-long sentence; words longer than max_len
+    # (e.g. unspaced CJK) are cut
+    piece_start = piece_end = None
+    for m in _WORD.finditer(text, start, end):
+        w_start, w_end = m.span()
+        if piece_start is not None and w_end - piece_start <= max_len:
+            piece_end = w_end
+            continue
+        if piece_start is not None:
+            yield piece_start, piece_end
+        while w_end - w_start > max_len:
+            yield w_start, w_start + max_len
+            w_start += max_len
+        piece_start, piece_end = w_start, w_end
+    if piece_start is not None:
+        yield piece_start, piece_end
+
+
+def iter_segments(text, max_len=450, break_on_newline=True, pack=True):
+    """Yield ``Segment``s of at most ``max_len`` characters, packing whole sentences.
+
+    With ``break_on_newline`` a segment never spans a line break, which keeps
+    line structure intact for providers that collapse newlines. With
+    ``pack=False`` every sentence is its own segment. A final
+    ``Segment(trailing_whitespace, "")`` is yielded when the text ends in
+    whitespace. ``max_len=None`` disables the length limit.
+    """
+    limit = max_len or len(text) or 1
+    chunk_start = chunk_end = None
+    leading_start = 0  # where the whitespace before the next segment begins
+    for start, end, ws_start in iter_sentences(text):
+        if chunk_start is not None:
+            hard_break = break_on_newline and "\n" in text[ws_start:start]
+            if pack and not hard_break and end - chunk_start <= limit:
+                chunk_end = end
+                continue
+            yield Segment(text[leading_start:chunk_start], text[chunk_start:chunk_end])
+            chunk_start = None
+            leading_start = chunk_end
+        if end - start <= limit:
+            chunk_start, chunk_end = start, end
+            continue
+        for piece_start, piece_end in _split_long(text, start, end, limit):
+            yield Segment(text[leading_start:piece_start], text[piece_start:piece_end])
+            leading_start = piece_end
+    if chunk_start is not None:
+        yield Segment(text[leading_start:chunk_start], text[chunk_start:chunk_end])
+        leading_start = chunk_end
+    if leading_start < len(text):
+        yield Segment(text[leading_start:], "")
+
+
+def split_text(text, max_len=450, break_on_newline=True):
+    # Just the translatable pieces, in order
+    return [seg.text for seg in iter_segments(text, max_len, break_on_newline) if seg.text]
+
+
+def rebuild(segments, translations):
+    """Reassemble a document from its segments and the translations of their non-empty texts."""
+    translations = iter(translations)
+    return "".join(seg.leading + (next(translations) if seg.text else "") for seg in segments)
@@ -0,0 +1,49 @@
+"""Single-flight coalescing of identical in-flight translations.
+
+When a cold cache meets a burst of requests for the same text, every caller
+after the first joins the upstream call already running for that key instead
+of sending its own; all of them get its result or its error. The call runs as
+its own task, so one caller going away doesn't cancel it for the others. It is
+cancelled only when no caller is left waiting.
+"""
+import asyncio
+
+from .metrics import SINGLE_FLIGHT
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}  # key -> [task, callers waiting]
+        self.leaders = 0
+        self.followers = 0
+
+    def in_flight(self, key):
+        return key in self._calls
+
+    async def do(self, key, factory):
+        """Await ``factory()`` for ``key``, or the call already running for it."""
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = [asyncio.ensure_future(factory()), 0]
+            call[0].add_done_callback(lambda _: self._forget(key, call))
+            self.leaders += 1
+            SINGLE_FLIGHT.inc("leader")
+        else:
+            self.followers += 1
+            SINGLE_FLIGHT.inc("follower")
+        call[1] += 1
+        try:
+            return await asyncio.shield(call[0])
+        finally:
+            call[1] -= 1
+            if not call[1] and not call[0].done():
+                # Nobody wants the result any more; a new caller starts afresh
+                self._forget(key, call)
+                call[0].cancel()
+
+    def _forget(self, key, call):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self):
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "coalesced": self.followers}
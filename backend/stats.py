@@ -0,0 +1,12 @@
+"""Small numeric helpers shared by the engine and its health/metrics tracking."""
+
+
+def percentile(values, pct):
+    # Linear interpolation between closest ranks; values need not be sorted
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
@@ -0,0 +1,229 @@
+"""Text-to-speech with a content-addressed, size-bounded disk cache.
+
+Audio is synthesized with gTTS, which sends one request per ~100-character
+part, so it can be streamed part by part while it is being written to the
+cache. Files are named by a hash of (language, normalized text); replaying a
+popular translation is a file read. The least recently used files are
+evicted once the cache exceeds its byte budget.
+
+Only the standard library is imported up front; gTTS is loaded on first use
+so the Streamlit app can share this module.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from .cache import normalize_text
+from .languages import TTS_CODES
+
+READ_CHUNK = 64 * 1024
+STALE_PART_SECONDS = 3600
+
+
+class TTSUnavailable(Exception):
+    """gTTS isn't installed, the language has no voice, or synthesis failed."""
+
+
+def audio_key(text, lang):
+    raw = f"{lang}\x1f{normalize_text(text)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """MP3 files named by content hash, evicted least-recently-used past ``max_bytes``."""
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> size, least recently used first
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        # Rebuild the index from what previous runs left, oldest access first
+        found = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            st = os.stat(path)
+            if name.endswith(".mp3"):
+                found.append((st.st_mtime, name[:-4], st.st_size))
+            elif name.endswith(".part") and time.time() - st.st_mtime > STALE_PART_SECONDS:
+                # Interrupted write from an earlier run (recent ones may belong to another process)
+                os.remove(path)
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.bytes += size
+        self._evict()
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, key):
+        """Path of the cached file, or None."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        path = self.path(key)
+        try:
+            # mtime doubles as the access time when the index is rebuilt after a restart
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self.bytes -= self._entries.pop(key, 0)
+            return None
+        return path
+
+    def open_part(self):
+        # Temporary file in the cache directory, so commit() is an atomic rename
+        fd, part = tempfile.mkstemp(suffix=".part", dir=self.directory)
+        return os.fdopen(fd, "wb"), part
+
+    def commit(self, key, part):
+        size = os.path.getsize(part)
+        if size > self.max_bytes:
+            os.remove(part)
+            return
+        os.replace(part, self.path(key))
+        with self._lock:
+            self.bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._evict()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+        for key in keys:
+            try:
+                os.remove(self.path(key))
+            except FileNotFoundError:
+                pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+class TextToSpeech:
+    def __init__(self, cache, timeout=10.0, max_chars=5000):
+        self.cache = cache
+        self.timeout = timeout
+        self.max_chars = max_chars
+        self._languages = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        directory = env.get("TTS_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "translator-tts")
+        return cls(
+            AudioCache(directory, int(float(env.get("TTS_CACHE_MAX_MB", 256)) * 1024 * 1024)),
+            timeout=float(env.get("TTS_TIMEOUT", 10)),
+            max_chars=int(env.get("TTS_MAX_CHARS", 5000)),
+        )
+
+    def languages(self):
+        """gTTS code -> name, computed once; empty when gTTS isn't installed."""
+        if self._languages is None:
+            with self._lock:
+                if self._languages is None:
+                    try:
+                        from gtts.lang import tts_langs
+                    except ImportError:
+                        self._languages = {}
+                    else:
+                        self._languages = dict(tts_langs())
+        return self._languages
+
+    def voice_for(self, lang):
+        # gTTS code for one of our language codes, or None without a voice
+        code = TTS_CODES.get(lang, lang)
+        return code if code in self.languages() else None
+
+    def _synthesize(self, text, voice):
+        from gtts import gTTS, gTTSError
+
+        try:
+            # The language was checked against the table already
+            yield from gTTS(text=text, lang=voice, lang_check=False, timeout=self.timeout).stream()
+        except gTTSError as e:
+            raise TTSUnavailable(str(e))
+
+    def check(self, lang):
+        """gTTS voice for ``lang``; raises ``TTSUnavailable`` when there is none."""
+        voice = self.voice_for(lang)
+        if voice is None:
+            if not self.languages():
+                raise TTSUnavailable("gTTS is not installed")
+            raise TTSUnavailable(f"no voice for language {lang!r}")
+        return voice
+
+    def cached(self, text, lang):
+        """Path of the cached audio for (text, lang), or None."""
+        return self.cache.get(audio_key(text, lang))
+
+    def iter_synthesized(self, text, lang):
+        """Synthesize ``text``, yielding MP3 bytes per part while writing them to the cache.
+
+        The file is only cached once every part arrived; a consumer that stops
+        early leaves nothing behind.
+        """
+        voice = self.check(lang)
+        out, part = self.cache.open_part()
+        committed = False
+        try:
+            with out:
+                for chunk in self._synthesize(text, voice):
+                    out.write(chunk)
+                    yield chunk
+            self.cache.commit(audio_key(text, lang), part)
+            committed = True
+        finally:
+            if not committed and os.path.exists(part):
+                os.remove(part)
+
+    def iter_audio(self, text, lang):
+        """MP3 bytes for ``text``: read from the cache, else synthesized (and cached)."""
+        self.check(lang)
+        path = self.cached(text, lang)
+        if path is None:
+            yield from self.iter_synthesized(text, lang)
+            return
+        with open(path, "rb") as f:
+            while chunk := f.read(READ_CHUNK):
+                yield chunk
+
+    def synthesize(self, text, lang):
+        """Whole MP3 for ``text`` (from the cache when possible)."""
+        return b"".join(self.iter_audio(text, lang))
@@ -0,0 +1,302 @@
+"""Streaming ingestion for ``POST /translate/upload``.
+
+The request body (plain text or JSONL) is decoded as it arrives and cut into
+segments (sentence-aligned for text, one per line for JSONL). At most
+``window`` segments are being translated at once, and results are written out
+in input order as soon as the oldest one is done. Memory therefore follows
+the window, not the document: reading the body stops while the window is
+full. Output waits in a spool that moves to disk past ``spool_bytes``, so a
+client that only reads the response once its upload is done can't stall
+the pipeline.
+"""
+import asyncio
+import codecs
+import json
+import tempfile
+from collections import deque
+
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from .segmenter import iter_segments
+
+FORMATS = ("text", "jsonl")
+MEDIA_TYPES = {"text": "text/plain; charset=utf-8", "jsonl": "application/x-ndjson"}
+# Text without a line break is cut at a space once this much of it is buffered
+TEXT_CARRY_CHARS = 65536
+
+
+class UploadError(ValueError):
+    """The body can't be read as the declared format (bad encoding, over-long line)."""
+
+
+def format_for(content_type, name=None):
+    # Upload format from an explicit name or the body's Content-Type
+    if name:
+        if name not in FORMATS:
+            raise UploadError(f"Unknown format {name!r}; expected one of {', '.join(FORMATS)}")
+        return name
+    media = (content_type or "").split(";")[0].strip().lower()
+    if media in ("application/x-ndjson", "application/jsonl", "application/json-lines", "application/x-jsonlines"):
+        return "jsonl"
+    return "text"
+
+
+class _TextItems:
+    # Segments of a text stream, cut only after a line break (or, in a very long line, a space)
+    def __init__(self, segment_chars):
+        self.segment_chars = segment_chars
+        self._pending = []  # text after the last cut, in chunks
+        self._size = 0
+
+    def feed(self, text):
+        cut = text.rfind("\n") + 1
+        if not cut and self._size + len(text) <= TEXT_CARRY_CHARS:
+            self._pending.append(text)
+            self._size += len(text)
+            return []
+        buf = "".join(self._pending) + text
+        if cut:
+            cut += len(buf) - len(text)
+        else:
+            cut = buf.rfind(" ") + 1 or len(buf)
+        part, rest = buf[:cut], buf[cut:]
+        self._pending, self._size = ([rest] if rest else []), len(rest)
+        return self._items(part)
+
+    def close(self):
+        part, self._pending, self._size = "".join(self._pending), [], 0
+        return self._items(part)
+
+    def _items(self, part):
+        return [(seg.text, seg.leading) for seg in iter_segments(part, self.segment_chars)]
+
+    @staticmethod
+    def render(context, text, translated, error):
+        # Failed segments keep their source text so the document stays whole
+        return context + (text if translated is None else translated)
+
+
+class _JSONLItems:
+    # One item per line: a string, or an object whose ``field`` is translated
+    def __init__(self, field, max_line):
+        self.field = field
+        self.max_line = max_line
+        self._pending = []  # the line being read, in chunks
+        self._size = 0
+        self._lineno = 0
+
+    def feed(self, text):
+        cut = text.rfind("\n") + 1
+        if not cut:
+            self._pending.append(text)
+            self._size += len(text)
+            if self._size > self.max_line:
+                raise UploadError(f"line {self._lineno + 1}: longer than {self.max_line} characters")
+            return []
+        part = "".join(self._pending) + text[:cut]
+        rest = text[cut:]
+        self._pending, self._size = ([rest] if rest else []), len(rest)
+        return [item for line in part.splitlines() for item in self._line(line)]
+
+    def close(self):
+        part, self._pending, self._size = "".join(self._pending), [], 0
+        return self._line(part) if part else []
+
+    def _line(self, line):
+        self._lineno += 1
+        line = line.strip()
+        if not line:
+            return []
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return [(None, {"line": self._lineno, "error": "invalid JSON"})]
+        if isinstance(record, str):
+            return [(record, {"text": record})]
+        if isinstance(record, dict) and isinstance(record.get(self.field), str):
+            return [(record[self.field], record)]
+        return [(None, {"line": self._lineno, "error": f"expected a string or an object with a {self.field!r} string"})]
+
+    @staticmethod
+    def render(context, text, translated, error):
+        record = dict(context)
+        if text is not None:
+            record.update({"translated_text": translated} if error is None else {"error": error})
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+
+class _Spool:
+    """Output not yet sent: in memory up to ``max_size`` bytes, then in a temporary file."""
+
+    def __init__(self, max_size):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_size)
+        self._read = self._written = 0
+        self._changed = asyncio.Event()
+        self.finished = False
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self._file.seek(self._written)
+        self._file.write(data)
+        self._written += len(data)
+        self._changed.set()
+
+    def finish(self):
+        self.finished = True
+        self._changed.set()
+
+    async def chunks(self, size=65536):
+        while True:
+            if self._read < self._written:
+                self._file.seek(self._read)
+                data = self._file.read(min(size, self._written - self._read))
+                self._read += len(data)
+                if self._read == self._written:
+                    # Caught up: start over so a reader that keeps up never reaches the disk
+                    self._file.seek(0)
+                    self._file.truncate()
+                    self._read = self._written = 0
+                yield data
+            elif self.finished:
+                return
+            else:
+                self._changed.clear()
+                await self._changed.wait()
+
+    def close(self):
+        self._file.close()
+
+
+class UploadTranslation:
+    """Translate a byte stream of ``fmt`` through ``translate(text)``, ``window`` segments at a time.
+
+    ``failures`` are the exceptions ``translate`` raises for a segment that
+    can't be translated; they end up in the output instead of ending it.
+    """
+
+    def __init__(self, chunks, fmt, translate, failures, window=64, segment_chars=450, field="text",
+                 max_line=1 << 20, spool_bytes=1 << 20):
+        self.translate = translate
+        self.failures = failures
+        self.items = _TextItems(segment_chars) if fmt == "text" else _JSONLItems(field, max_line)
+        self.segments = 0
+        self.errors = 0
+        self._spool = _Spool(spool_bytes)
+        self._pending = deque()  # (translation task or None, text, context), in input order
+        self._slots = asyncio.Semaphore(max(1, window))
+        self._queued = asyncio.Event()
+        self._first = None
+        self._first_queued = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run(chunks))
+
+    async def _run(self, chunks):
+        # Writes results out in input order while _read keeps the window topped up
+        reader = asyncio.ensure_future(self._read(chunks))
+        try:
+            while True:
+                if self._pending:
+                    await self._emit()
+                elif reader.done():
+                    break
+                else:
+                    self._queued.clear()
+                    await self._queued.wait()
+            reader.result()
+        finally:
+            reader.cancel()
+            for task, _, _ in self._pending:
+                if task is not None:
+                    task.cancel()
+            self._first_queued.set()
+            self._spool.finish()
+
+    async def _read(self, chunks):
+        decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        try:
+            async for chunk in chunks:
+                try:
+                    text = decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    raise UploadError("Body is not valid UTF-8")
+                await self._queue(self.items.feed(text))
+            try:
+                text = decoder.decode(b"", final=True)
+            except UnicodeDecodeError:
+                raise UploadError("Body is not valid UTF-8")
+            await self._queue(self.items.feed(text) + self.items.close())
+        finally:
+            self._queued.set()
+
+    async def _queue(self, items):
+        for text, context in items:
+            # No more body is read while the window is full
+            await self._slots.acquire()
+            task = None
+            if text:
+                task = asyncio.ensure_future(self.translate(text))
+                self.segments += 1
+                if self._first is None:
+                    self._first = task
+                    self._first_queued.set()
+            self._pending.append((task, text, context))
+            self._queued.set()
+
+    async def _emit(self):
+        task, text, context = self._pending[0]
+        translated = error = None
+        if task is not None:
+            try:
+                translated = await task
+            except self.failures as e:
+                error = str(e)
+                self.errors += 1
+        self._pending.popleft()
+        self._slots.release()
+        self._spool.write(self.items.render(context, text, translated, error))
+
+    async def started(self):
+        """Wait for the first segment's translation; raises if it (or reading the body) failed."""
+        queued = asyncio.ensure_future(self._first_queued.wait())
+        try:
+            await asyncio.wait({self._task, queued}, return_when=asyncio.FIRST_COMPLETED)
+            await asyncio.wait({self._task, self._first} - {None}, return_when=asyncio.FIRST_COMPLETED)
+            if self._task.done() and self._task.exception() is not None:
+                raise self._task.exception()
+            if self._first is not None and self._first.done():
+                self._first.result()
+        except BaseException:
+            self.close()
+            raise
+        finally:
+            queued.cancel()
+
+    async def body(self):
+        try:
+            async for data in self._spool.chunks():
+                yield data
+            # Reading the body failed after the response started: cut the response short
+            await asyncio.wait({self._task})
+            if self._task.exception() is not None:
+                raise self._task.exception()
+        finally:
+            self.close()
+
+    def close(self):
+        self._task.cancel()
+        self._spool.close()
+
+
+class UploadResponse(StreamingResponse):
+    """A streaming response whose body is produced while the request body is still being read.
+
+    Starlette's ``StreamingResponse`` watches ``receive`` for a disconnect
+    while it sends, which would swallow the request body's chunks; a client
+    that goes away shows up as a failed send instead.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
@@ -0,0 +1,273 @@
+"""Wire formats for the API: JSON, optional MessagePack, and gzip/brotli compression.
+
+``encode``/``decode`` use orjson for JSON when it is installed and the
+standard library otherwise, and handle MessagePack when ``msgpack`` is
+installed. ``negotiate`` picks the body format a request's ``Accept`` asks
+for, and ``WireMiddleware`` makes it available to the response while it
+compresses complete responses above a size threshold (brotli needs the
+``brotli`` package; gzip is always available). Only the standard library is
+required so the Streamlit app can share the client side.
+"""
+import gzip
+import json
+import os
+from contextvars import ContextVar
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+_MSGPACK_TYPES = (MSGPACK, "application/x-msgpack", "application/vnd.msgpack")
+MEDIA_TYPES = (JSON, MSGPACK) if msgpack is not None else (JSON,)
+# Content codings this process can produce and read, best first
+CODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Request headers for clients that want the most compact answer available
+ACCEPT = f"{MSGPACK}, {JSON};q=0.9" if msgpack is not None else JSON
+ACCEPT_ENCODING = ", ".join(CODINGS)
+
+# Bodies worth compressing; audio and other already-compressed types are sent as they are
+_COMPRESSIBLE = ("text/", JSON, MSGPACK, "application/x-ndjson", "application/xml", "application/javascript")
+
+
+def dumps(obj):
+    # Compact UTF-8 JSON bytes
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # Integers past 64 bits and other types only the standard encoder takes
+            pass
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def encode(obj, media_type=JSON):
+    if media_type == MSGPACK:
+        return msgpack.packb(obj, use_bin_type=True)
+    return dumps(obj)
+
+
+def decode(data, content_type=None):
+    # Body bytes to Python objects by Content-Type; anything but MessagePack is read as JSON
+    media = (content_type or "").split(";")[0].strip().lower()
+    if media in _MSGPACK_TYPES:
+        if msgpack is None:
+            raise ValueError("MessagePack body but msgpack is not installed")
+        return msgpack.unpackb(data, raw=False)
+    return loads(data)
+
+
+def _qualities(header):
+    # {token: q} from an Accept or Accept-Encoding header
+    found = {}
+    for part in (header or "").split(","):
+        token, *params = part.strip().split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        found[token] = q
+    return found
+
+
+def negotiate(accept):
+    # MessagePack when it is installed and the client prefers it to JSON; JSON otherwise
+    if msgpack is None or not accept:
+        return JSON
+    q = _qualities(accept)
+    packed = max((q.get(t, 0.0) for t in _MSGPACK_TYPES), default=0.0)
+    plain = max(q.get(JSON, 0.0), q.get("application/*", 0.0), q.get("*/*", 0.0))
+    return MSGPACK if packed > 0 and packed > plain else JSON
+
+
+def choose_coding(accept_encoding):
+    # Best content coding the client accepts, or None for identity
+    q = _qualities(accept_encoding)
+    best, best_q = None, 0.0
+    for coding in CODINGS:
+        quality = q.get(coding, q.get("*", 0.0))
+        if quality > best_q:
+            best, best_q = coding, quality
+    return best
+
+
+def compressible(content_type):
+    media = (content_type or "").split(";")[0].strip().lower()
+    return media.startswith(_COMPRESSIBLE)
+
+
+_media_type = ContextVar("wire_media_type", default=JSON)
+
+
+def response_media_type():
+    # Body format negotiated for the request being handled
+    return _media_type.get()
+
+
+class Compressor:
+    """Compression settings: bodies under ``minimum_size`` bytes are sent as they are."""
+
+    def __init__(self, minimum_size=1024, gzip_level=6, brotli_quality=5, enabled=True):
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.enabled = enabled
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    @classmethod
+    def from_env(cls, environ=None):
+        env = os.environ if environ is None else environ
+        return cls(
+            minimum_size=int(env.get("COMPRESSION_MIN_BYTES", 1024)),
+            gzip_level=int(env.get("COMPRESSION_GZIP_LEVEL", 6)),
+            brotli_quality=int(env.get("COMPRESSION_BROTLI_QUALITY", 5)),
+            enabled=env.get("COMPRESSION_DISABLED", "").lower() not in ("1", "true", "yes"),
+        )
+
+    def compress(self, data, coding):
+        if coding == "br":
+            out = brotli.compress(data, quality=self.brotli_quality)
+        else:
+            out = gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+        self.compressed += 1
+        self.bytes_in += len(data)
+        self.bytes_out += len(out)
+        return out
+
+    def stats(self):
+        return {
+            "enabled": self.enabled,
+            "codings": list(CODINGS),
+            "media_types": list(MEDIA_TYPES),
+            "json_encoder": "orjson" if orjson is not None else "json",
+            "minimum_size": self.minimum_size,
+            "compressed": self.compressed,
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+        }
+
+
+def _add_vary(headers, value):
+    for i, (name, existing) in enumerate(headers):
+        if name.lower() == b"vary":
+            headers[i] = (name, existing + b", " + value)
+            return
+    headers.append((b"vary", value))
+
+
+def _strip_coding_etags(value):
+    # Compressed responses carry "<etag>-<coding>"; the app only knows the plain tag
+    for coding in CODINGS:
+        value = value.replace(f'-{coding}"'.encode(), b'"')
+    return value
+
+
+def _coded_etag(value, coding):
+    # A compressed body is a different representation, so it gets its own strong validator
+    if value.endswith(b'"') and not value.startswith(b"W/"):
+        return value[:-1] + f'-{coding}"'.encode()
+    return value
+
+
+class WireMiddleware:
+    """ASGI middleware: negotiates the body format for ``response_media_type`` and compresses
+    complete responses with the best coding the client accepts.
+
+    Streamed responses (NDJSON, SSE, audio, uploads) pass through untouched so
+    that nothing holds their chunks back.
+    """
+
+    def __init__(self, app, compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope.get("headers", ()))
+        token = _media_type.set(negotiate(headers.get(b"accept", b"").decode("latin-1")))
+        coding = choose_coding(headers.get(b"accept-encoding", b"").decode("latin-1")) if self.compressor.enabled else None
+        # A validator the client got with a compressed body: checked by the app as the plain tag,
+        # and answered (304) with the tag the client knows
+        coded_validator = coding is not None and f'-{coding}"'.encode() in headers.get(b"if-none-match", b"")
+        if coded_validator:
+            scope = dict(scope, headers=[
+                (k, _strip_coding_etags(v) if k == b"if-none-match" else v) for k, v in scope["headers"]
+            ])
+        start = None
+
+        async def compressing_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                # Held until the first body message shows whether the body comes whole
+                start = message
+                return
+            if start is None:
+                await send(message)
+                return
+            start_message, start = start, None
+            response_headers = list(start_message.get("headers", ()))
+            found = {k.lower(): v for k, v in response_headers}
+            body = message.get("body", b"")
+            status = start_message["status"]
+            if status == 304 and coded_validator:
+                response_headers = [(k, _coded_etag(v, coding) if k.lower() == b"etag" else v) for k, v in response_headers]
+            elif (
+                self.compressor.enabled
+                and not message.get("more_body")
+                and status >= 200 and status not in (204, 304)
+                and b"content-encoding" not in found
+                and compressible(found.get(b"content-type", b"").decode("latin-1"))
+            ):
+                _add_vary(response_headers, b"Accept-Encoding")
+                if coding is not None and len(body) >= self.compressor.minimum_size:
+                    compressed = self.compressor.compress(body, coding)
+                    if len(compressed) < len(body):
+                        body = compressed
+                        response_headers = [
+                            (k, _coded_etag(v, coding) if k.lower() == b"etag" else v)
+                            for k, v in response_headers
+                            if k.lower() != b"content-length"
+                        ]
+                        response_headers += [
+                            (b"content-encoding", coding.encode()),
+                            (b"content-length", str(len(body)).encode()),
+                        ]
+            await send({**start_message, "headers": response_headers})
+            await send({**message, "body": body})
+
+        try:
+            await self.app(scope, receive, compressing_send)
+        finally:
+            _media_type.reset(token)
+
@@ -0,0 +1,70 @@
+"""Micro-batching on vs. off for concurrent single-text requests.
+
+The same burst of short texts for one language pair goes through
+``ProviderEngine.translate`` against the HF stub, once per batch window.
+Window 0 disables batching; the report includes the scheduler's batch size
+and queue delay stats for each run.
+
+    python -m benchmarks.bench_batching --requests 2000 --concurrency 128 --windows 0,2,5,10
+"""
+import argparse
+import asyncio
+import time
+
+from backend.engine import ProviderEngine
+
+from .common import summarize, write_report
+from .stubs import StubServer
+
+
+async def run_window(env, window_ms, n, concurrency):
+    engine = ProviderEngine.from_env(dict(env, TRANSLATE_BATCH_WINDOW_MS=str(window_ms)))
+    await engine.start()
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await engine.translate(f"hello {i}", "en", "fr")
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(i) for i in range(n)))
+    finally:
+        await engine.close()
+    result = summarize(latencies, time.perf_counter() - start, errors)
+    result["batching"] = engine.batcher.snapshot()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark micro-batching windows against the HF stub")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=128)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--windows", default="0,2,5,10", help="comma-separated batch windows in ms")
+    parser.add_argument("--max-batch", type=int, default=16)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency_ms / 1000) as stub:
+        env = stub.provider_env()
+        env["PROVIDER_ORDERING"] = "static"  # keep every request on HF
+        env["TRANSLATE_BATCH_MAX"] = str(args.max_batch)
+        results = {}
+        for window in args.windows.split(","):
+            results[f"window_{window.strip()}ms"] = asyncio.run(
+                run_window(env, float(window), args.requests, args.concurrency)
+            )
+    write_report("batching", vars(args), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Local language detection speed, single texts and batches.
+
+Short sentences in several languages and scripts go through
+``backend.langdetect.detect`` one at a time (per-call latency) and through
+``detect_batch``. The profile table load is timed separately, since it only
+happens once per process.
+
+    python -m benchmarks.bench_detect --texts 20000 --batch 256
+"""
+import argparse
+import time
+
+from backend import langdetect
+
+from .common import summarize, write_report
+
+SAMPLES = [
+    ("en", "Where is the nearest train station?"),
+    ("fr", "Je voudrais commander un café, s'il vous plaît."),
+    ("es", "La reunión se ha trasladado al jueves por la tarde."),
+    ("de", "Wo ist der nächste Bahnhof?"),
+    ("pt", "Gostaria de pedir um café, por favor."),
+    ("it", "La riunione è stata spostata a giovedì pomeriggio."),
+    ("nl", "Waar is het dichtstbijzijnde treinstation?"),
+    ("pl", "Chciałbym zamówić kawę, proszę."),
+    ("ru", "Совещание перенесли на вечер четверга."),
+    ("ar", "أين أقرب محطة قطار؟"),
+    ("hi", "मैं एक कॉफ़ी ऑर्डर करना चाहूँगा।"),
+    ("ja", "最寄りの駅はどこですか？"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the local language detector")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    langdetect.load_profiles()
+    load_ms = round((time.perf_counter() - t0) * 1000, 2)
+
+    texts = [SAMPLES[i % len(SAMPLES)] for i in range(args.texts)]
+    latencies, wrong = [], 0
+    start = time.perf_counter()
+    for expected, text in texts:
+        t = time.perf_counter()
+        detection = langdetect.detect(text)
+        latencies.append(time.perf_counter() - t)
+        wrong += detection.language != expected
+    single = summarize(latencies, time.perf_counter() - start)
+    single["mean_us"] = round(sum(latencies) / len(latencies) * 1e6, 1)
+    single["wrong"] = wrong
+
+    # Distinct texts per batch so repeats within a batch don't flatter the numbers
+    batch_texts = [f"{text} {i}" for i, (_, text) in enumerate(texts)]
+    batch_latencies = []
+    start = time.perf_counter()
+    for i in range(0, len(batch_texts), args.batch):
+        t = time.perf_counter()
+        langdetect.detect_batch(batch_texts[i:i + args.batch])
+        batch_latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    batch = summarize(batch_latencies, elapsed)
+    batch["texts_per_second"] = round(len(batch_texts) / elapsed, 1)
+
+    write_report("detect", vars(args), {"profile_load_ms": load_ms, "single": single, "batch": batch}, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
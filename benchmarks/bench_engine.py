@@ -0,0 +1,89 @@
+"""Pooled async provider engine vs. the old per-call ``requests.post`` path.
+
+Both modes send the same requests to local stub providers at the same
+concurrency. The legacy mode runs blocking calls in a 40-worker thread pool
+(Starlette's default for sync handlers); the engine mode awaits
+``ProviderEngine.translate`` on one event loop with keep-alive pools.
+
+    python -m benchmarks.bench_engine --requests 2000 --concurrency 64 --latency-ms 20
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from backend.engine import ProviderEngine
+from backend.providers import build_providers
+
+from .common import summarize, write_report
+from .stubs import StubServer
+
+
+def run_legacy(env, n, concurrency):
+    url = env["HUGGINGFACE_API_URL"]
+    latencies, errors = [], 0
+
+    def one(i):
+        payload = {"inputs": f"hello {i}", "parameters": {"src_lang": "en", "tgt_lang": "fr"}}
+        t0 = time.perf_counter()
+        r = requests.post(url, json=payload, headers={"Authorization": "Bearer stub"}, timeout=15)
+        r.raise_for_status()
+        r.json()
+        return time.perf_counter() - t0
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(concurrency, 40)) as pool:
+        for fut in [pool.submit(one, i) for i in range(n)]:
+            try:
+                latencies.append(fut.result())
+            except Exception:
+                errors += 1
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+async def run_engine(env, n, concurrency):
+    engine = ProviderEngine(build_providers(env), max_connections=concurrency)
+    await engine.start()
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await engine.translate(f"hello {i}", "en", "fr")
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(i) for i in range(n)))
+    finally:
+        await engine.close()
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the async provider engine against local stubs")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency_ms / 1000) as stub:
+        env = stub.provider_env()
+        results = {
+            "legacy_requests": run_legacy(env, args.requests, args.concurrency),
+            "async_engine": asyncio.run(run_engine(env, args.requests, args.concurrency)),
+        }
+    write_report("engine", vars(args), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
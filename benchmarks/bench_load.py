@@ -0,0 +1,187 @@
+"""Open-loop load generator for the HTTP API.
+
+Requests are sent on a fixed schedule (constant or Poisson arrivals at the
+target RPS) whether or not earlier ones have finished, and latency is
+measured from each request's scheduled start, so a backlog shows up as
+latency instead of silently lowering the offered load. Without ``--url`` the
+backend runs in-process under uvicorn with its providers pointed at local
+stubs, whose latency, errors and rate limits are configurable (see
+``benchmarks/stubs.py``).
+
+    python -m benchmarks.bench_load --endpoint translate --rps 50,100,200 --duration 20
+    python -m benchmarks.bench_load --endpoint batch --batch-size 32 --rps 20 \\
+        --latency lognormal:40:0.5 --stub mymemory:rate=10,errors=0.05
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import threading
+import time
+
+import aiohttp
+
+from .common import summarize, write_report
+from .stubs import StubServer, add_stub_arguments, profiles_from_args
+
+WORDS = "the quick brown fox jumps over a lazy dog while seven wizards quietly judge boxing matches".split()
+
+
+def make_text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def make_payload(endpoint, rng, i, args):
+    # Numbered texts never repeat, so the cache and memory don't hide upstream cost
+    # (unless --repeat asks for a share of repeated texts)
+    def text(k):
+        if args.repeat and rng.random() < args.repeat:
+            return make_text(random.Random(k % 50), args.words)
+        return f"Note {k}: {make_text(rng, args.words)}"
+
+    base = {"source_lang": args.source, "target_lang": args.target}
+    if endpoint == "batch":
+        return "/translate/batch", {"items": [text(i * args.batch_size + j) for j in range(args.batch_size)], **base}
+    path = "/translate/stream" if endpoint == "stream" else "/translate"
+    return path, {"text": text(i), **base}
+
+
+class InProcessBackend:
+    """Runs ``backend.main:app`` under uvicorn on a free port in a background thread."""
+
+    def __init__(self, env):
+        self.env = env
+        self.server = None
+        self._thread = None
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        import uvicorn
+
+        # backend.main reads its settings at import time
+        os.environ.update(self.env)
+        from backend.main import app
+
+        config = uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning", lifespan="on")
+        self.server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+        self._thread.start()
+        while not self.server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("backend failed to start")
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self._thread.join(timeout=10)
+
+
+async def run_load(url, endpoint, rps, duration, args):
+    rng = random.Random(args.seed)
+    total = max(1, int(rps * duration))
+    latencies, statuses, errors = [], {}, 0
+    dropped = 0
+    in_flight = set()
+    connector = aiohttp.TCPConnector(limit=args.max_in_flight)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+
+        async def one(path, payload, scheduled):
+            nonlocal errors
+            try:
+                async with session.post(url + path, json=payload) as r:
+                    await r.read()
+                    status = str(r.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = type(e).__name__
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == "200":
+                latencies.append(time.perf_counter() - scheduled)
+            else:
+                errors += 1
+
+        start = time.perf_counter()
+        next_at = start
+        for i in range(total):
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if len(in_flight) >= args.max_in_flight:
+                # The client itself is saturated; count it rather than queueing without bound
+                dropped += 1
+            else:
+                path, payload = make_payload(endpoint, rng, i, args)
+                task = asyncio.ensure_future(one(path, payload, next_at))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            next_at += rng.expovariate(rps) if args.arrivals == "poisson" else 1 / rps
+        offered_seconds = time.perf_counter() - start
+        if in_flight:
+            await asyncio.gather(*in_flight)
+        wall = time.perf_counter() - start
+
+    result = summarize(latencies, wall, errors)
+    result.update(
+        {
+            "target_rps": rps,
+            "offered_rps": round((total - dropped) / offered_seconds, 1) if offered_seconds else 0.0,
+            "dropped": dropped,
+            "statuses": statuses,
+        }
+    )
+    if endpoint == "batch":
+        result["items_per_second"] = round(len(latencies) * args.batch_size / wall, 1) if wall else 0.0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the translation API at a target request rate")
+    parser.add_argument("--url", help="running backend to load (default: start one in-process against stubs)")
+    parser.add_argument("--endpoint", choices=("translate", "batch", "stream"), default="translate")
+    parser.add_argument("--rps", default="50", help="target requests/sec; comma-separated for a sweep")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per step")
+    parser.add_argument("--arrivals", choices=("constant", "poisson"), default="poisson")
+    parser.add_argument("--batch-size", type=int, default=16, help="items per /translate/batch request")
+    parser.add_argument("--words", type=int, default=12, help="words per text")
+    parser.add_argument("--repeat", type=float, default=0.0, help="share of texts drawn from a small repeated pool")
+    parser.add_argument("--source", default="en")
+    parser.add_argument("--target", default="fr")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra backend settings")
+    parser.add_argument("--out", help="write the JSON report to this path")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    steps = [float(r) for r in args.rps.split(",")]
+    results = {}
+    if args.url:
+        for rps in steps:
+            results[f"rps_{rps:g}"] = asyncio.run(run_load(args.url.rstrip("/"), args.endpoint, rps, args.duration, args))
+    else:
+        with StubServer(profiles=profiles_from_args(args), seed=args.seed) as stub:
+            env = stub.provider_env()
+            # One client drives all the load; per-client limiting would only measure the limiter
+            env["RATE_LIMIT_PER_SECOND"] = "0"
+            env["JOB_WORKERS"] = "0"
+            env.update(kv.split("=", 1) for kv in args.env)
+            with InProcessBackend(env) as backend:
+                for rps in steps:
+                    stub.counters(reset=True)
+                    result = asyncio.run(run_load(backend.url, args.endpoint, rps, args.duration, args))
+                    result["upstream"] = stub.counters()
+                    results[f"rps_{rps:g}"] = result
+    write_report("load", vars(args), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Offline local provider vs. the remote providers, one provider at a time.
+
+Every provider that supports the pair gets the same sentences at the same
+concurrency through ``ProviderEngine.call``. Remote providers point at local
+stubs with ``--latency-ms`` unless ``--live`` is given. The local provider is
+only measured when ``LOCAL_MODELS`` (or ``--local-models``) names converted
+CTranslate2 models; the first request, which loads the model, is timed
+separately as ``load_seconds``.
+
+    python -m benchmarks.bench_local --local-models "*=models/m2m100_418M" --requests 500 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from backend.engine import ProviderEngine
+from backend.providers import build_providers
+
+from .common import summarize, write_report
+from .stubs import StubServer
+
+SENTENCES = [
+    "The weather is nice today.",
+    "Please send me the report before the meeting tomorrow.",
+    "Where is the nearest train station?",
+    "This library translates text between many languages.",
+    "We will be closed on Monday for the public holiday.",
+]
+
+
+async def run_provider(engine, provider, n, concurrency, source, target):
+    # Warm-up request (connection setup, or model load for the local provider)
+    t0 = time.perf_counter()
+    await engine.call(provider, SENTENCES[0], source, target)
+    load_seconds = time.perf_counter() - t0
+
+    sem = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one(i):
+        nonlocal errors
+        async with sem:
+            t0 = time.perf_counter()
+            try:
+                await engine.call(provider, f"{SENTENCES[i % len(SENTENCES)]} ({i})", source, target)
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - t0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n)))
+    result = summarize(latencies, time.perf_counter() - start, errors)
+    result["load_seconds"] = round(load_seconds, 3)
+    return result
+
+
+async def run(env, args):
+    engine = ProviderEngine(build_providers(env), max_connections=args.concurrency)
+    await engine.start()
+    results = {}
+    try:
+        for provider in engine.providers:
+            if not provider.supports(args.source, args.target):
+                continue
+            try:
+                results[provider.name] = await run_provider(
+                    engine, provider, args.requests, args.concurrency, args.source, args.target
+                )
+            except Exception as e:
+                results[provider.name] = {"error": str(e)}
+    finally:
+        await engine.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the offline local provider against remote providers")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="stub latency for remote providers")
+    parser.add_argument("--live", action="store_true", help="call the real remote providers instead of stubs")
+    parser.add_argument("--local-models", default=os.environ.get("LOCAL_MODELS"), help="LOCAL_MODELS value")
+    parser.add_argument("--source", default="en")
+    parser.add_argument("--target", default="fr")
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    if args.local_models:
+        env["LOCAL_MODELS"] = args.local_models
+    if args.live:
+        results = asyncio.run(run(env, args))
+    else:
+        with StubServer(latency=args.latency_ms / 1000) as stub:
+            env.update(stub.provider_env())
+            results = asyncio.run(run(env, args))
+    write_report("local", vars(args), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Translation memory on vs. off for repetitive documents.
+
+Documents are built from a small pool of boilerplate sentences (disclaimers,
+UI strings) plus a share of unique ones, then translated one after another
+through ``ProviderEngine.translate_with_memory``. Without a memory every
+document goes upstream whole; with one, only unseen sentences do. Upstream
+calls and texts are counted by the stub.
+
+    python -m benchmarks.bench_memory --documents 50 --sentences 200 --unique 0.1
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from backend.engine import ProviderEngine
+from backend.memory import TranslationMemory
+
+from .common import summarize, write_report
+from .stubs import StubServer
+
+BOILERPLATE = [
+    "This message is confidential and intended only for the named recipient.",
+    "If you have received it in error, please notify the sender and delete it.",
+    "Click Save to keep your changes.",
+    "Your session has expired, please sign in again.",
+    "All prices include VAT unless stated otherwise.",
+    "Contact support if the problem persists.",
+    "Terms and conditions apply.",
+    "Thank you for your order.",
+]
+
+
+def make_documents(n, sentences, unique_share, seed=1):
+    rng = random.Random(seed)
+    docs = []
+    counter = 0
+    for _ in range(n):
+        lines = []
+        for _ in range(sentences):
+            if rng.random() < unique_share:
+                counter += 1
+                lines.append(f"Unique remark number {counter} about item {rng.randint(1, 10 ** 6)}.")
+            else:
+                lines.append(rng.choice(BOILERPLATE))
+        docs.append("\n".join(lines))
+    return docs
+
+
+async def run(env, docs, use_memory):
+    engine = ProviderEngine.from_env(env)
+    memory = TranslationMemory() if use_memory else None
+    await engine.start()
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    try:
+        for doc in docs:
+            t0 = time.perf_counter()
+            try:
+                await engine.translate_with_memory(memory, doc, "en", "fr")
+            except Exception:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - t0)
+    finally:
+        await engine.close()
+    result = summarize(latencies, time.perf_counter() - start, errors)
+    if memory is not None:
+        result["memory"] = memory.stats()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the translation memory on repetitive documents")
+    parser.add_argument("--documents", type=int, default=50)
+    parser.add_argument("--sentences", type=int, default=200, help="sentences per document")
+    parser.add_argument("--unique", type=float, default=0.1, help="share of sentences that are unique")
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    docs = make_documents(args.documents, args.sentences, args.unique)
+    results = {}
+    with StubServer(latency=args.latency_ms / 1000) as stub:
+        env = stub.provider_env()
+        env["PROVIDER_ORDERING"] = "static"
+        for name, use_memory in (("no_memory", False), ("memory", True)):
+            stub.counters(reset=True)
+            results[name] = asyncio.run(run(env, docs, use_memory))
+            results[name]["upstream"] = stub.counters()
+    write_report("memory", vars(args), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
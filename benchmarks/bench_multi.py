@@ -0,0 +1,90 @@
+"""One text into many languages: per-target /translate calls vs. one /translate/multi.
+
+Each round localizes a fresh multi-sentence announcement (so nothing is
+cached) into every target, three ways: one ``/translate`` after another, all
+``/translate`` calls at once from the client, and a single
+``/translate/multi``. The backend runs in-process against the stubs; the
+report has the wall-clock time per localization run and the upstream
+traffic for each mode.
+
+    python -m benchmarks.bench_multi --targets 20 --rounds 10 --latency-ms 50
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+
+from backend.languages import LISTED_LANGUAGES
+
+from .bench_load import InProcessBackend
+from .common import summarize, write_report
+from .stubs import StubServer
+
+MODES = ("sequential", "parallel", "multi")
+
+
+def announcement(n, sentences):
+    return " ".join(f"Announcement {n}, part {i}: the service will be updated tonight." for i in range(sentences))
+
+
+async def localize(session, url, mode, text, targets):
+    def body(target):
+        return {"text": text, "source_lang": "en", "target_lang": target}
+
+    async def one(target):
+        async with session.post(f"{url}/translate", json=body(target)) as resp:
+            return resp.status == 200
+
+    if mode == "sequential":
+        return all([await one(target) for target in targets])
+    if mode == "parallel":
+        return all(await asyncio.gather(*(one(target) for target in targets)))
+    payload = {"text": text, "source_lang": "en", "target_langs": targets}
+    async with session.post(f"{url}/translate/multi", json=payload) as resp:
+        return resp.status == 200 and not (await resp.json())["errors"]
+
+
+async def run_mode(url, mode, targets, args):
+    latencies, errors = [], 0
+    start = time.perf_counter()
+    async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=args.timeout)) as session:
+        for n in range(args.rounds):
+            text = announcement(f"{mode}-{n}", args.sentences)
+            t0 = time.perf_counter()
+            if await localize(session, url, mode, text, targets):
+                latencies.append(time.perf_counter() - t0)
+            else:
+                errors += 1
+    return summarize(latencies, time.perf_counter() - start, errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-target translation against per-target calls")
+    parser.add_argument("--targets", type=int, default=20, help="number of target languages")
+    parser.add_argument("--rounds", type=int, default=10, help="localization runs per mode")
+    parser.add_argument("--sentences", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    targets = [lang.code for lang in LISTED_LANGUAGES if lang.code != "en"][:args.targets]
+    results = {}
+    with StubServer(latency=args.latency_ms / 1000) as stub:
+        env = stub.provider_env()
+        env["RATE_LIMIT_PER_SECOND"] = "0"
+        env["JOB_WORKERS"] = "0"
+        env["TRANSLATION_CACHE_DISABLED"] = "1"
+        with InProcessBackend(env) as backend:
+            for mode in args.modes.split(","):
+                stub.counters(reset=True)
+                result = asyncio.run(run_mode(backend.url, mode.strip(), targets, args))
+                result["upstream"] = stub.counters()
+                results[mode.strip()] = result
+    write_report("multi", dict(vars(args), target_langs=targets), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Cold start: backend import and time to a healthy ``/``, plus Streamlit script runs.
+
+Every backend sample is a fresh interpreter: ``import backend.main`` on its
+own, and ``uvicorn backend.main:app`` started as a subprocess and polled
+until ``GET /`` answers 200. For the frontend, the shared modules the app
+imports are timed in a fresh interpreter. When Streamlit is installed, its
+app test harness also times the first script run and each rerun after it.
+
+    python -m benchmarks.bench_startup --runs 5 --reruns 20
+"""
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+from .common import percentile, write_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# What frontend/app.py imports besides Streamlit itself
+FRONTEND_IMPORTS = (
+    "requests, backend.cache, backend.langdetect, backend.languages, backend.ratelimit, backend.segmenter, backend.tts, backend.wire"
+)
+
+
+def stats(samples):
+    return {
+        "runs": len(samples),
+        "min_ms": round(min(samples) * 1000, 1),
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1),
+    }
+
+
+def backend_env():
+    env = dict(os.environ)
+    # The API process alone: no job workers, nothing written to shared locations
+    env.update(JOB_WORKERS="0", JOBS_DB=os.path.join(tempfile.mkdtemp(), "jobs.sqlite3"))
+    return env
+
+
+def import_seconds(modules, env=None):
+    code = f"import time; t = time.perf_counter(); import {modules}; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def ready_seconds(env, timeout):
+    # Process start to the first 200 from GET /
+    port = free_port()
+    command = [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(port), "--log-level", "warning"]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env)
+    try:
+        while time.perf_counter() - start < timeout:
+            if process.poll() is not None:
+                raise RuntimeError(f"backend exited with {process.returncode}")
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.005)
+        raise RuntimeError(f"backend not healthy after {timeout}s")
+    finally:
+        process.terminate()
+        process.wait(10)
+
+
+def streamlit_runs(reruns):
+    # (first run, reruns) in seconds, or None without Streamlit
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        return None
+    app = AppTest.from_file(os.path.join(ROOT, "frontend", "app.py"), default_timeout=60)
+    start = time.perf_counter()
+    app.run()
+    first = time.perf_counter() - start
+    samples = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        samples.append(time.perf_counter() - start)
+    return first, samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark backend and frontend cold start")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per backend measurement")
+    parser.add_argument("--reruns", type=int, default=20, help="Streamlit reruns after the first run")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    env = backend_env()
+    results = {
+        "backend_import": stats([import_seconds("backend.main", env) for _ in range(args.runs)]),
+        "backend_ready": stats([ready_seconds(env, args.timeout) for _ in range(args.runs)]),
+        "frontend_imports": stats([import_seconds(FRONTEND_IMPORTS) for _ in range(args.runs)]),
+    }
+    runs = streamlit_runs(args.reruns)
+    if runs is None:
+        results["frontend_script"] = "skipped: streamlit is not installed"
+    else:
+        first, reruns = runs
+        results["frontend_script"] = {"first_run_ms": round(first * 1000, 1), "rerun": stats(reruns)}
+    write_report("startup", vars(args), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
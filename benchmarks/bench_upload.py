@@ -0,0 +1,160 @@
+"""Peak server memory for a large document: one JSON /translate vs. a streamed /translate/upload.
+
+Every mode gets a fresh backend process (uvicorn against the stubs, with the
+cache and the translation memory off so nothing is kept between segments).
+The same generated document is sent as a single ``/translate`` JSON body and
+as a chunked ``/translate/upload`` at each window. The report has the
+server's resident memory once idle and its peak (``VmHWM``) after the
+request, so the growth shows whether memory followed the document or the
+window. Linux only, as the numbers come from ``/proc``.
+
+    python -m benchmarks.bench_upload --mb 4 --windows 8,64,512 --latency-ms 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import httpx
+
+from .bench_startup import ROOT, free_port
+from .common import write_report
+from .stubs import StubServer
+
+LINE = "Line {n}: the quarterly report is attached. Please review it before Friday's meeting!\n"
+
+
+def document_lines(size):
+    # Lines until ``size`` bytes, each one distinct
+    total, n = 0, 0
+    while total < size:
+        line = LINE.format(n=n)
+        total += len(line)
+        n += 1
+        yield line
+
+
+def memory_kib(pid):
+    # (current, peak) resident set size of a process in KiB
+    fields = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            fields[key] = value.strip()
+    return int(fields["VmRSS"].split()[0]), int(fields["VmHWM"].split()[0])
+
+
+class BackendProcess:
+    """``uvicorn backend.main:app`` in its own process, so its peak memory is the request's alone."""
+
+    def __init__(self, env, timeout=60):
+        self.env = env
+        self.timeout = timeout
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        command = [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(self.port), "--log-level", "warning"]
+        self.process = subprocess.Popen(command, cwd=ROOT, env=self.env)
+        deadline = time.perf_counter() + self.timeout
+        while time.perf_counter() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"backend exited with {self.process.returncode}")
+            try:
+                if httpx.get(f"{self.url}/", timeout=1).status_code == 200:
+                    # Let the background warm-up finish before taking the idle reading
+                    time.sleep(1.0)
+                    return self
+            except httpx.TransportError:
+                time.sleep(0.05)
+        raise RuntimeError(f"backend not healthy after {self.timeout}s")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(10)
+
+
+def send_json(url, size, timeout):
+    text = "".join(document_lines(size))
+    payload = {"text": text, "source_lang": "en", "target_lang": "de"}
+    resp = httpx.post(f"{url}/translate", json=payload, timeout=timeout)
+    return resp.status_code, len(json.dumps(payload)), len(resp.content)
+
+
+def send_upload(url, size, timeout):
+    def body():
+        # About 64 KiB per chunk, sent with chunked transfer encoding
+        chunk = []
+        for line in document_lines(size):
+            chunk.append(line)
+            if len(chunk) >= 700:
+                yield "".join(chunk).encode("utf-8")
+                chunk = []
+        if chunk:
+            yield "".join(chunk).encode("utf-8")
+
+    sent = sum(len(line.encode("utf-8")) for line in document_lines(size))
+    received = 0
+    params = {"source_lang": "en", "target_lang": "de"}
+    with httpx.stream("POST", f"{url}/translate/upload", params=params, content=body(), timeout=timeout) as resp:
+        for data in resp.iter_bytes():
+            received += len(data)
+    return resp.status_code, sent, received
+
+
+def run_mode(env, mode, args):
+    window = None
+    if mode.startswith("upload:"):
+        window = mode.split(":", 1)[1]
+        env = dict(env, UPLOAD_WINDOW=window)
+    with BackendProcess(env, args.timeout) as backend:
+        idle, _ = memory_kib(backend.process.pid)
+        start = time.perf_counter()
+        if window is None:
+            status, sent, received = send_json(backend.url, args.mb * 1024 * 1024, args.timeout)
+        else:
+            status, sent, received = send_upload(backend.url, args.mb * 1024 * 1024, args.timeout)
+        seconds = time.perf_counter() - start
+        _, peak = memory_kib(backend.process.pid)
+    return {
+        "status": status,
+        "seconds": round(seconds, 2),
+        "sent_bytes": sent,
+        "received_bytes": received,
+        "idle_rss_mib": round(idle / 1024, 1),
+        "peak_rss_mib": round(peak / 1024, 1),
+        "growth_mib": round((peak - idle) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server memory for streamed uploads against one JSON request")
+    parser.add_argument("--mb", type=float, default=4.0, help="document size in MiB")
+    parser.add_argument("--windows", default="8,64,512", help="UPLOAD_WINDOW values to run")
+    parser.add_argument("--no-json", action="store_true", help="skip the single /translate request")
+    parser.add_argument("--latency-ms", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=600.0)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    modes = ([] if args.no_json else ["json"]) + [f"upload:{w.strip()}" for w in args.windows.split(",") if w.strip()]
+    results = {}
+    with StubServer(latency=args.latency_ms / 1000) as stub:
+        env = dict(os.environ, **stub.provider_env())
+        env.update(
+            RATE_LIMIT_PER_SECOND="0",
+            JOB_WORKERS="0",
+            TRANSLATION_CACHE_DISABLED="1",
+            TRANSLATION_MEMORY_DISABLED="1",
+        )
+        for mode in modes:
+            stub.counters(reset=True)
+            results[mode] = run_mode(env, mode, args)
+            results[mode]["upstream"] = stub.counters()
+    write_report("upload", vars(args), results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Bytes on the wire and encode/decode time for API payloads in each format and coding.
+
+Offline, every payload (a typical ``/translate`` answer, ``/languages``, a
+1000-item ``/translate/batch`` result and a large document translation) is
+encoded with the standard library's JSON, orjson and MessagePack (the last
+two when installed), then compressed with gzip and brotli (when installed).
+With ``--http`` the same formats are also requested from the backend,
+running in-process against the stubs, and the report has the bytes each
+response took on the wire and the client's time to read it.
+
+    python -m benchmarks.bench_wire --repeat 50 --http
+"""
+import argparse
+import gzip
+import json
+import time
+
+from backend import wire
+from backend.languages import LANGUAGES_JSON
+
+from .common import percentile, write_report
+
+SENTENCE = "The committee will publish its final report on the new transport plan next week. "
+
+
+def payloads(document_kib):
+    return {
+        "translate": {"translated_text": SENTENCE * 4, "detected_source_lang": "en"},
+        "languages": json.loads(LANGUAGES_JSON),
+        "batch": {
+            "results": [{"index": i, "translated_text": f"{i}: {SENTENCE}"} for i in range(1000)],
+            "unique": 1000,
+            "cache_hits": 0,
+        },
+        "document": {"translated_text": SENTENCE * (document_kib * 1024 // len(SENTENCE))},
+    }
+
+
+def codecs():
+    found = {"json": (_std_dumps, json.loads)}
+    if wire.orjson is not None:
+        found["orjson"] = (wire.dumps, wire.loads)
+    if wire.msgpack is not None:
+        found["msgpack"] = (lambda obj: wire.encode(obj, wire.MSGPACK), lambda data: wire.decode(data, wire.MSGPACK))
+    return found
+
+
+def codings(level, quality):
+    found = {"gzip": (lambda data: gzip.compress(data, compresslevel=level, mtime=0), gzip.decompress)}
+    if wire.brotli is not None:
+        found["br"] = (lambda data: wire.brotli.compress(data, quality=quality), wire.brotli.decompress)
+    return found
+
+
+def _std_dumps(obj):
+    # What Starlette's JSONResponse produces
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def timed_ms(fn, arg, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(arg)
+        samples.append(time.perf_counter() - start)
+    return result, round(percentile(samples, 50) * 1000, 4)
+
+
+def offline(args):
+    results = {}
+    for name, payload in payloads(args.document_kib).items():
+        rows = {}
+        for codec, (dump, load) in codecs().items():
+            body, encode_ms = timed_ms(dump, payload, args.repeat)
+            _, decode_ms = timed_ms(load, body, args.repeat)
+            row = {"bytes": len(body), "encode_ms": encode_ms, "decode_ms": decode_ms}
+            for coding, (compress, decompress) in codings(args.gzip_level, args.brotli_quality).items():
+                packed, compress_ms = timed_ms(compress, body, args.repeat)
+                _, decompress_ms = timed_ms(decompress, packed, args.repeat)
+                row[coding] = {"bytes": len(packed), "compress_ms": compress_ms, "decompress_ms": decompress_ms}
+            rows[codec] = row
+        results[name] = rows
+    return results
+
+
+def over_http(args):
+    import httpx
+
+    from .bench_load import InProcessBackend
+    from .stubs import StubServer
+
+    variants = {"json": {"Accept": wire.JSON, "Accept-Encoding": "identity"}}
+    for coding in wire.CODINGS:
+        variants[f"json+{coding}"] = {"Accept": wire.JSON, "Accept-Encoding": coding}
+    if wire.msgpack is not None:
+        variants["msgpack"] = {"Accept": wire.MSGPACK, "Accept-Encoding": "identity"}
+        for coding in wire.CODINGS:
+            variants[f"msgpack+{coding}"] = {"Accept": wire.MSGPACK, "Accept-Encoding": coding}
+    batch = {"items": [f"{i}: {SENTENCE}" for i in range(1000)], "source_lang": "en", "target_lang": "de"}
+    document = {"text": SENTENCE * (args.document_kib * 1024 // len(SENTENCE)), "source_lang": "en", "target_lang": "de"}
+    requests = {
+        "translate": ("POST", "/translate", {"text": SENTENCE * 4, "source_lang": "en", "target_lang": "de"}),
+        "languages": ("GET", "/languages", None),
+        "batch": ("POST", "/translate/batch", batch),
+        "document": ("POST", "/translate", document),
+    }
+    results = {}
+    with StubServer() as stub:
+        env = stub.provider_env()
+        env.update(RATE_LIMIT_PER_SECOND="0", JOB_WORKERS="0")
+        with InProcessBackend(env) as backend, httpx.Client(base_url=backend.url, timeout=args.timeout) as client:
+            for name, (method, path, body) in requests.items():
+                # Fill the cache first so every variant times the same work on the server
+                client.request(method, path, json=body).raise_for_status()
+                rows = {}
+                for variant, headers in variants.items():
+                    samples, wire_bytes = [], 0
+                    for _ in range(args.http_repeat):
+                        start = time.perf_counter()
+                        resp = client.request(method, path, json=body, headers=headers)
+                        wire.decode(resp.content, resp.headers.get("content-type"))
+                        samples.append(time.perf_counter() - start)
+                        wire_bytes = resp.num_bytes_downloaded
+                    rows[variant] = {"wire_bytes": wire_bytes, "p50_ms": round(percentile(samples, 50) * 1000, 3)}
+                results[name] = rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response formats and compression")
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per encode/decode/compress step")
+    parser.add_argument("--document-kib", type=int, default=512, help="size of the large document payload")
+    parser.add_argument("--gzip-level", type=int, default=6)
+    parser.add_argument("--brotli-quality", type=int, default=5)
+    parser.add_argument("--http", action="store_true", help="also measure responses from the in-process backend")
+    parser.add_argument("--http-repeat", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--out", help="write the JSON report to this path")
+    args = parser.parse_args()
+
+    results = {"offline": offline(args)}
+    if args.http:
+        results["http"] = over_http(args)
+    config = dict(vars(args), codecs=list(codecs()), codings=list(wire.CODINGS))
+    write_report("wire", config, results, out=args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Local stand-ins for the HF Inference, LibreTranslate and MyMemory APIs.
+
+One HTTP/1.1 keep-alive server answers all three API shapes:
+
+- ``POST /models/<model>``  (HF Inference)
+- ``POST /translate``       (LibreTranslate)
+- ``GET  /get``             (MyMemory)
+
+Translations are fake (``[target] text``); only timing and wire shape matter.
+Each API has a ``StubProfile``: a latency distribution, injected error,
+bad-JSON and empty-result rates, and an optional rate limit answered with
+429 + Retry-After (MyMemory reports it in the body, like the real service).
+Profiles are written as ``api:key=value,...``, for example
+``mymemory:latency=lognormal:80:0.5,errors=0.02,rate=10``.
+"""
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+APIS = ("hf", "libre", "mymemory")
+
+
+def _fake(text, target):
+    return f"[{target}] {text}"
+
+
+def latency_sampler(spec, rng):
+    """Seconds-returning sampler for a latency spec in milliseconds.
+
+    ``20`` or ``fixed:20``, ``uniform:10:50``, ``exp:20`` (mean) and
+    ``lognormal:20:0.5`` (median, sigma).
+    """
+    kind, _, rest = str(spec).partition(":")
+    if not rest:
+        kind, rest = "fixed", kind
+    args = [float(a) for a in rest.split(":")]
+    if kind == "fixed":
+        return lambda: args[0] / 1000
+    if kind == "uniform":
+        return lambda: rng.uniform(args[0], args[1]) / 1000
+    if kind == "exp":
+        return lambda: rng.expovariate(1000 / args[0]) if args[0] else 0.0
+    if kind == "lognormal":
+        return lambda: rng.lognormvariate(math.log(args[0] / 1000), args[1]) if args[0] else 0.0
+    raise ValueError(f"Unknown latency distribution {kind!r}; expected fixed, uniform, exp or lognormal")
+
+
+class _RateLimiter:
+    # Thread-safe token bucket; returns the wait until the next token instead of sleeping
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+class StubProfile:
+    """How one stub API behaves: latency, injected failures and rate limit."""
+
+    def __init__(self, latency=0.0, error_rate=0.0, error_status=503, bad_json_rate=0.0, empty_rate=0.0,
+                 rate_limit=None, burst=None):
+        # latency: seconds (float) or a spec string in milliseconds, see latency_sampler
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.bad_json_rate = bad_json_rate
+        self.empty_rate = empty_rate
+        self.rate_limit = rate_limit
+        self.burst = burst
+
+    _KEYS = {
+        "latency": ("latency", str),
+        "errors": ("error_rate", float),
+        "status": ("error_status", int),
+        "bad_json": ("bad_json_rate", float),
+        "empty": ("empty_rate", float),
+        "rate": ("rate_limit", float),
+        "burst": ("burst", float),
+    }
+
+    @classmethod
+    def parse(cls, spec, base=None):
+        """``"hf:latency=exp:30,errors=0.05"`` -> ("hf", profile), starting from ``base``'s settings."""
+        api, _, options = spec.partition(":")
+        if api not in APIS:
+            raise ValueError(f"Unknown stub API {api!r}; expected one of {', '.join(APIS)}")
+        profile = cls(**vars(base)) if base else cls()
+        for option in filter(None, options.split(",")):
+            key, _, value = option.partition("=")
+            if key not in cls._KEYS:
+                raise ValueError(f"Unknown stub option {key!r}; expected one of {', '.join(cls._KEYS)}")
+            attr, convert = cls._KEYS[key]
+            setattr(profile, attr, convert(value))
+        return api, profile
+
+
+class _APIState:
+    # Runtime side of a StubProfile, plus per-API counters
+    def __init__(self, profile, rng):
+        self.profile = profile
+        latency = profile.latency
+        self.sample = latency_sampler(latency, rng) if isinstance(latency, str) else (lambda: latency)
+        self.limiter = _RateLimiter(profile.rate_limit, profile.burst) if profile.rate_limit else None
+        self.statuses = {}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _send_raw(self, status, body, content_type="application/json"):
+        # Bytes as they are, e.g. a body that claims to be JSON but isn't
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self, texts=1):
+        with self.server.lock:
+            self.server.requests += 1
+            self.server.texts += texts
+
+    def _outcome(self, api):
+        # None for a normal answer, else "limited" (with the Retry-After seconds), "error", "bad_json" or "empty"
+        state = self.server.apis[api]
+        profile = state.profile
+        if state.limiter is not None:
+            wait = state.limiter.try_acquire()
+            if wait:
+                return "limited", wait
+        delay = state.sample()
+        if delay > 0:
+            time.sleep(delay)
+        with self.server.lock:
+            roll = self.server.rng.random()
+        for outcome, rate in (("error", profile.error_rate), ("bad_json", profile.bad_json_rate), ("empty", profile.empty_rate)):
+            if roll < rate:
+                return outcome, None
+            roll -= rate
+        return None, None
+
+    def _record(self, api, status):
+        statuses = self.server.apis[api].statuses
+        with self.server.lock:
+            statuses[status] = statuses.get(status, 0) + 1
+
+    def _fail(self, api, outcome, retry_after):
+        # Shared failure answers for HF and LibreTranslate
+        if outcome == "limited":
+            self._record(api, "429")
+            return self._send(429, {"error": "rate limited"}, {"Retry-After": str(math.ceil(retry_after))})
+        if outcome == "error":
+            status = self.server.apis[api].profile.error_status
+            self._record(api, str(status))
+            return self._send(status, {"error": "injected failure"})
+        self._record(api, outcome)
+        if outcome == "bad_json":
+            return self._send_raw(200, b"<html>upstream hiccup</html>")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "invalid JSON"})
+        path = urlsplit(self.path).path
+        if path.startswith("/models/"):
+            outcome, retry_after = self._outcome("hf")
+            inputs = body.get("inputs", "")
+            target = (body.get("parameters") or {}).get("tgt_lang", "")
+            if outcome in ("limited", "error", "bad_json"):
+                return self._fail("hf", outcome, retry_after)
+            self._count(len(inputs) if isinstance(inputs, list) else 1)
+            self._record("hf", outcome or "200")
+            texts = inputs if isinstance(inputs, list) else [inputs]
+            return self._send(200, [{"translation_text": "" if outcome else _fake(t, target)} for t in texts])
+        if path == "/translate":
+            outcome, retry_after = self._outcome("libre")
+            if outcome in ("limited", "error", "bad_json"):
+                return self._fail("libre", outcome, retry_after)
+            self._count()
+            self._record("libre", outcome or "200")
+            return self._send(200, {"translatedText": "" if outcome else _fake(body.get("q", ""), body.get("target", ""))})
+        self._send(404, {"error": "not found"})
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/":
+            return self._send(200, {"status": "ok"})
+        if parts.path != "/get":
+            return self._send(404, {"error": "not found"})
+        outcome, retry_after = self._outcome("mymemory")
+        if outcome == "limited":
+            # MyMemory answers quota errors with HTTP 200 and the status in the body
+            self._record("mymemory", "429")
+            return self._send(200, {"responseData": {"translatedText": ""}, "responseStatus": 429,
+                                    "responseDetails": "MYMEMORY WARNING: YOU USED ALL AVAILABLE FREE TRANSLATIONS"})
+        if outcome in ("error", "bad_json"):
+            return self._fail("mymemory", outcome, retry_after)
+        self._count()
+        self._record("mymemory", outcome or "200")
+        query = parse_qs(parts.query)
+        text = query.get("q", [""])[0]
+        target = query.get("langpair", ["|"])[0].split("|")[-1]
+        translated = "" if outcome else _fake(text, target)
+        self._send(200, {"responseData": {"translatedText": translated}, "responseStatus": 200})
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The stdlib default backlog of 5 turns connection bursts into 1s SYN retries
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class StubServer:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, profiles=None, seed=0):
+        # latency applies to every API without its own profile; profiles maps API name -> StubProfile
+        self.httpd = _StubHTTPServer((host, port), StubHandler)
+        self.httpd.rng = random.Random(seed)
+        profiles = profiles or {}
+        self.httpd.apis = {
+            api: _APIState(profiles.get(api) or StubProfile(latency), random.Random(f"{seed}-{api}")) for api in APIS
+        }
+        # Upstream calls and texts translated, for benchmarks that count provider traffic
+        self.httpd.lock = threading.Lock()
+        self.httpd.requests = 0
+        self.httpd.texts = 0
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def provider_env(self, model="stub/model"):
+        # Environment that points backend.providers.build_providers() at this stub
+        return {
+            "HUGGINGFACE_API_KEY": "stub",
+            "HUGGINGFACE_MODEL": model,
+            "HUGGINGFACE_API_URL": f"{self.url}/models/{model}",
+            "LIBRETRANSLATE_URLS": f"{self.url}/translate",
+            "MYMEMORY_API_URL": f"{self.url}/get",
+        }
+
+    def counters(self, reset=False):
+        # Translated requests/texts, plus every answer per API by status ("200", "429", "bad_json", ...)
+        with self.httpd.lock:
+            counts = {
+                "requests": self.httpd.requests,
+                "texts": self.httpd.texts,
+                "responses": {api: dict(state.statuses) for api, state in self.httpd.apis.items() if state.statuses},
+            }
+            if reset:
+                self.httpd.requests = self.httpd.texts = 0
+                for state in self.httpd.apis.values():
+                    state.statuses.clear()
+        return counts
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def add_stub_arguments(parser):
+    parser.add_argument("--latency", default="50", help="latency for every API, e.g. 20, uniform:10:50, exp:30, lognormal:30:0.5 (ms)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with an error status")
+    parser.add_argument("--stub", action="append", default=[], metavar="API:KEY=VALUE,...",
+                        help="per-API overrides: latency, errors, status, bad_json, empty, rate, burst")
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def profiles_from_args(args):
+    base = StubProfile(args.latency, error_rate=args.error_rate)
+    profiles = dict.fromkeys(APIS, base)
+    for spec in args.stub:
+        api, profile = StubProfile.parse(spec, profiles.get(spec.partition(":")[0], base))
+        profiles[api] = profile
+    return profiles
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=9000)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    server = StubServer(port=args.port, profiles=profiles_from_args(args), seed=args.seed)
+    print(f"Stub providers listening on {server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
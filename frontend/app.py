@@ -1,10 +1,23 @@
 import streamlit as st
 import requests
-import io
 import os
-from gtts import gTTS
-from gtts.lang import tts_langs
-from deep_translator import MyMemoryTranslator
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Shared, dependency-free helpers live in backend/; make them importable when run via `streamlit run`.
+# Streamlit re-executes this script on every interaction, so only add the path once.
+ROOT = str(Path(__file__).resolve().parent.parent)
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+from backend.cache import TranslationCache
+from backend.langdetect import detect, resolve_source
+from backend.languages import HF_CODES, LANGUAGE_CHOICES, LIBRE_CODES, MYMEMORY_CODES
+from backend.ratelimit import TokenBucket
+from backend.segmenter import iter_segments, rebuild
+from backend.tts import TextToSpeech, TTSUnavailable
+from backend.wire import ACCEPT, ACCEPT_ENCODING, decode, loads
 
 st.set_page_config(page_title="🌍 Language Translator", page_icon="🌍", layout="centered")
 
@@ -35,94 +48,133 @@ def get_secret(name, default=None):
 
 # Optional backend URL (for when FastAPI is deployed). If not set, use direct providers.
 API_BASE = get_secret("BACKEND_URL")
+# All of the app's users reach the backend from this one address; a key listed in the
+# backend's RATE_LIMIT_API_KEYS gives them a bucket (and rate) of their own
+BACKEND_API_KEY = get_secret("BACKEND_API_KEY")
+
+# One keep-alive connection pool to the backend per process, asking for the most compact
+# body format (MessagePack) and compression (brotli, gzip) this install can read
+@st.cache_resource
+def backend_session():
+    session = requests.Session()
+    session.headers.update({"Accept": ACCEPT, "Accept-Encoding": ACCEPT_ENCODING})
+    if BACKEND_API_KEY:
+        session.headers["X-API-Key"] = BACKEND_API_KEY
+    return session
+
+def backend_json(response):
+    return decode(response.content, response.headers.get("content-type"))
+
+# Language list from the backend, fetched once per process; failures aren't cached, so
+# the next rerun tries again
+@st.cache_data(show_spinner=False)
+def fetch_backend_languages(api_base):
+    r = backend_session().get(f"{api_base}/languages", timeout=10)
+    r.raise_for_status()
+    return tuple(sorted((item["name"], item["code"]) for item in backend_json(r).get("languages", [])))
 
-# Comprehensive language list fallback (when backend isn't reachable)
-LANGUAGE_NAMES = {
-    "af": "Afrikaans",
-    "ar": "Arabic",
-    "as": "Assamese",
-    "bg": "Bulgarian",
-    "bn": "Bengali",
-    "ca": "Catalan",
-    "cs": "Czech",
-    "da": "Danish",
-    "de": "German",
-    "el": "Greek",
-    "en": "English",
-    "es": "Spanish",
-    "et": "Estonian",
-    "fa": "Persian",
-    "fi": "Finnish",
-    "fil": "Filipino",
-    "fr": "French",
-    "gu": "Gujarati",
-    "ha": "Hausa",
-    "he": "Hebrew",
-    "hi": "Hindi",
-    "hr": "Croatian",
-    "hu": "Hungarian",
-    "hy": "Armenian",
-    "id": "Indonesian",
-    "ig": "Igbo",
-    "it": "Italian",
-    "ja": "Japanese",
-    "km": "Khmer",
-    "kn": "Kannada",
-    "ko": "Korean",
-    "lo": "Lao",
-    "lt": "Lithuanian",
-    "lv": "Latvian",
-    "ml": "Malayalam",
-    "mr": "Marathi",
-    "ms": "Malay",
-    "my": "Burmese",
-    "nb": "Norwegian Bokmål",
-    "ne": "Nepali",
-    "nl": "Dutch",
-    "no": "Norwegian",
-    "or": "Odia",
-    "pa": "Punjabi",
-    "pl": "Polish",
-    "pt": "Portuguese",
-    "ro": "Romanian",
-    "ru": "Russian",
-    "sd": "Sindhi",
-    "si": "Sinhala",
-    "sk": "Slovak",
-    "sl": "Slovenian",
-    "sr": "Serbian",
-    "sv": "Swedish",
-    "sw": "Swahili",
-    "ta": "Tamil",
-    "te": "Telugu",
-    "th": "Thai",
-    "tl": "Filipino",
-    "tr": "Turkish",
-    "uk": "Ukrainian",
-    "ur": "Urdu",
-    "vi": "Vietnamese",
-    "yo": "Yoruba",
-    "zh": "Chinese",
-    "zu": "Zulu",
-    "xh": "Xhosa",
-}
-
-# Load full language list from backend
 def load_languages():
     # Try backend first if configured
     if API_BASE:
         try:
-            r = requests.get(f"{API_BASE}/languages", timeout=10)
-            if r.ok:
-                data = r.json().get("languages", [])
-                return {item["name"]: item["code"] for item in data}
+            return fetch_backend_languages(API_BASE)
+        except (requests.RequestException, ValueError):
+            pass
+    # Fallback to the shared registry (the same list the backend serves)
+    return LANGUAGE_CHOICES
+
+# Picker tables, built once per language list rather than on every rerun
+@st.cache_resource
+def language_menus(choices):
+    target_languages = dict(choices)
+    # Allow Auto Detect only for source, not target
+    source_languages = {"Auto Detect": "auto", **target_languages}
+    return source_languages, target_languages, sorted(source_languages), sorted(target_languages)
+
+# One cache per Streamlit process (not per rerun); set TRANSLATION_CACHE_DB to share the backend's disk tier
+@st.cache_resource
+def get_translation_cache():
+    return TranslationCache.from_env()
+
+# One speech synthesizer per process: the gTTS language table is read once and audio is cached on disk
+@st.cache_resource
+def get_tts():
+    return TextToSpeech.from_env()
+
+def backend_speech(text, lang):
+    # (audio, error) from the backend's /tts; audio is None when it can't speak this language
+    r = backend_session().post(f"{API_BASE}/tts", json={"text": text, "lang": lang}, timeout=30, stream=True)
+    if not r.ok:
+        try:
+            return None, backend_json(r).get("detail")
+        except ValueError:
+            return None, r.text
+    return b"".join(r.iter_content(64 * 1024)), None
+
+def speech(text, lang):
+    # Prefer the backend's shared audio cache; synthesize locally without a backend
+    if API_BASE:
+        try:
+            return backend_speech(text, lang)
         except requests.RequestException:
             pass
-    # Fallback to comprehensive local list
-    return {LANGUAGE_NAMES[code]: code for code in sorted(LANGUAGE_NAMES.keys())}
+    try:
+        return get_tts().synthesize(text, lang), None
+    except TTSUnavailable as e:
+        return None, str(e)
+
+# One MyMemory request budget per process, shared by all sessions' chunk workers
+@st.cache_resource
+def get_mymemory_rate_limiter():
+    return TokenBucket(float(get_secret("MYMEMORY_RATE_LIMIT", 10)))
+
+def translate_chunks_parallel(translator, chunks, rate_limiter):
+    # Translate chunks concurrently, retry each failed chunk on its own, keep input order
+    workers = int(get_secret("MYMEMORY_CHUNK_CONCURRENCY", 4))
+    retries = int(get_secret("MYMEMORY_CHUNK_RETRIES", 2))
+
+    def run(ch):
+        last_error = "empty result"
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(0.25 * 2 ** (attempt - 1))
+            rate_limiter.acquire_blocking()
+            try:
+                tr = translator.translate(ch)
+            except Exception as e:
+                last_error = e
+                continue
+            if tr:
+                return tr
+        raise RuntimeError(f"chunk failed after {retries + 1} attempts ({last_error})")
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks))))
+    try:
+        return list(pool.map(run, chunks))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+# "auto" is resolved locally when the detector is at least this sure, so HF and MyMemory can be used too
+DETECT_MIN_CONFIDENCE = float(get_secret("DETECT_MIN_CONFIDENCE", 0.5))
 
-# Cloud translation pipeline (HF → LibreTranslate → MyMemory)
 def cloud_translate(text, source, target):
+    # Only a source the user picked equal to the target skips translation, never a detected one
+    if source == target:
+        return text, None
+    if source == "auto":
+        source = resolve_source(source, target, detect(text), DETECT_MIN_CONFIDENCE)
+    cache = get_translation_cache()
+    cached = cache.get(text, source, target)
+    if cached is not None:
+        return cached, None
+    start = time.perf_counter()
+    translated, error = _cloud_translate_uncached(text, source, target)
+    if translated:
+        cache.set(text, source, target, translated, elapsed=time.perf_counter() - start)
+    return translated, error
+
+# Cloud translation pipeline (HF → LibreTranslate → MyMemory)
+def _cloud_translate_uncached(text, source, target):
     errors = []
 
     # Hugging Face Inference API (if key exists and source not auto)
@@ -131,7 +183,8 @@ def cloud_translate(text, source, target):
     if HF_API_KEY and source != "auto":
         try:
             headers = {"Authorization": f"Bearer {HF_API_KEY}", "Content-Type": "application/json"}
-            payload_hf = {"inputs": text, "parameters": {"src_lang": source, "tgt_lang": target}}
+            params = {"src_lang": HF_CODES.get(source, source), "tgt_lang": HF_CODES.get(target, target)}
+            payload_hf = {"inputs": text, "parameters": params}
             r = requests.post(f"https://api-inference.huggingface.co/models/{HF_MODEL}", headers=headers, json=payload_hf, timeout=15)
             if not r.ok:
                 errors.append(f"HF {HF_MODEL}: {r.status_code} {r.text}")
@@ -159,7 +212,12 @@ def cloud_translate(text, source, target):
         "https://libretranslate.com/translate",
         "https://translate.argosopentech.com/translate",
     ]
-    payload = {"q": text, "source": source, "target": target, "format": "text"}
+    payload = {
+        "q": text,
+        "source": LIBRE_CODES.get(source, source),
+        "target": LIBRE_CODES.get(target, target),
+        "format": "text",
+    }
     for url in endpoints:
         try:
             response = requests.post(url, json=payload, headers={"Content-Type": "application/json"}, timeout=10)
@@ -181,64 +239,80 @@ def cloud_translate(text, source, target):
             errors.append(f"{url}: no translatedText in response")
 
     # MyMemory fallback with chunking (skip if source auto)
-    mymemory_codes = {
-        "en": "en-GB", "ta": "ta-IN", "hi": "hi-IN", "te": "te-IN", "ml": "ml-IN", "kn": "kn-IN",
-        "mr": "mr-IN", "bn": "bn-IN", "gu": "gu-IN", "pa": "pa-IN", "ur": "ur-PK", "ar": "ar-SA",
-        "fr": "fr-FR", "es": "es-ES", "de": "de-DE", "it": "it-IT", "pt": "pt-PT", "ru": "ru-RU",
-        "zh": "zh-CN", "ja": "ja-JP", "ko": "ko-KR", "th": "th-TH", "vi": "vi-VN", "id": "id-ID",
-        "tr": "tr-TR", "fa": "fa-IR", "he": "he-IL", "el": "el-GR", "nl": "nl-NL", "pl": "pl-PL",
-        "sv": "sv-SE", "fi": "fi-FI", "no": "nb-NO", "da": "da-DK", "cs": "cs-CZ", "hu": "hu-HU",
-        "ro": "ro-RO", "sk": "sk-SK", "uk": "uk-UA", "bg": "bg-BG", "hr": "hr-HR", "sr": "sr-Latn-RS",
-        "sl": "sl-SI", "et": "et-EE", "lv": "lv-LV", "lt": "lt-LT", "ms": "ms-MY", "tl": "fil-PH",
-        "sw": "sw-KE", "af": "af-ZA", "si": "si-LK", "ne": "ne-NP", "my": "my-MM", "hy": "hy-AM",
-        "ca": "ca-ES", "km": "km-KH", "lo": "lo-LA", "as": "as-IN", "or": "or-IN", "sd": "sd-PK",
-        "yo": "yo-NG", "ha": "ha-NE", "ig": "ig-NG", "xh": "xh-ZA", "zu": "zu-ZA",
-    }
-    mm_source = mymemory_codes.get(source)
-    mm_target = mymemory_codes.get(target)
-
-    def split_chunks(s, max_len=450):
-        parts, current, length = [], [], 0
-        for word in s.split():
-            wlen = len(word) + (1 if length > 0 else 0)
-            if length + wlen > max_len:
-                parts.append(" ".join(current))
-                current, length = [word], len(word)
-            else:
-                if length > 0:
-                    current.append(word)
-                    length += len(word) + 1
-                else:
-                    current, length = [word], len(word)
-        if current:
-            parts.append(" ".join(current))
-        return parts
+    mm_source = MYMEMORY_CODES.get(source)
+    mm_target = MYMEMORY_CODES.get(target)
 
     if mm_source and mm_target and source != "auto":
         try:
+            # Imported on first use: only the no-backend fallback needs it
+            from deep_translator import MyMemoryTranslator
+
             translator = MyMemoryTranslator(source=mm_source, target=mm_target)
-            chunks = split_chunks(text)
-            out_chunks = []
-            for ch in chunks:
-                tr = translator.translate(ch)
-                if tr:
-                    out_chunks.append(tr)
-                else:
-                    errors.append("MyMemory empty chunk")
-            if out_chunks:
-                return " ".join(out_chunks), None
+            segments = list(iter_segments(text, max_len=450))
+            chunks = [seg.text for seg in segments if seg.text]
+            if chunks:
+                out_chunks = translate_chunks_parallel(translator, chunks, get_mymemory_rate_limiter())
+                return rebuild(segments, out_chunks), None
         except Exception as e:
             errors.append(f"MyMemory failed: {e}")
 
     return None, "; ".join(errors) if errors else "Translation failed"
 
-# Allow Auto Detect only for source, not target
-base_languages = load_languages()
-source_languages = {"Auto Detect": "auto", **base_languages}
-target_languages = base_languages
+def backend_error(response):
+    try:
+        err = backend_json(response).get("detail")
+    except Exception:
+        err = response.text
+    if response.status_code == 429 and response.headers.get("Retry-After"):
+        return f"Too many requests; try again in {response.headers['Retry-After']}s.\n{err}"
+    return f"Translation failed ({response.status_code}).\n{err}"
+
+def backend_translate(payload):
+    response = backend_session().post(f"{API_BASE}/translate", json=payload, timeout=30)
+    if not response.ok:
+        return None, backend_error(response)
+    translated = backend_json(response).get("translated_text", "")
+    return (translated, None) if translated else (None, "Backend returned no translated text.")
+
+def stream_backend_translation(payload, placeholder):
+    """Translate through the backend's /translate/stream, rendering output as segments arrive.
 
-source_options = sorted(source_languages.keys())
-target_options = sorted(target_languages.keys())
+    Returns (translated, error), or None when the backend has no streaming endpoint.
+    Raises requests.RequestException when the backend is unreachable.
+    """
+    parts = {}
+    errors = []
+    done = False
+    shown = 0  # segments [0, shown) are contiguous and already rendered
+    with backend_session().post(f"{API_BASE}/translate/stream", json=payload, stream=True, timeout=(5, 60)) as response:
+        if response.status_code in (404, 405):
+            return None
+        if not response.ok:
+            return None, backend_error(response)
+        for line in response.iter_lines(decode_unicode=True):
+            if not line:
+                continue
+            event = loads(line)
+            if event.get("done"):
+                done = True
+                break
+            if "error" in event:
+                errors.append(event["error"])
+            parts[event["index"]] = event["leading"] + event.get("translated_text", "")
+            if shown in parts:
+                while shown in parts:
+                    shown += 1
+                placeholder.code("".join(parts[i] for i in range(shown)))
+    if not done:
+        errors.append("Backend stream ended early.")
+    if errors:
+        return None, "; ".join(errors)
+    translated = "".join(parts[i] for i in sorted(parts))
+    if not translated.strip():
+        return None, "Backend returned no translated text."
+    return translated, None
+
+source_languages, target_languages, source_options, target_options = language_menus(load_languages())
 
 # Default to English if present
 default_source = source_options.index("English") if "English" in source_options else 0
@@ -268,23 +342,14 @@ if st.button("🚀 Translate"):
             translated = None
             error = None
             if API_BASE:
-                api_url = f"{API_BASE}/translate"
+                partial = st.empty()
                 try:
-                    response = requests.post(api_url, json=payload, timeout=30)
-                    if response.ok:
-                        data = response.json()
-                        translated = data.get("translated_text", "")
-                        if not translated:
-                            error = "Backend returned no translated text."
-                    else:
-                        try:
-                            err = response.json().get("detail")
-                        except Exception:
-                            err = response.text
-                        error = f"Translation failed ({response.status_code}).\n{err}"
+                    streamed = stream_backend_translation(payload, partial)
+                    translated, error = streamed if streamed is not None else backend_translate(payload)
                 except requests.RequestException:
                     # Backend unreachable → fall back to cloud providers
                     translated, error = cloud_translate(text, source_languages[source_name], target_languages[target_name])
+                partial.empty()
             else:
                 translated, error = cloud_translate(text, source_languages[source_name], target_languages[target_name])
 
@@ -296,20 +361,14 @@ if st.button("🚀 Translate"):
                 st.download_button("⬇️ Download Text", translated, file_name="translation.txt")
 
                 # Text-to-speech for the translated output (target language only)
-                supported_tts = tts_langs()
-                tts_code_map = {"zh": "zh-CN", "tl": "fil", "no": "no"}
-                tts_lang = tts_code_map.get(target_languages[target_name], target_languages[target_name])
-                if tts_lang in supported_tts:
-                    try:
-                        tts = gTTS(text=translated, lang=tts_lang)
-                        audio_buf = io.BytesIO()
-                        tts.write_to_fp(audio_buf)
-                        audio_buf.seek(0)
-                        st.audio(audio_buf, format="audio/mp3")
-                        st.download_button("🔊 Download Audio", audio_buf.getvalue(), file_name="translation.mp3", mime="audio/mpeg")
-                    except Exception as e:
-                        st.info(f"Speech not available for {target_name}: {e}")
-                else:
+                if not API_BASE and get_tts().voice_for(target_languages[target_name]) is None:
                     st.info(f"Speech not supported for target language: {target_name}")
+                else:
+                    audio, audio_error = speech(translated, target_languages[target_name])
+                    if audio:
+                        st.audio(audio, format="audio/mp3")
+                        st.download_button("🔊 Download Audio", audio, file_name="translation.mp3", mime="audio/mpeg")
+                    else:
+                        st.info(f"Speech not available for {target_name}: {audio_error}")
             else:
                 st.error(error or "Translation failed")
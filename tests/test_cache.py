@@ -0,0 +1,71 @@
+from backend import cache
+from backend.cache import ENTRY_OVERHEAD, MemoryTier, SQLiteTier, TranslationCache, make_key
+
+
+def test_key_normalizes_text_and_languages():
+    assert make_key("  Café ", "EN", "fr ") == make_key("Café", "en", "fr")
+    assert make_key("hello", "en", "fr") != make_key("hello", "en", "de")
+
+
+def test_memory_tier_evicts_least_recently_used_past_byte_limit():
+    size = len("k1") + len("v1") + ENTRY_OVERHEAD
+    tier = MemoryTier(max_bytes=2 * size)
+    tier.set("k1", "v1")
+    tier.set("k2", "v2")
+    assert tier.get("k1") == "v1"  # k2 is now the least recently used
+    tier.set("k3", "v3")
+    assert tier.get("k2") is None
+    assert tier.get("k1") == "v1" and tier.get("k3") == "v3"
+    assert tier.bytes == 2 * size
+
+
+def test_memory_tier_skips_entries_larger_than_limit():
+    tier = MemoryTier(max_bytes=ENTRY_OVERHEAD + 10)
+    tier.set("k", "x" * 100)
+    assert len(tier) == 0 and tier.bytes == 0
+
+
+def test_memory_tier_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    tier = MemoryTier(ttl=10)
+    tier.set("k", "v")
+    tier.set("short", "v", ttl=1)
+    now[0] += 5
+    assert tier.get("k") == "v" and tier.get("short") is None
+    now[0] += 10
+    assert tier.get("k") is None
+    assert len(tier) == 0 and tier.bytes == 0
+
+
+def test_sqlite_tier_survives_reopening(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite3")
+    tier = SQLiteTier(path, ttl=60)
+    tier.set("k", "v")
+    tier.close()
+    tier = SQLiteTier(path, ttl=60)
+    assert tier.get("k") == "v" and len(tier) == 1
+    now = cache.time.time() + 120
+    monkeypatch.setattr(cache.time, "time", lambda: now)
+    assert tier.get("k") is None
+    tier.close()
+
+
+def test_hit_in_slower_tier_fills_faster_ones(tmp_path):
+    memory, disk = MemoryTier(), SQLiteTier(str(tmp_path / "cache.sqlite3"))
+    TranslationCache([disk]).set("Hello", "en", "fr", "Bonjour")
+    translations = TranslationCache([memory, disk])
+    assert translations.get("Hello ", "en", "fr") == "Bonjour"
+    assert translations.get("Hello", "en", "fr") == "Bonjour"
+    assert translations.get("Bye", "en", "fr") is None
+    stats = translations.stats()
+    assert stats["tier_hits"] == {"memory": 1, "disk": 1}
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    assert stats["memory_entries"] == 1 and stats["disk_entries"] == 1
+    disk.close()
+
+
+def test_from_env():
+    assert TranslationCache.from_env({"TRANSLATION_CACHE_DISABLED": "1"}).tiers == []
+    tiers = TranslationCache.from_env({"TRANSLATION_CACHE_MAX_BYTES": "1000", "TRANSLATION_CACHE_TTL": "5"}).tiers
+    assert [(t.name, t.max_bytes, t.ttl) for t in tiers] == [("memory", 1000, 5.0)]
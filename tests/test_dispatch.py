@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from backend.dispatch import DispatchConfig, TranslationFailed, dispatch
+from backend.providers import ProviderError
+
+
+def make_call(delays, failing=()):
+    # Provider names stand in for providers; records which ones were started and cancelled
+    started, cancelled = [], []
+
+    async def call(provider):
+        started.append(provider)
+        try:
+            await asyncio.sleep(delays[provider])
+        except asyncio.CancelledError:
+            cancelled.append(provider)
+            raise
+        if provider in failing:
+            raise ProviderError(provider, "http", f"{provider}: down", status=503)
+        return f"{provider} result"
+
+    return call, started, cancelled
+
+
+def run(candidates, call, strategy, config=None, p95=None):
+    config = config or DispatchConfig(strategy)
+    return asyncio.run(dispatch(candidates, call, strategy, config, lambda provider: p95))
+
+
+def test_sequential_moves_on_only_after_a_failure():
+    call, started, _ = make_call({"a": 0.01, "b": 0.01, "c": 0.01}, failing={"a"})
+    assert run(["a", "b", "c"], call, "sequential") == ("b", "b result")
+    assert started == ["a", "b"]
+
+
+def test_hedged_starts_next_provider_when_current_is_slow():
+    call, started, cancelled = make_call({"slow": 1.0, "fast": 0.01})
+    config = DispatchConfig("hedged", hedge_delay=0.05)
+    assert run(["slow", "fast"], call, "hedged", config) == ("fast", "fast result")
+    assert started == ["slow", "fast"]
+    assert cancelled == ["slow"]
+
+
+def test_hedged_does_not_hedge_a_fast_provider():
+    call, started, _ = make_call({"a": 0.01, "b": 0.01})
+    assert run(["a", "b"], call, "hedged", DispatchConfig("hedged", hedge_delay=0.5)) == ("a", "a result")
+    assert started == ["a"]
+
+
+def test_hedge_delay_follows_p95_within_bounds():
+    config = DispatchConfig("hedged", hedge_delay=1.0, hedge_min_delay=0.05, hedge_max_delay=5.0)
+    assert config.hedge_delay_for(None) == 1.0
+    assert config.hedge_delay_for(0.2) == 0.2
+    assert config.hedge_delay_for(0.001) == 0.05
+    assert config.hedge_delay_for(60) == 5.0
+
+
+def test_race_takes_first_answer_and_cancels_the_rest():
+    call, started, cancelled = make_call({"a": 0.5, "b": 0.01, "c": 0.5, "d": 0.01})
+    assert run(["a", "b", "c", "d"], call, "race", DispatchConfig("race", race_width=3)) == ("b", "b result")
+    assert started == ["a", "b", "c"]
+    assert sorted(cancelled) == ["a", "c"]
+
+
+def test_race_refills_after_a_failure():
+    call, started, _ = make_call({"a": 0.01, "b": 0.5, "c": 0.02}, failing={"a"})
+    assert run(["a", "b", "c"], call, "race", DispatchConfig("race", race_width=2)) == ("c", "c result")
+    assert started == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("strategy", ["sequential", "hedged", "race"])
+def test_all_failing_raises_every_error(strategy):
+    call, _, _ = make_call({"a": 0.01, "b": 0.02}, failing={"a", "b"})
+    with pytest.raises(TranslationFailed) as info:
+        run(["a", "b"], call, strategy, DispatchConfig(strategy, hedge_delay=0.001))
+    assert sorted(info.value.errors) == ["a: down", "b: down"]
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        DispatchConfig("fastest")
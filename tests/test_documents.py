@@ -0,0 +1,92 @@
+import pytest
+
+from backend.documents import DocumentError, Unit, format_for, iter_windows, parse, render, units_of
+
+DOCUMENTS = {
+    "html": (
+        '<!doctype html><p>Hello <b>world</b>, see <a href="https://x.y/z">the docs</a> &amp; more.</p>\n'
+        "<pre>keep <i>this</i></pre>\n<p>Caf&eacute; {0} ok</p><script>if (a<b) x()</script>"
+        '<p translate="no">Brand</p>'
+    ),
+    "markdown": (
+        "---\ntitle: Doc\n---\n# Getting started\n\n"
+        'Run `pip install x` and read [the guide](https://x.y/guide "Guide").\n'
+        "This paragraph is wrapped\nover three lines here.\n\n```\ncode block\n```\n- item **one**\n"
+    ),
+    "srt": (
+        "1\n00:00:01,000 --> 00:00:02,000\nHello there,\n<i>my friend</i>.\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\n- Who are you?\n- Nobody.\n"
+    ),
+    "vtt": "WEBVTT\n\nNOTE a comment\n\n00:01.000 --> 00:02.000\nHello https://x.y again\n",
+}
+
+
+def pieces_of(fmt, chunk_size=None):
+    text = DOCUMENTS[fmt]
+    chunks = [text] if chunk_size is None else [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+    return list(parse(chunks, fmt))
+
+
+@pytest.mark.parametrize("fmt", sorted(DOCUMENTS))
+def test_untranslated_units_give_back_the_document(fmt):
+    pieces = pieces_of(fmt)
+    assert render(pieces, [None] * len(units_of(pieces))) == DOCUMENTS[fmt]
+
+
+@pytest.mark.parametrize("fmt", sorted(DOCUMENTS))
+@pytest.mark.parametrize("chunk_size", [1, 7, 64])
+def test_chunking_does_not_change_the_pieces(fmt, chunk_size):
+    assert render(pieces_of(fmt, chunk_size), units_of(pieces_of(fmt, chunk_size))) == render(
+        pieces_of(fmt), units_of(pieces_of(fmt))
+    )
+
+
+@pytest.mark.parametrize("fmt, expected", [
+    ("html", (
+        '<!doctype html><p>HELLO <b>WORLD</b>, SEE <a href="https://x.y/z">THE DOCS</a> &amp; MORE.</p>\n'
+        "<pre>keep <i>this</i></pre>\n<p>CAFÉ {0} OK</p><script>if (a<b) x()</script>"
+        '<p translate="no">Brand</p>'
+    )),
+    ("markdown", (
+        "---\ntitle: Doc\n---\n# GETTING STARTED\n\n"
+        'RUN `pip install x` AND READ [THE\nGUIDE](https://x.y/guide "Guide"). THIS PARAGRAPH IS\n'
+        "WRAPPED OVER THREE LINES HERE.\n\n```\ncode block\n```\n- ITEM **ONE**\n"
+    )),
+    ("srt", (
+        "1\n00:00:01,000 --> 00:00:02,000\nHELLO THERE,\n<i>MY FRIEND</i>.\n\n"
+        "2\n00:00:03,000 --> 00:00:04,000\n- WHO ARE YOU?\n- NOBODY.\n"
+    )),
+    ("vtt", "WEBVTT\n\nNOTE a comment\n\n00:01.000 --> 00:02.000\nHELLO https://x.y AGAIN\n"),
+])
+def test_placeholders_round_trip(fmt, expected):
+    pieces = pieces_of(fmt)
+    assert render(pieces, [text.upper() for text in units_of(pieces)]) == expected
+
+
+def test_markup_goes_upstream_as_placeholders():
+    units = units_of(pieces_of("html"))
+    assert units == ["Hello {0}world{1}, see {2}the docs{3} {4} more.", "Café {0} ok"]
+    assert units_of(pieces_of("srt")) == ["Hello there, {0}my friend{1}.", "Who are you?", "Nobody."]
+    assert units_of(pieces_of("vtt")) == ["Hello {0} again"]
+
+
+def test_placeholders_the_provider_mangled():
+    (unit,) = [p for p in parse(["<p>Read <b>this</b> now</p>"], "html") if isinstance(p, Unit)]
+    # Spaces inside a placeholder, a repeated one and a dropped one
+    assert render([unit], ["Lis { 0 }ceci{0} maintenant"]) == "Lis <b>ceci maintenant</b>"
+    # Text from the provider is escaped back into HTML
+    assert render([unit], ["A < B {0}{1}"]) == "A &lt; B <b></b>"
+
+
+def test_windows_hold_at_most_size_units():
+    pieces = pieces_of("srt")
+    windows = list(iter_windows(pieces, 2))
+    assert [len(units_of(w)) for w in windows] == [2, 1]
+    assert [p for w in windows for p in w] == pieces
+
+
+def test_format_for():
+    assert format_for("text/html; charset=utf-8") == "html"
+    assert format_for(None, "vtt") == "vtt"
+    with pytest.raises(DocumentError):
+        format_for("text/plain")
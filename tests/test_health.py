@@ -0,0 +1,89 @@
+from types import SimpleNamespace
+
+from backend.health import CLOSED, HALF_OPEN, OPEN, HealthConfig, HealthRegistry, ProviderHealth
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_health(**config):
+    clock = Clock()
+    return ProviderHealth("p", HealthConfig(**config), clock), clock
+
+
+def test_consecutive_failures_open_the_circuit():
+    health, _ = make_health(failure_threshold=3, min_samples=100)
+    for _ in range(2):
+        health.record_failure(0.1)
+    assert health.state == CLOSED
+    health.record_failure(0.1)
+    assert health.state == OPEN
+    assert not health.available() and not health.acquire()
+
+
+def test_error_rate_opens_the_circuit():
+    health, _ = make_health(failure_threshold=100, min_samples=4, error_rate_threshold=0.5)
+    health.record_success(0.1)
+    health.record_failure(0.1)
+    health.record_success(0.1)
+    assert health.state == CLOSED
+    health.record_failure(0.1)
+    assert health.state == OPEN
+
+
+def test_half_open_probe_success_closes():
+    health, clock = make_health(failure_threshold=1, cooldown=30)
+    health.record_failure(0.1)
+    clock.now += 29
+    assert not health.acquire()
+    clock.now += 1
+    assert health.available()
+    assert health.acquire() and health.state == HALF_OPEN
+    assert not health.available() and not health.acquire()  # one probe at a time
+    health.record_success(0.1)
+    assert health.state == CLOSED and health.current_cooldown == 30
+
+
+def test_half_open_probe_failure_doubles_cooldown_up_to_max():
+    health, clock = make_health(failure_threshold=1, cooldown=30, max_cooldown=100)
+    health.record_failure(0.1)
+    for expected in (60, 100, 100):
+        clock.now += health.current_cooldown
+        assert health.acquire()
+        health.record_failure(0.1)
+        assert health.state == OPEN and health.current_cooldown == expected
+
+
+def test_released_probe_lets_another_through():
+    health, clock = make_health(failure_threshold=1, cooldown=10)
+    health.record_failure(0.1)
+    clock.now += 10
+    assert health.acquire()
+    health.release()
+    assert health.state == HALF_OPEN and health.acquire()
+
+
+def test_old_samples_leave_the_window():
+    health, clock = make_health(window_seconds=60, failure_threshold=100)
+    health.record_failure(0.1)
+    assert health.error_rate() == 1.0
+    clock.now += 61
+    health.record_success(0.2)
+    assert health.error_rate() == 0.0 and health.latency_percentile(50) == 0.2
+
+
+def test_rank_skips_open_circuits_and_orders_by_latency():
+    providers = [SimpleNamespace(name=name) for name in ("slow", "fast", "down", "new")]
+    clock = Clock()
+    registry = HealthRegistry(providers, HealthConfig(failure_threshold=1), clock)
+    registry.get(providers[0]).record_success(2.0)
+    registry.get(providers[1]).record_success(0.1)
+    registry.get(providers[2]).record_failure(0.1)
+    assert [p.name for p in registry.rank(providers)] == ["new", "fast", "slow"]
+    registry.config.ordering = "static"
+    assert [p.name for p in registry.rank(providers)] == ["slow", "fast", "new"]
@@ -0,0 +1,104 @@
+import io
+
+import pytest
+
+from backend import jobs
+from backend.jobs import JobError, JobStore
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(jobs.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    yield store
+    store.close()
+
+
+def create(store, text="One.\nTwo.\nThree.", fmt="text"):
+    return store.create(io.BytesIO(text.encode()), fmt, "en", "fr")
+
+
+def results(units, error=None):
+    return [(unit, None if error else unit.text.upper(), error) for unit in units]
+
+
+def test_expired_lease_is_delivered_again(store, clock):
+    job = create(store)
+    first = store.claim("w1", 10, lease=30)
+    assert [u.text for u in first] == ["One.", "Two.", "Three."]
+    assert store.get(job["id"])["status"] == "running"
+    assert store.claim("w2", 10, lease=30) == []
+    clock.now += 31
+    again = store.claim("w2", 10, lease=30)
+    assert sorted(u.id for u in again) == sorted(u.id for u in first)
+    assert all(u.attempts == 2 for u in again)
+    # The first worker lost its lease: its late results are dropped
+    store.complete("w1", [(unit, "stale", None) for unit in first])
+    assert store.get(job["id"])["done"] == 0
+    store.complete("w2", results(again))
+    assert store.get(job["id"])["status"] == "done"
+    assert "".join(store.iter_result(job["id"])) == "ONE.\nTWO.\nTHREE."
+    assert not store.has_open_units()
+
+
+def test_failed_units_back_off_then_fail(store, clock):
+    job = create(store, "Only one.")
+    for attempt, delay in ((1, 5), (2, 10)):
+        (unit,) = store.claim("w", 10, lease=30)
+        assert unit.attempts == attempt
+        store.complete("w", results([unit], "boom"), max_attempts=3, retry_delay=5)
+        clock.now += delay - 1
+        assert store.claim("w", 10, lease=30) == []
+        clock.now += 1
+    (unit,) = store.claim("w", 10, lease=30)
+    store.complete("w", results([unit], "boom"), max_attempts=3, retry_delay=5)
+    status = store.get(job["id"])
+    assert (status["status"], status["failed"]) == ("done", 1)
+    # A failed segment keeps its source text
+    assert "".join(store.iter_result(job["id"])) == "Only one."
+
+
+def test_release_hands_units_back_without_counting_the_attempt(store, clock):
+    create(store)
+    units = store.claim("w1", 2, lease=300)
+    store.release("w1", [units[0].id])
+    (back, rest) = store.claim("w2", 10, lease=300)
+    assert back.id == units[0].id and back.attempts == 1
+    store.release("w2", delay=60)
+    assert store.claim("w3", 10, lease=300) == []
+    clock.now += 60
+    assert len(store.claim("w3", 10, lease=300)) == 2
+
+
+def test_jsonl_and_csv_results_keep_their_records(store, clock):
+    job = create(store, '{"text": "Hi", "id": 7}\n"Bye"\n', "jsonl")
+    store.complete("w", results(store.claim("w", 10, lease=30)))
+    assert "".join(store.iter_result(job["id"])) == (
+        '{"text": "Hi", "id": 7, "translated_text": "HI"}\n{"text": "Bye", "translated_text": "BYE"}\n'
+    )
+    job = store.create(io.BytesIO(b"id,text\n1,Hi\n2,\n"), "csv", "en", "fr", {"column": "text"})
+    store.complete("w", results(store.claim("w", 10, lease=30)))
+    assert "".join(store.iter_result(job["id"])).splitlines() == ["id,text,translated_text,error", "1,Hi,HI,", "2,,,"]
+
+
+def test_bad_submissions_are_rejected(store):
+    with pytest.raises(JobError):
+        create(store, "")
+    with pytest.raises(JobError):
+        create(store, "{not json", "jsonl")
+    with pytest.raises(JobError):
+        store.create(io.BytesIO(b"id,body\n1,Hi\n"), "csv", "en", "fr", {"column": "text"})
@@ -0,0 +1,102 @@
+import asyncio
+
+from backend import memory as memory_module
+from backend.engine import ProviderEngine
+from backend.memory import TranslationMemory
+from backend.providers import Provider
+
+
+class EchoProvider(Provider):
+    name = "Echo"
+    url = "echo://local"
+    needs_client = False
+
+    def __init__(self):
+        self.calls = []
+
+    async def translate(self, client, text, source, target):
+        self.calls.append(text)
+        return text.upper()
+
+
+def translate(memory, text, provider):
+    async def go():
+        engine = ProviderEngine([provider])
+        await engine.start()
+        try:
+            return await engine.translate_with_memory(memory, text, "en", "fr")
+        finally:
+            await engine.close()
+
+    return asyncio.run(go())
+
+
+def test_exact_hit_ignores_surrounding_whitespace():
+    memory = TranslationMemory()
+    memory.store("Hello there.", "en", "fr", "Bonjour.")
+    assert memory.lookup("  Hello there. ", "en", "fr") == "Bonjour."
+    assert memory.lookup("Hello there.", "en", "de") is None
+    assert memory.lookup("Hello here.", "en", "fr") is None  # fuzzy matching is off by default
+    stats = memory.stats()
+    assert (stats["exact_hits"], stats["fuzzy_hits"], stats["misses"]) == (1, 0, 2)
+
+
+def test_fuzzy_hit_needs_the_same_numbers():
+    memory = TranslationMemory(fuzzy_threshold=0.6)
+    memory.store("Your order of 3 items has been shipped today.", "en", "fr", "Votre commande de 3 articles a été expédiée.")
+    assert memory.lookup("Your order of 3 items has been shipped today!", "en", "fr") == "Votre commande de 3 articles a été expédiée."
+    assert memory.lookup("Your order of 4 items has been shipped today.", "en", "fr") is None
+    assert memory.lookup("Something else entirely.", "en", "fr") is None
+    assert memory.stats()["fuzzy_hits"] == 1
+
+
+def test_lookup_many_and_store_many():
+    memory = TranslationMemory()
+    memory.store_many([("One.", "Un."), ("Two.", "Deux.")], "en", "fr")
+    assert memory.lookup_many(["One.", "Two.", "Three."], "en", "fr") == {"One.": "Un.", "Two.": "Deux.", "Three.": None}
+    assert memory.stats()["stores"] == 2
+
+
+def test_least_recently_used_entries_are_pruned(monkeypatch):
+    monkeypatch.setattr(memory_module, "PRUNE_EVERY", 1)
+    memory = TranslationMemory(max_entries=2)
+    for i in range(4):
+        memory.store(f"Sentence {i}.", "en", "fr", f"Phrase {i}.")
+    assert len(memory) == 2 and memory.evicted == 2
+    assert memory.lookup("Sentence 3.", "en", "fr") == "Phrase 3."
+
+
+def test_contiguous_misses_are_sent_as_one_text():
+    memory, provider = TranslationMemory(), EchoProvider()
+    text = "First one. Second one.\nThird one."
+    assert translate(memory, text, provider) == text.upper()
+    assert provider.calls == [text]
+    # The run's translation splits into as many sentences, so each is remembered on its own
+    assert memory.lookup_many(["First one.", "Third one."], "en", "fr") == {"First one.": "FIRST ONE.", "Third one.": "THIRD ONE."}
+
+
+class MergingProvider(EchoProvider):
+    async def translate(self, client, text, source, target):
+        self.calls.append(text)
+        return "Un et deux."
+
+
+def test_run_not_splitting_like_its_source_is_not_remembered():
+    memory = TranslationMemory()
+    assert translate(memory, "One. Two.", MergingProvider()) == "Un et deux."
+    assert len(memory) == 0
+
+
+def test_hits_split_the_misses_into_runs():
+    memory, provider = TranslationMemory(), EchoProvider()
+    memory.store("Second one.", "en", "fr", "Deuxième.")
+    assert translate(memory, "First one. Second one. Third one.", provider) == "FIRST ONE. Deuxième. THIRD ONE."
+    assert sorted(provider.calls) == ["First one.", "Third one."]
+    assert memory.lookup("Third one.", "en", "fr") == "THIRD ONE."
+
+
+def test_remembered_text_needs_no_upstream_call():
+    memory, provider = TranslationMemory(), EchoProvider()
+    memory.store_many([("First one.", "Premier."), ("Second one.", "Deuxième.")], "en", "fr")
+    assert translate(memory, "First one.\n\nSecond one.", provider) == "Premier.\n\nDeuxième."
+    assert provider.calls == []
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from backend.quota import DAY_SECONDS, QuotaBudget, QuotaConfig, QuotaRegistry, parse_quotas
+
+PROVIDERS = [SimpleNamespace(name="MyMemory"), SimpleNamespace(name="Libre")]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100 * DAY_SECONDS + 3600.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_quotas_splits_on_last_equals():
+    assert parse_quotas("MyMemory=50000, https://libre.example/translate?a=b=2e4,bad") == {
+        "MyMemory": 50000, "https://libre.example/translate?a=b": 20000,
+    }
+
+
+def test_budget_paces_spending_with_a_burst():
+    clock = Clock()
+    budget = QuotaBudget("p", DAY_SECONDS, QuotaConfig(burst_fraction=100 / DAY_SECONDS), clock)
+    # One character per second, at most 100 banked
+    assert budget.spend(60) == 0.0
+    assert budget.wait(40) == 0.0
+    assert budget.spend(50) == 10.0
+    assert budget.refused == 1
+    clock.now += 10
+    assert budget.spend(50) == 0.0
+    # A text larger than the burst goes through once the burst is full
+    clock.now += 100
+    assert budget.spend(500) == 0.0
+    assert budget.used == 610
+
+
+def test_daily_cap_resets_at_utc_midnight():
+    clock = Clock()
+    budget = QuotaBudget("p", 1000, QuotaConfig(burst_fraction=1.0), clock)
+    assert budget.spend(1000) == 0.0
+    clock.now += 3600
+    midnight = (clock.now // DAY_SECONDS + 1) * DAY_SECONDS
+    assert budget.spend(1) == midnight - clock.now
+    clock.now = midnight
+    assert budget.spend(1) == 0.0 and budget.used == 1
+
+
+def test_throttle_pauses_even_unmetered_providers():
+    clock = Clock()
+    budget = QuotaBudget("p", None, QuotaConfig(throttle_seconds=60, max_throttle_seconds=300), clock)
+    assert budget.spend(10**9) == 0.0
+    budget.throttle()
+    assert budget.wait() == 60
+    budget.throttle(10**6)
+    assert budget.spend(1) == 300
+    clock.now += 300
+    assert budget.spend(1) == 0.0
+    assert budget.throttled == 2
+
+
+def test_registries_sharing_a_database_share_the_budget(tmp_path):
+    clock = Clock()
+    config = QuotaConfig(daily_chars={"MyMemory": 10000}, burst_fraction=0.1, path=str(tmp_path / "quota.sqlite3"))
+    api, worker = QuotaRegistry(PROVIDERS, config, clock), QuotaRegistry(PROVIDERS, config, clock)
+    assert api.get(PROVIDERS[0]).spend(800) == 0.0
+    # The worker's process sees the burst already spent by the API's
+    assert worker.get(PROVIDERS[0]).spend(800) > 0
+    worker.get(PROVIDERS[1]).throttle(30)
+    clock.now += 5
+    assert api.get(PROVIDERS[1]).wait() == 25
+    # A restart picks the day's spending up again
+    restarted = QuotaRegistry(PROVIDERS, config, clock)
+    assert restarted.get(PROVIDERS[0]).snapshot()["used_today"] == 800
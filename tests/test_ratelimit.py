@@ -0,0 +1,94 @@
+import asyncio
+
+from backend.ratelimit import ClientRateLimiter, RateLimitMiddleware, TokenBucket, parse_api_keys
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_spends_burst_then_refills_at_rate():
+    clock = Clock()
+    bucket = TokenBucket(2.0, burst=4, clock=clock)
+    assert all(bucket.try_acquire()[0] for _ in range(4))
+    assert bucket.try_acquire() == (False, 0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire() == (True, 0.0)
+    clock.now += 100
+    assert bucket.level() == 4
+
+
+def test_reserve_goes_into_debt():
+    clock = Clock()
+    bucket = TokenBucket(1.0, burst=1, clock=clock)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 1.0
+    assert bucket.reserve() == 2.0
+    assert bucket.peek() == 3.0
+
+
+def test_zero_rate_is_unlimited():
+    bucket = TokenBucket(0)
+    assert bucket.try_acquire(1000) == (True, 0.0) and bucket.reserve(1000) == 0.0
+
+
+def test_clients_get_their_own_buckets():
+    limiter = ClientRateLimiter(rate=1, burst=1, api_keys=parse_api_keys("gold=10,plain"), clock=Clock())
+    assert limiter.client({b"x-api-key": b"gold"}, ("1.2.3.4", 1)) == ("key:gold", 10.0)
+    assert limiter.client({b"x-api-key": b"plain"}, ("1.2.3.4", 1)) == ("key:plain", 1)
+    # Unknown keys and X-Forwarded-For (without trust_forwarded) don't get their own bucket
+    assert limiter.client({b"x-api-key": b"made-up", b"x-forwarded-for": b"9.9.9.9"}, ("1.2.3.4", 1)) == ("ip:1.2.3.4", 1)
+    assert limiter.check("ip:a", 1)[0] and not limiter.check("ip:a", 1)[0]
+    assert limiter.check("ip:b", 1)[0]
+    assert limiter.check("key:gold", 10.0)[0]
+    assert limiter.stats()["limited"] == 1
+
+
+def test_forwarded_address_when_trusted():
+    limiter = ClientRateLimiter(trust_forwarded=True)
+    assert limiter.client({b"x-forwarded-for": b"9.9.9.9, 10.0.0.1"}, ("10.0.0.1", 1))[0] == "ip:9.9.9.9"
+
+
+def test_cost_grows_with_body_size_and_big_requests_pass_when_full():
+    clock = Clock()
+    limiter = ClientRateLimiter(rate=1, burst=3, bytes_per_token=100, clock=clock)
+    assert limiter.cost({}) == 1 and limiter.cost({b"content-length": b"250"}) == 3
+    assert limiter.check("ip:a", 1, 50) == (True, 0.0)  # capped at the burst
+    assert limiter.check("ip:a", 1, 1) == (False, 1.0)
+
+
+def test_least_recently_seen_clients_are_forgotten():
+    limiter = ClientRateLimiter(rate=1, burst=1, max_clients=2, clock=Clock())
+    for key in ("ip:a", "ip:b", "ip:c"):
+        limiter.check(key, 1)
+    assert limiter.stats()["clients"] == 2
+    assert limiter.check("ip:a", 1)[0]  # a fresh bucket
+
+
+def call_middleware(limiter, path="/translate", client=("1.2.3.4", 1)):
+    sent, called = [], []
+
+    async def app(scope, receive, send):
+        called.append(scope["path"])
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "headers": [], "client": client}
+    asyncio.run(RateLimitMiddleware(app, limiter)(scope, None, send))
+    return called, sent
+
+
+def test_middleware_answers_429_with_retry_after():
+    limiter = ClientRateLimiter(rate=0.5, burst=1, clock=Clock())
+    assert call_middleware(limiter) == (["/translate"], [])
+    called, sent = call_middleware(limiter)
+    assert called == [] and sent[0]["status"] == 429
+    assert (b"retry-after", b"2") in sent[0]["headers"]
+    # Other clients and paths that aren't limited go through
+    assert call_middleware(limiter, client=("5.6.7.8", 1))[0] == ["/translate"]
+    assert call_middleware(limiter, path="/languages")[0] == ["/languages"]
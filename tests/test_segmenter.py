@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from backend.segmenter import iter_segments, rebuild, split_text
+
+TEXTS = [
+    "",
+    "   ",
+    "One sentence.",
+    "First one. Second one!  Third one?\n\nNew paragraph here.\n",
+    "  Indented line.\n\tTabbed line. And more…\n",
+    "Pi is 3.14 and the site is example.com. Done.",
+    "He said \"stop.\" Then he left.",
+    "第一句。第二句！第三句？",
+    "यह पहला वाक्य है। यह दूसरा है।",
+    "هذه جملة؟ وهذه أخرى۔",
+    "word " * 300,
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("max_len", [None, 10, 450])
+@pytest.mark.parametrize("pack", [True, False])
+def test_round_trip(text, max_len, pack):
+    segments = list(iter_segments(text, max_len, pack=pack))
+    assert rebuild(segments, [seg.text for seg in segments if seg.text]) == text
+    if max_len:
+        assert all(len(seg.text) <= max_len for seg in segments)
+
+
+def test_sentence_boundaries():
+    text = "Pi is 3.14 here. He said \"stop.\" Then left.\nNext line"
+    assert [seg.text for seg in iter_segments(text, None, pack=False) if seg.text] == [
+        "Pi is 3.14 here.", "He said \"stop.\"", "Then left.", "Next line",
+    ]
+    assert split_text("第一句。第二句！", None) == ["第一句。第二句！"]
+    assert [seg.text for seg in iter_segments("第一句。第二句！", None, pack=False)] == ["第一句。", "第二句！"]
+
+
+@pytest.mark.parametrize("text", [
+    "." * 100_000 + "x",
+    "a" + " " * 100_000 + "x",
+    "a" + "?!" * 50_000 + "x",
+    "a" + ".)" * 50_000 + "x",
+    "x" * 100_000,
+    "Short one. " * 20_000,
+])
+def test_worst_case_is_linear(text):
+    # Inputs that made the old lookahead-based pattern backtrack quadratically (seconds each)
+    start = time.perf_counter()
+    segments = list(iter_segments(text, 450))
+    assert time.perf_counter() - start < 1.0
+    assert rebuild(segments, [seg.text for seg in segments if seg.text]) == text
@@ -0,0 +1,83 @@
+import asyncio
+
+from backend.singleflight import SingleFlight
+
+
+def make_factory(result=None, error=None, delay=0.05):
+    calls = []
+
+    async def factory():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return factory, calls
+
+
+def test_identical_calls_share_one_upstream_call():
+    async def go():
+        flight = SingleFlight()
+        factory, calls = make_factory("Bonjour")
+        results = await asyncio.gather(*(flight.do("key", factory) for _ in range(5)))
+        other = await flight.do("other", factory)
+        return flight, results, other, calls
+
+    flight, results, other, calls = asyncio.run(go())
+    assert results == ["Bonjour"] * 5 and other == "Bonjour"
+    assert len(calls) == 2
+    assert flight.stats() == {"in_flight": 0, "leaders": 2, "coalesced": 4}
+
+
+def test_error_reaches_every_caller_and_is_not_kept():
+    async def go():
+        flight = SingleFlight()
+        failing, _ = make_factory(error=RuntimeError("upstream down"))
+        results = await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+        working, calls = make_factory("ok")
+        return results, await flight.do("key", working), calls
+
+    results, retried, calls = asyncio.run(go())
+    assert [str(e) for e in results] == ["upstream down"] * 3
+    assert all(isinstance(e, RuntimeError) for e in results)
+    assert retried == "ok" and len(calls) == 1
+
+
+def test_call_survives_a_caller_going_away():
+    async def go():
+        flight = SingleFlight()
+        factory, calls = make_factory("done", delay=0.1)
+        leaving = asyncio.ensure_future(flight.do("key", factory))
+        staying = asyncio.ensure_future(flight.do("key", factory))
+        await asyncio.sleep(0.02)
+        leaving.cancel()
+        return await staying, leaving, calls
+
+    result, leaving, calls = asyncio.run(go())
+    assert result == "done" and leaving.cancelled() and len(calls) == 1
+
+
+def test_call_is_cancelled_when_every_caller_has_gone():
+    async def go():
+        flight = SingleFlight()
+        cancelled = []
+
+        async def factory():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(1)
+                raise
+
+        callers = [asyncio.ensure_future(flight.do("key", factory)) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return flight, cancelled
+
+    flight, cancelled = asyncio.run(go())
+    assert cancelled == [1] and not flight.in_flight("key")
+